@@ -4,106 +4,217 @@ import uuid
 import time
 import base64
 import hashlib
+import hmac
 import math
+import sqlite3
+import zipfile
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from pathlib import Path
-from flask import Flask, render_template, jsonify, send_from_directory, request, send_file
+from flask import Flask, render_template, jsonify, send_from_directory, request, send_file, Response, stream_with_context, g
+from urllib.parse import quote
+from werkzeug.http import quote_etag
 from config import config
 
-# Global variables to track requests
-save_favorite_request = {'timestamp': None, 'processed': True}
-play_pause_request = {'timestamp': None, 'processed': True, 'action': None}
-refresh_images_request = {'timestamp': None, 'processed': True, 'uploaded_images': []}
+try:
+    from flask_sock import Sock, ConnectionClosed
+except ImportError:
+    # The WebSocket control channel is optional; remotes fall back to the REST endpoints
+    Sock = None
 
-# Global variable to track remote control heartbeats
-remote_heartbeats = {}  # {session_id: timestamp}
+# Command log consumers behind the pre-command-log check-* endpoints, one per command type
+LEGACY_COMMAND_CONSUMERS = {
+    'save-favorite': 'legacy-save-favorite',
+    'play-pause': 'legacy-play-pause',
+    'load-favorite': 'legacy-load-favorite',
+    'refresh-images': 'legacy-refresh-images'
+}
 
-def generate_highres_from_favorite(favorite_data):
+# Layer transformations are saved relative to a 1920x1080 canvas
+HIGHRES_CANVAS_SIZE = (1920, 1080)
+THUMBNAIL_SIZE = 200
+
+# Limits on one /api/debug-log request
+DEBUG_LOG_MAX_BATCH = 500
+DEBUG_LOG_MAX_MESSAGE = 4000
+
+# Settings used until the user changes them
+DEFAULT_SETTINGS = {
+    'speed': 1,
+    'maxLayers': 4,
+    'volume': 50,
+    'isWhiteBackground': False,
+    'isPlaying': True,  # Animation playing state
+    'gallery': {
+        'brightness': 100,
+        'contrast': 100,
+        'saturation': 100,
+        'whiteBalance': 100,
+        'textureIntensity': 0
+    }
+}
+
+# Favorites listing page sizes
+FAVORITES_PAGE_SIZE = 50
+FAVORITES_MAX_PAGE_SIZE = 200
+
+def websocket_supported(environ):
+    """
+    Whether the WSGI server behind environ can hand its socket over for a
+    WebSocket (the servers simple-websocket supports). waitress cannot.
+    """
+    if Sock is None:
+        return False
+    return (any(key in environ for key in ('werkzeug.socket', 'gunicorn.socket', 'eventlet.input'))
+            or environ.get('SERVER_SOFTWARE', '').startswith('gevent'))
+
+# Layout of the startup data embedded in the display pages; static/js/utils/Bootstrap.js
+# ignores payloads with another version and fetches everything from the API instead
+BOOTSTRAP_VERSION = 1
+
+BASE36_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def to_base36(number):
+    """number in base 36, as JavaScript's Number.toString(36) writes it."""
+    digits = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        digits = BASE36_DIGITS[remainder] + digits
+        if number == 0:
+            return digits
+
+
+def generate_pattern_seed():
+    """A random pattern seed in the form PatternManager.generateSeed() makes (time plus 5 random characters)."""
+    return to_base36(int(time.time() * 1000)) + to_base36(uuid.uuid4().int)[:5]
+
+def record_stage_time(timings, stage, started):
+    """Add the time elapsed since started to timings[stage], if timings are being collected."""
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - started)
+
+def composite_favorite_layers(favorite_data, canvas_size=HIGHRES_CANVAS_SIZE, image_dir=None, timings=None):
+    """
+    Recreate the artwork from the saved layer states, transformations, and
+    opacity values on a canvas of canvas_size. Positions and sizes are scaled
+    proportionally from the 1920x1080 reference canvas, and source images are
+    downscaled before transforming so small renders stay cheap.
+    Pass a dict as timings to collect per-stage seconds (decode, transform,
+    color, composite).
+    Returns an RGB PIL image, or None if there is nothing to render.
+    """
+    from PIL import Image
+    
+    state = favorite_data.get('state', {})
+    layers = state.get('layers', [])
+    background_color = state.get('backgroundColor', 'black')
+    
+    if not layers:
+        print("No layers found in state data")
+        return None
+    
+    canvas_width, canvas_height = canvas_size
+    render_scale = canvas_width / HIGHRES_CANVAS_SIZE[0]
+    
+    # Create canvas with background color
+    bg_color = (255, 255, 255, 255) if background_color == 'white' else (0, 0, 0, 255)
+    canvas = Image.new('RGBA', canvas_size, bg_color)
+    
+    # Load image directory
+    image_dir = Path(image_dir or 'static/images')
+    if not image_dir.exists():
+        print(f"Image directory not found: {image_dir}")
+        return None
+    
+    print(f"Processing {len(layers)} layers at {canvas_width}x{canvas_height}...")
+    
+    # Process each layer in order
+    for i, layer_data in enumerate(layers):
+        try:
+            image_id = layer_data.get('imageId')
+            opacity = layer_data.get('opacity', 1.0)
+            transformations = layer_data.get('transformations', {})
+            
+            print(f"Processing layer {i+1}: imageId={image_id}, opacity={opacity}")
+            
+            # Find the actual image file by matching the image ID
+            image_file = find_image_by_id(image_dir, image_id)
+            if not image_file:
+                print(f"Image file not found for ID: {image_id}")
+                continue
+            
+            print(f"Loading image: {image_file}")
+            
+            # Load the source image
+            started = time.perf_counter()
+            try:
+                source_image = Image.open(image_file).convert('RGBA')
+            except Exception as e:
+                print(f"Failed to load image {image_file}: {e}")
+                continue
+            record_stage_time(timings, 'decode', started)
+            
+            # Shrink the source up front for reduced-size renders
+            started = time.perf_counter()
+            if render_scale < 1.0:
+                reduced_size = (max(1, round(source_image.width * render_scale)),
+                                max(1, round(source_image.height * render_scale)))
+                source_image = source_image.resize(reduced_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+                transformations = {
+                    **transformations,
+                    'translateX': transformations.get('translateX', 0) * render_scale,
+                    'translateY': transformations.get('translateY', 0) * render_scale
+                }
+            
+            record_stage_time(timings, 'transform', started)
+            
+            # Apply transformations to recreate the exact layer state
+            layer_image = apply_transformations(source_image, transformations, canvas_size, Image, timings)
+            
+            # Apply opacity
+            started = time.perf_counter()
+            if opacity < 1.0:
+                # Create an alpha mask based on opacity
+                alpha = layer_image.split()[-1]  # Get alpha channel
+                alpha = alpha.point(lambda p: int(p * opacity))
+                layer_image.putalpha(alpha)
+            
+            # Composite this layer onto the canvas
+            canvas = Image.alpha_composite(canvas, layer_image)
+            record_stage_time(timings, 'composite', started)
+            print(f"Layer {i+1} composited successfully")
+            
+        except Exception as e:
+            print(f"Error processing layer {i+1}: {e}")
+            continue
+    
+    # Convert to RGB for final output
+    return canvas.convert('RGB')
+
+def generate_highres_from_favorite(favorite_data, image_dir=None, timings=None):
     """
     Generate a true high-resolution (1920x1080) image by recreating the artwork 
     from the saved layer states, transformations, and opacity values.
+    Pass a dict as timings to collect per-stage seconds, including encode.
     """
     try:
-        from PIL import Image, ImageDraw, ImageEnhance, ImageOps
         import io
         
         print(f"Generating high-res image from favorite state data...")
         
-        state = favorite_data.get('state', {})
-        layers = state.get('layers', [])
-        background_color = state.get('backgroundColor', 'black')
-        
-        if not layers:
-            print("No layers found in state data")
-            return None
-        
-        # Create 1920x1080 canvas
-        canvas = Image.new('RGBA', (1920, 1080), (0, 0, 0, 0))
-        
-        # Set background color
-        bg_color = (255, 255, 255, 255) if background_color == 'white' else (0, 0, 0, 255)
-        background = Image.new('RGBA', (1920, 1080), bg_color)
-        canvas = Image.alpha_composite(background, canvas)
-        
-        # Load image directory
-        image_dir = Path('static/images')
-        if not image_dir.exists():
-            print(f"Image directory not found: {image_dir}")
+        final_image = composite_favorite_layers(favorite_data, HIGHRES_CANVAS_SIZE, image_dir, timings)
+        if final_image is None:
             return None
         
-        print(f"Processing {len(layers)} layers...")
-        
-        # Process each layer in order
-        for i, layer_data in enumerate(layers):
-            try:
-                image_id = layer_data.get('imageId')
-                opacity = layer_data.get('opacity', 1.0)
-                transformations = layer_data.get('transformations', {})
-                
-                print(f"Processing layer {i+1}: imageId={image_id}, opacity={opacity}")
-                
-                # Find the actual image file by matching the image ID
-                image_file = find_image_by_id(image_dir, image_id)
-                if not image_file:
-                    print(f"Image file not found for ID: {image_id}")
-                    continue
-                
-                print(f"Loading image: {image_file}")
-                
-                # Load the source image
-                try:
-                    source_image = Image.open(image_file).convert('RGBA')
-                except Exception as e:
-                    print(f"Failed to load image {image_file}: {e}")
-                    continue
-                
-                # Apply transformations to recreate the exact layer state
-                layer_image = apply_transformations(source_image, transformations, (1920, 1080), Image)
-                
-                # Apply opacity
-                if opacity < 1.0:
-                    # Create an alpha mask based on opacity
-                    alpha = layer_image.split()[-1]  # Get alpha channel
-                    alpha = alpha.point(lambda p: int(p * opacity))
-                    layer_image.putalpha(alpha)
-                
-                # Composite this layer onto the canvas
-                canvas = Image.alpha_composite(canvas, layer_image)
-                print(f"Layer {i+1} composited successfully")
-                
-            except Exception as e:
-                print(f"Error processing layer {i+1}: {e}")
-                continue
-        
-        # Convert to RGB for final output
-        final_image = Image.new('RGB', (1920, 1080), bg_color[:3])
-        final_image = Image.alpha_composite(Image.new('RGBA', (1920, 1080), bg_color), canvas)
-        final_image = final_image.convert('RGB')
-        
         # Save to bytes with high quality
+        started = time.perf_counter()
         output_buffer = io.BytesIO()
         final_image.save(output_buffer, format='PNG', optimize=True, compress_level=1)
         output_buffer.seek(0)
+        record_stage_time(timings, 'encode', started)
         
         print("High-resolution image generated successfully")
         return output_buffer.read()
@@ -114,6 +225,35 @@ def generate_highres_from_favorite(favorite_data):
         traceback.print_exc()
         return None
 
+def generate_thumbnail_from_favorite(favorite_data, size=THUMBNAIL_SIZE):
+    """
+    Render a small square PNG preview from the saved layer states, using the
+    high-res compositing code at low resolution. The 16:9 artwork is centered
+    on the background color, matching the kiosk's old canvas thumbnails.
+    Returns PNG bytes, or None if rendering fails.
+    """
+    try:
+        from PIL import Image
+        import io
+        
+        canvas_size = (size, round(size * HIGHRES_CANVAS_SIZE[1] / HIGHRES_CANVAS_SIZE[0]))
+        artwork = composite_favorite_layers(favorite_data, canvas_size)
+        if artwork is None:
+            return None
+        
+        background_color = favorite_data.get('state', {}).get('backgroundColor', 'black')
+        bg_color = (255, 255, 255) if background_color == 'white' else (0, 0, 0)
+        thumbnail = Image.new('RGB', (size, size), bg_color)
+        thumbnail.paste(artwork, (0, (size - artwork.height) // 2))
+        
+        output_buffer = io.BytesIO()
+        thumbnail.save(output_buffer, format='PNG', optimize=True)
+        return output_buffer.getvalue()
+        
+    except Exception as e:
+        print(f"Error generating thumbnail: {e}")
+        return None
+
 def find_image_by_id(image_dir, image_id):
     """Find the actual image file that corresponds to the given image ID."""
     try:
@@ -128,7 +268,7 @@ def find_image_by_id(image_dir, image_id):
         print(f"Error finding image by ID {image_id}: {e}")
         return None
 
-def apply_transformations(image, transformations, canvas_size, Image):
+def apply_transformations(image, transformations, canvas_size, Image, timings=None):
     """Apply transformations to recreate the exact layer positioning and effects."""
     try:
         canvas_width, canvas_height = canvas_size
@@ -144,9 +284,12 @@ def apply_transformations(image, transformations, canvas_size, Image):
         
         # Apply hue shift if needed
         if hue_shift != 0:
+            started = time.perf_counter()
             image = apply_hue_shift(image, hue_shift, Image)
+            record_stage_time(timings, 'color', started)
         
         # Calculate the scaled size
+        started = time.perf_counter()
         original_width, original_height = image.size
         new_width = int(original_width * scale)
         new_height = int(original_height * scale)
@@ -177,6 +320,7 @@ def apply_transformations(image, transformations, canvas_size, Image):
         if paste_x < canvas_width and paste_y < canvas_height and paste_x + final_width > 0 and paste_y + final_height > 0:
             positioned_image.paste(image, (paste_x, paste_y), image)
         
+        record_stage_time(timings, 'transform', started)
         return positioned_image
         
     except Exception as e:
@@ -237,6 +381,148 @@ def cleanup_cache(cache_dir, max_age_hours=24):
     except Exception as e:
         print(f"Error during cache cleanup: {e}")
 
+# High-resolution renders are cached on disk for 24 hours
+HIGHRES_CACHE_DIR = 'cache/favorites'
+HIGHRES_CACHE_MAX_AGE = 86400
+
+def get_highres_cache_file(favorite_id):
+    """Path of the cached 1920x1080 render for a favorite."""
+    return Path(HIGHRES_CACHE_DIR) / f'{favorite_id}_1920x1080.png'
+
+def is_cache_file_valid(cache_file, max_age_seconds=HIGHRES_CACHE_MAX_AGE):
+    """Check that a cache file exists and is younger than max_age_seconds."""
+    try:
+        return time.time() - cache_file.stat().st_mtime < max_age_seconds
+    except OSError:
+        return False
+
+def record_render_metrics(metrics, cache_hit, timings=None):
+    """Count a high-res cache lookup and add per-stage render seconds to metrics, if collecting."""
+    if metrics is None:
+        return
+    metrics.inc('manypaintings_render_cache_requests_total', {'result': 'hit' if cache_hit else 'miss'})
+    for stage, seconds in (timings or {}).items():
+        metrics.observe('manypaintings_render_stage_seconds', seconds, {'stage': stage})
+
+def render_favorite_to_cache(favorite_id, favorite_data, metrics=None):
+    """
+    Return the path of a valid high-res render for the favorite, generating
+    and caching it first if needed. Returns None if rendering fails. Pass
+    metrics to record the cache lookup and render stage timings.
+    """
+    cache_file = get_highres_cache_file(favorite_id)
+    if is_cache_file_valid(cache_file):
+        record_render_metrics(metrics, True)
+        return cache_file
+    
+    timings = {} if metrics is not None else None
+    highres_image = generate_highres_from_favorite(favorite_data, timings=timings)
+    record_render_metrics(metrics, False, timings)
+    if not highres_image:
+        return None
+    
+    # Write to a temp file and rename so concurrent readers never see a partial PNG
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = cache_file.with_name(f'{cache_file.name}.{uuid.uuid4().hex}.tmp')
+    with open(temp_file, 'wb') as f:
+        f.write(highres_image)
+    os.replace(temp_file, cache_file)
+    return cache_file
+
+class ZipStreamBuffer:
+    """Write-only file object that lets zipfile write into a streamed response."""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        """Return and clear everything written since the last drain."""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def stream_favorites_zip(favorites, max_workers=None, metrics=None):
+    """
+    Render favorites on a worker pool and yield a ZIP archive incrementally.
+    
+    Each render is added to the archive as soon as it finishes, so the download
+    starts immediately. Renders go through the high-res disk cache, which keeps
+    memory flat and reuses any still-valid cached images.
+    """
+    if max_workers is None:
+        max_workers = min(4, os.cpu_count() or 1)
+    
+    buffer = ZipStreamBuffer()
+    failed = []
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    
+    try:
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+            pending = {}
+            queue = iter(favorites.items())
+            
+            def submit_next():
+                for favorite_id, favorite_data in queue:
+                    future = executor.submit(render_favorite_to_cache, favorite_id, favorite_data, metrics)
+                    pending[future] = favorite_id
+                    return
+            
+            # Only keep max_workers renders in flight so finished files never pile up
+            for _ in range(max_workers):
+                submit_next()
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    favorite_id = pending.pop(future)
+                    try:
+                        cache_file = future.result()
+                    except Exception as e:
+                        print(f"Error rendering favorite {favorite_id} for export: {e}")
+                        cache_file = None
+                    
+                    if cache_file:
+                        archive.write(cache_file, arcname=f'painting_{favorite_id}.png')
+                    else:
+                        failed.append(favorite_id)
+                    
+                    submit_next()
+                    yield buffer.drain()
+            
+            if failed:
+                archive.writestr('export_errors.txt', 'Failed to render:\n' + '\n'.join(failed) + '\n')
+        
+        yield buffer.drain()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+# Event buses told about reloads of each config object. The config objects are
+# module-level singletons shared by every app, so each gets one listener, and an
+# app's bus drops out of its set when the app is garbage collected.
+_config_event_buses = {}
+_config_event_buses_lock = threading.Lock()
+
+
+def publish_config_reloads(config_obj, event_bus):
+    """Publish a 'config' event on event_bus whenever config_obj reloads with changes."""
+    with _config_event_buses_lock:
+        buses = _config_event_buses.get(config_obj)
+        if buses is None:
+            buses = _config_event_buses[config_obj] = weakref.WeakSet()
+            
+            def publish(snapshot):
+                for bus in list(buses):
+                    bus.publish('config', {'version': snapshot.version, 'etag': snapshot.etag})
+            config_obj.add_listener(publish)
+        buses.add(event_bus)
+
 def create_app(config_name=None):
     if config_name is None:
         config_name = os.environ.get('FLASK_CONFIG', 'default')
@@ -244,30 +530,355 @@ def create_app(config_name=None):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
+    # Typed display events (settings, patterns, favorites, play/pause, image refresh) pushed over /api/events
+    from utils.event_bus import EventBus, format_sse
+    event_bus = EventBus()
+    app.extensions['event_bus'] = event_bus
+    
+    # Display commands, read and acknowledged by each display with its own cursor
+    from utils.command_log import CommandLog
+    command_log = CommandLog(capacity=app.config.get('COMMAND_LOG_SIZE', 256))
+    app.extensions['command_log'] = command_log
+    for consumer_id in LEGACY_COMMAND_CONSUMERS.values():
+        command_log.register(consumer_id, expires=False)
+    
+    # Main and kiosk browsers, their last reported state, and whether they are still online
+    from utils.display_registry import DisplayRegistry
+    display_registry = DisplayRegistry(ttl=app.config.get('DISPLAY_TTL_SECONDS', 60))
+    app.extensions['display_registry'] = display_registry
+    
+    # Per-minute frame-timing reports from displays, summarized at /api/telemetry
+    from utils.frame_telemetry import FrameTelemetry
+    frame_telemetry = FrameTelemetry(max_reports=app.config.get('TELEMETRY_MAX_REPORTS', 1440))
+    app.extensions['frame_telemetry'] = frame_telemetry
+    
+    # Remote control sessions; displays are told when the number of active remotes changes
+    from utils.session_registry import SessionRegistry
+    remote_sessions = SessionRegistry(
+        ttl=app.config.get('REMOTE_SESSION_TTL_SECONDS', 35),
+        on_change=lambda count: event_bus.publish('remotes', {'active_remotes': count})
+    )
+    app.extensions['remote_sessions'] = remote_sessions
+    
+    # config.json is checked by one background thread; displays are told when a reload changes it
+    config_obj = config[config_name or 'default']
+    publish_config_reloads(config_obj, event_bus)
+    if app.config.get('CONFIG_WATCH_INTERVAL_SECONDS', 2) > 0:
+        config_obj.start_watching(app.config.get('CONFIG_WATCH_INTERVAL_SECONDS', 2))
+    
+    # CPU temperature sampled in the background; displays step quality down while it runs hot
+    from utils.thermal_governor import ThermalGovernor, DEFAULT_LEVELS, read_cpu_temperature, sensor_available
+    thermal_config = app.config.get('THERMAL_GOVERNOR', {})
+    thermal_governor = ThermalGovernor(
+        levels=thermal_config.get('levels', DEFAULT_LEVELS),
+        hysteresis=thermal_config.get('hysteresis_c', 5),
+        on_change=lambda state: event_bus.publish('thermal', state)
+    )
+    app.extensions['thermal_governor'] = thermal_governor
+    if thermal_config.get('enabled', True) and sensor_available():
+        thermal_governor.start(thermal_config.get('sample_interval_sec', 5))
+    
+    # Request timings and internal counters, exposed at /api/metrics
+    from utils.metrics import Metrics, SIZE_BUCKETS, PROMETHEUS_CONTENT_TYPE
+    metrics = Metrics()
+    app.extensions['metrics'] = metrics
+    metrics.describe('manypaintings_http_requests_total', 'counter', 'HTTP requests by route, method and status.')
+    metrics.describe('manypaintings_http_request_duration_seconds', 'histogram', 'Time to produce a response (streams: until the first byte).')
+    metrics.describe('manypaintings_http_response_size_bytes', 'histogram', 'Response body sizes, where known up front.', SIZE_BUCKETS)
+    metrics.describe('manypaintings_http_requests_in_flight', 'gauge', 'Requests being handled, including open event streams.')
+    metrics.describe('manypaintings_catalog_scan_seconds', 'histogram', 'Time to scan the image directory.')
+    metrics.describe('manypaintings_render_stage_seconds', 'histogram', 'High-res render time per stage (decode, transform, color, composite, encode).')
+    metrics.describe('manypaintings_render_cache_requests_total', 'counter', 'High-res render cache lookups by result.')
+    metrics.describe('manypaintings_settings_writes_total', 'counter', 'Writes of settings.json.')
+    metrics.describe('manypaintings_settings_version', 'gauge', 'Current settings version.')
+    metrics.describe('manypaintings_settings_updates_total', 'counter', 'Settings updates by outcome (applied at once or merged into a later change).')
+    metrics.describe('manypaintings_active_remotes', 'gauge', 'Remote controls with an active session.')
+    metrics.describe('manypaintings_displays_online', 'gauge', 'Registered displays that reported recently.')
+    metrics.describe('manypaintings_cpu_temperature_celsius', 'gauge', 'Last CPU temperature read by the thermal governor.')
+    metrics.describe('manypaintings_thermal_level', 'gauge', 'Thermal governor level (0 when not throttling).')
+    metrics.describe('manypaintings_thermal_level_changes_total', 'counter', 'Thermal governor level changes.')
+    
+    def collect_app_metrics():
+        store = get_settings_store()
+        thermal = thermal_governor.state()
+        collected = [
+            ('manypaintings_settings_writes_total', None, store.write_count),
+            ('manypaintings_settings_version', None, store.version),
+            ('manypaintings_settings_updates_total', {'outcome': 'applied'}, settings_coalescer.applied_count),
+            ('manypaintings_settings_updates_total', {'outcome': 'merged'}, settings_coalescer.merged_count),
+            ('manypaintings_active_remotes', None, remote_sessions.count()),
+            ('manypaintings_displays_online', None, len(display_registry.list())),
+            ('manypaintings_thermal_level', None, thermal['level']),
+            ('manypaintings_thermal_level_changes_total', None, thermal['changes'])
+        ]
+        if thermal['temperature'] is not None:
+            collected.append(('manypaintings_cpu_temperature_celsius', None, thermal['temperature']))
+        return collected
+    metrics.add_collector(collect_app_metrics)
+    
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        metrics.inc('manypaintings_http_requests_in_flight')
+    
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('request_started')
+        if started is not None:
+            # Route templates keep label counts bounded (unmatched URLs share one label)
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            labels = {'method': request.method, 'route': route}
+            metrics.observe('manypaintings_http_request_duration_seconds', time.perf_counter() - started, labels)
+            metrics.inc('manypaintings_http_requests_total', {**labels, 'status': str(response.status_code)})
+            if response.content_length is not None:
+                metrics.observe('manypaintings_http_response_size_bytes', response.content_length, labels)
+        return response
+    
+    @app.teardown_request
+    def finish_request_timer(error=None):
+        # Runs when streamed responses finish, so open event streams count as in flight
+        if g.pop('request_started', None) is not None:
+            metrics.inc('manypaintings_http_requests_in_flight', amount=-1)
+    
+    # On-demand CPU profiling through /api/debug/profile; idle unless a capture is running
+    from utils.profiler import Profiler
+    profiler = Profiler()
+    app.extensions['profiler'] = profiler
+    
+    @app.before_request
+    def start_request_profile():
+        if profiler.capturing:
+            g.request_profile = profiler.start_request()
+    
+    @app.teardown_request
+    def finish_request_profile(error=None):
+        request_profile = g.pop('request_profile', None)
+        if request_profile is not None:
+            profiler.finish_request(request_profile)
+    
+    # tracemalloc snapshots through /api/debug/memory; tracing stays off until started
+    from utils.memory_tracker import MemoryTracker, process_memory, gc_stats
+    memory_tracker = MemoryTracker()
+    app.extensions['memory_tracker'] = memory_tracker
+    
+    def internal_cache_sizes():
+        """Entry counts of the in-memory structures that grow with use."""
+        highres_files = list(Path(HIGHRES_CACHE_DIR).glob('*.png')) if os.path.isdir(HIGHRES_CACHE_DIR) else []
+        return {
+            'event_history': len(event_bus),
+            'command_log': len(command_log),
+            'command_consumers': len(command_log.consumers()),
+            'displays': len(display_registry),
+            'telemetry_reports': len(frame_telemetry),
+            'remote_sessions': remote_sessions.count(),
+            'pending_settings_changes': len(settings_coalescer.pending()),
+            'metric_series': len(metrics),
+            'highres_cache_files': len(highres_files),
+            'highres_cache_bytes': sum(path.stat().st_size for path in highres_files)
+        }
+    
+    def debug_access_allowed():
+        """Debug endpoints answer local requests, or remote ones carrying the configured debug token."""
+        if request.remote_addr in ('127.0.0.1', '::1'):
+            return True
+        token = app.config.get('DEBUG_TOKEN')
+        return bool(token) and hmac.compare_digest(request.headers.get('X-Debug-Token', ''), token)
+    
+    def get_favorites_store():
+        """Favorites store for the configured database (relative paths follow the working directory)."""
+        from utils.favorites_store import get_favorites_store as get_store
+        return get_store(app.config.get('FAVORITES_DATABASE', 'favorites.db'))
+    
+    def with_thumbnail_url(favorite):
+        """Replace a favorite's stored thumbnail file name with its cacheable URL."""
+        favorite = dict(favorite)
+        if 'thumbnail_file' in favorite:
+            thumbnail_file = favorite.pop('thumbnail_file')
+            favorite['thumbnail'] = f'/api/thumbnails/{thumbnail_file}' if thumbnail_file else None
+        return favorite
+    
+    def get_debug_log():
+        """Background writer for debug.log in the working directory, rotated by size."""
+        from utils.log_writer import get_log_writer
+        return get_log_writer(
+            'debug.log',
+            max_bytes=app.config.get('DEBUG_LOG_MAX_BYTES', 1024 * 1024),
+            backup_count=app.config.get('DEBUG_LOG_BACKUPS', 3)
+        )
+    
+    def get_settings_store():
+        """Shared in-memory settings for settings.json in the working directory."""
+        from utils.settings_store import get_settings_store as get_store
+        return get_store('settings.json', DEFAULT_SETTINGS, app.config.get('SETTINGS_SAVE_DELAY_SECONDS', 0.5))
+    
+    def load_settings():
+        """Current settings merged over the defaults."""
+        settings, _ = get_settings_store().snapshot()
+        return settings
+    
+    def commit_settings_update(update_data, source=None):
+        """Apply a (possibly merged) settings update as one new version and publish it to displays."""
+        def publish(settings, version):
+            event_bus.publish('settings', {'settings': settings, 'version': version, 'source': source})
+        
+        updated_settings, _ = get_settings_store().update(update_data, on_change=publish)
+        return updated_settings
+    
+    # Slider drags send many updates a second; each burst becomes one version per window
+    from utils.settings_store import merge_settings
+    from utils.settings_coalescer import SettingsCoalescer
+    settings_coalescer = SettingsCoalescer(
+        commit_settings_update,
+        window=app.config.get('SETTINGS_COALESCE_WINDOW_SECONDS', 0.2)
+    )
+    app.extensions['settings_coalescer'] = settings_coalescer
+    
+    def apply_settings_update(update_data, source=None):
+        """
+        Merge a partial settings update and publish it to displays. source
+        identifies the sender so it can ignore its own echo. Updates arriving
+        in quick succession are merged and applied together at the end of the
+        coalescing window. Returns the settings as they will be once applied;
+        they reach settings.json after a short debounce.
+        """
+        updated_settings, applied = settings_coalescer.submit(update_data, source)
+        if not applied:
+            updated_settings = merge_settings(load_settings(), settings_coalescer.pending())
+        return updated_settings
+    
+    def request_new_pattern(target=None):
+        """Ask displays (or one display) for a new pattern."""
+        issue_command('new-pattern', target=target)
+        if target is None:
+            # Store the new pattern request timestamp so polling RemoteSync clients can detect it
+            get_settings_store().update({'newPatternRequest': time.time()})
+    
+    def issue_command(command_type, data=None, target=None):
+        """
+        Append a command to the log and push it to subscribed displays. target
+        is a registered display ID, or None for all displays. Returns the log
+        entry; raises ValueError for an unknown target.
+        """
+        if target is not None and display_registry.get(target) is None:
+            raise ValueError('Display not found')
+        entry = command_log.append(command_type, data, target)
+        event = {**entry['data'], 'seq': entry['seq']}
+        if target is not None:
+            event['target'] = target
+        event_bus.publish(command_type, event)
+        return entry
+    
+    def command_target():
+        """Display a REST command is aimed at (?display_id= or a JSON display_id), or None for all."""
+        data = request.get_json(silent=True) or {}
+        return request.args.get('display_id') or data.get('display_id') or None
+    
+    def request_load_favorite(favorite_id, target=None):
+        """Ask displays to load a favorite. Returns False if it does not exist."""
+        if get_favorites_store().get(favorite_id) is None:
+            return False
+        issue_command('load-favorite', {'favorite_id': favorite_id}, target)
+        return True
+    
+    def request_save_favorite(target=None):
+        """Ask displays to save their current state as a favorite."""
+        issue_command('save-favorite', target=target)
+    
+    def request_play_pause(target=None):
+        """Ask displays to toggle play/pause."""
+        issue_command('play-pause', {'action': 'toggle'}, target)
+    
+    def take_legacy_command(command_type, acknowledge=True):
+        """Latest pending command of one type for the check-* endpoints (older displays), or None."""
+        consumer_id = LEGACY_COMMAND_CONSUMERS[command_type]
+        commands, _ = command_log.read(consumer_id, command_type)
+        if not commands:
+            return None
+        if acknowledge:
+            command_log.ack(consumer_id, commands[-1]['seq'])
+        return commands[-1]
+    
+    def build_bootstrap():
+        """
+        Everything a display fetches before its first layer (config, image
+        catalog, settings and the initial pattern seed), embedded in the page
+        so a cold start does not wait on one API round trip after another.
+        The ETags let the displays' first polls be answered with a 304.
+        """
+        snapshot = config_obj.snapshot()
+        settings_store = get_settings_store()
+        settings, settings_version = settings_store.snapshot()
+        try:
+            catalog = load_image_catalog()
+        except Exception as e:
+            # The display fetches /api/images itself and reports the error there
+            print(f"Warning: Could not embed image catalog: {e}")
+            catalog = None
+        
+        initial_pattern_code = snapshot.data.get('application', {}).get('initial_pattern_code')
+        return {
+            'version': BOOTSTRAP_VERSION,
+            # snapshot.data is read-only and not JSON-serializable, so the page gets its own copy
+            'config': json.loads(snapshot.body),
+            'config_etag': quote_etag(snapshot.etag),
+            'images': catalog,
+            'settings': settings,
+            'settings_etag': quote_etag(settings_store.etag(settings_version)),
+            'pattern': {
+                'initial_pattern_code': initial_pattern_code,
+                'seed': initial_pattern_code or generate_pattern_seed()
+            }
+        }
+    
+    def initial_preload_paths(bootstrap):
+        """
+        Paths of the images a display preloads first for the bootstrap's
+        pattern: the distinct images among the first preload_buffer_size of
+        the sequence PatternManager.js will generate from the same seed.
+        """
+        from utils.pattern_sequence import generate_sequence
+        
+        catalog = bootstrap['images']
+        if not catalog or not catalog.get('images'):
+            return []
+        paths = {img['id']: img.get('path') for img in catalog['images']}
+        depth = bootstrap['config'].get('application', {}).get('preload_buffer_size', 5)
+        sequence = generate_sequence(bootstrap['pattern']['seed'], list(paths))
+        return [paths[image_id] for image_id in dict.fromkeys(sequence[:depth]) if paths[image_id]]
+    
+    def render_display_page(template):
+        """Render the main or kiosk page with its bootstrap data and preload hints for the first images."""
+        # The embedded config is the watcher's current snapshot, so page loads never touch config.json
+        bootstrap = build_bootstrap()
+        preload_paths = initial_preload_paths(bootstrap)
+        response = app.make_response(render_template(template, config=app.config, bootstrap=bootstrap,
+                                                     preload_images=preload_paths))
+        # The page carries current settings and a fresh seed, so it is never reused
+        response.headers['Cache-Control'] = 'no-store'
+        if preload_paths:
+            # Lets the browser (or a proxy) start on the images before it has parsed the page
+            response.headers['Link'] = ', '.join(f'<{quote(path)}>; rel=preload; as=image' for path in preload_paths)
+        return response
+    
     @app.route('/')
     def index():
-        # Check for config changes on page load
-        config_obj = config[config_name or 'default']
-        config_obj.check_and_reload()
-        app.config.from_object(config_obj)
-        return render_template('index.html', config=app.config)
+        return render_display_page('index.html')
     
     @app.route('/kiosk')
     def kiosk():
-        # Check for config changes on page load
-        config_obj = config[config_name or 'default']
-        config_obj.check_and_reload()
-        app.config.from_object(config_obj)
-        return render_template('kiosk.html', config=app.config)
+        return render_display_page('kiosk.html')
     
     @app.route('/remote')
     def remote():
-        # iPhone remote control interface
-        # Check for config changes on page load
-        config_obj = config[config_name or 'default']
-        config_obj.check_and_reload()
-        app.config.from_object(config_obj)
-        return render_template('remote.html', config=app.config)
+        # iPhone remote control interface (its config comes from /api/config, kept current by the watcher)
+        # The page is served by the same server as /api/control, so it knows whether to try the WebSocket
+        return render_template('remote.html', config=app.config,
+                               control_websocket=websocket_supported(request.environ))
+    
+    @app.route('/api/metrics')
+    def get_metrics():
+        """Request, render, cache and settings metrics in the Prometheus text format."""
+        return Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
     
     @app.route('/health')
     def health():
@@ -283,14 +894,21 @@ def create_app(config_name=None):
         return send_from_directory('static', 'service-worker.js', mimetype='application/javascript')
     
     
-    @app.route('/api/images')
-    def get_images():
+    def load_image_catalog():
+        """Scan the image directory (recording how long it took) and return the catalog."""
         from utils.image_manager import ImageManager
         
+        started = time.perf_counter()
+        # Pass the full app config as base config for per-image overrides
+        image_manager = ImageManager(app.config['IMAGE_DIRECTORY'], base_config=dict(app.config))
+        catalog = image_manager.get_image_catalog()
+        metrics.observe('manypaintings_catalog_scan_seconds', time.perf_counter() - started)
+        return catalog
+    
+    @app.route('/api/images')
+    def get_images():
         try:
-            # Pass the full app config as base config for per-image overrides
-            image_manager = ImageManager(app.config['IMAGE_DIRECTORY'], base_config=dict(app.config))
-            catalog = image_manager.get_image_catalog()
+            catalog = load_image_catalog()
             
             # Add cache headers for performance, but not if cache-busting timestamp is present
             response = jsonify(catalog)
@@ -308,37 +926,18 @@ def create_app(config_name=None):
     
     @app.route('/api/pattern/<seed>')
     def get_pattern(seed):
-        """Generate a deterministic pattern sequence from a seed."""
-        from utils.image_manager import ImageManager
-        import hashlib
+        """Generate a deterministic pattern sequence from a seed (the same one displays show)."""
+        from utils.pattern_sequence import generate_sequence
         
         try:
             # Get available images
-            image_manager = ImageManager(app.config['IMAGE_DIRECTORY'], base_config=dict(app.config))
-            catalog = image_manager.get_image_catalog()
+            catalog = load_image_catalog()
             
             if not catalog['images']:
                 return jsonify({'error': 'No images available'}), 400
             
-            # Generate deterministic sequence
-            pattern_length = 100  # Default pattern length
             image_ids = [img['id'] for img in catalog['images']]
-            image_ids.sort()  # Ensure consistent ordering
-            
-            # Create seeded random number generator
-            seed_hash = int(hashlib.md5(seed.encode()).hexdigest(), 16) % (2**32)
-            
-            # Simple linear congruential generator for deterministic results
-            def seeded_random():
-                nonlocal seed_hash
-                seed_hash = (seed_hash * 1664525 + 1013904223) % (2**32)
-                return seed_hash / (2**32)
-            
-            # Generate sequence
-            pattern = []
-            for i in range(pattern_length):
-                random_index = int(seeded_random() * len(image_ids))
-                pattern.append(image_ids[random_index])
+            pattern = generate_sequence(seed, image_ids)
             
             return jsonify({
                 'pattern': pattern,
@@ -352,20 +951,20 @@ def create_app(config_name=None):
     
     @app.route('/api/config')
     def get_config():
-        """Get application configuration - returns JSON config directly."""
-        # Check for config changes before serving config
-        config_obj = config[config_name or 'default']
-        config_obj.check_and_reload()
+        """Get application configuration - returns JSON config directly (304 when If-None-Match matches)."""
+        # The background watcher keeps the snapshot current, so serving it never touches the file
+        snapshot = config_obj.snapshot()
         
-        # Return the raw JSON configuration data directly
-        config_data = config_obj._config_data
-        
-        response = jsonify(config_data)
-        if config_data.get('application', {}).get('enable_caching', True):
-            cache_max_age = config_data.get('application', {}).get('cache_max_age', 3600)
-            response.headers['Cache-Control'] = f'public, max-age={cache_max_age}'
+        response = app.response_class(snapshot.body, mimetype='application/json')
+        response.set_etag(snapshot.etag)
+        response.headers['X-Config-Version'] = str(snapshot.version)
+        if snapshot.data.get('application', {}).get('enable_caching', True):
+            # Clients keep the body but revalidate, which is a 304 until the config changes
+            response.headers['Cache-Control'] = 'no-cache'
+        else:
+            response.headers['Cache-Control'] = 'no-store'
         
-        return response
+        return response.make_conditional(request)
     
     @app.route('/api/favorites', methods=['POST'])
     def save_favorite():
@@ -393,34 +992,23 @@ def create_app(config_name=None):
             # Generate a unique ID for this favorite
             favorite_id = str(uuid.uuid4())
             
-            # Add metadata including thumbnail
+            # Add metadata
             favorite_data = {
                 'id': favorite_id,
                 'created_at': datetime.now().isoformat(),
-                'state': state_data,
-                'thumbnail': thumbnail_data  # Store base64 thumbnail data
+                'state': state_data
             }
             
-            # Load existing favorites or create new file
-            favorites_file = 'favorites.json'
-            favorites = {}
-            
-            if os.path.exists(favorites_file):
-                try:
-                    with open(favorites_file, 'r') as f:
-                        favorites = json.load(f)
-                except (json.JSONDecodeError, IOError) as e:
-                    print(f"Warning: Could not load existing favorites: {e}")
-                    favorites = {}
-            
-            # Add new favorite
-            favorites[favorite_id] = favorite_data
-            
-            # Save back to file
+            # Store only this favorite's row; the thumbnail is decoded once into a shared blob file
             try:
-                with open(favorites_file, 'w') as f:
-                    json.dump(favorites, f, indent=2)
-            except IOError as e:
+                store = get_favorites_store()
+                # Stored by save itself, so a concurrent delete can't remove a shared file first
+                if thumbnail_data:
+                    store.save({**favorite_data, 'thumbnail': thumbnail_data})
+                else:
+                    # Render the thumbnail from layer state unless the client supplied one
+                    store.save(favorite_data, thumbnail_bytes=generate_thumbnail_from_favorite(favorite_data))
+            except (sqlite3.Error, OSError) as e:
                 return jsonify({'error': f'Failed to save favorite: {str(e)}'}), 500
             
             return jsonify({
@@ -436,23 +1024,15 @@ def create_app(config_name=None):
     def get_favorite(favorite_id):
         """Retrieve a saved favorite by ID."""
         try:
-            favorites_file = 'favorites.json'
-            
-            if not os.path.exists(favorites_file):
-                return jsonify({'error': 'No favorites found'}), 404
+            favorite_data = get_favorites_store().get(favorite_id)
             
-            with open(favorites_file, 'r') as f:
-                favorites = json.load(f)
-            
-            if favorite_id not in favorites:
+            if favorite_data is None:
                 return jsonify({'error': 'Favorite not found'}), 404
             
-            favorite_data = favorites[favorite_id]
-            
-            # Return the full favorite data (including id, created_at, state, thumbnail)
-            return jsonify(favorite_data)
+            # Return the full favorite data (including id, created_at, state, thumbnail URL)
+            return jsonify(with_thumbnail_url(favorite_data))
             
-        except (json.JSONDecodeError, IOError) as e:
+        except sqlite3.Error as e:
             return jsonify({'error': f'Failed to load favorite: {str(e)}'}), 500
         except Exception as e:
             return jsonify({'error': str(e)}), 500
@@ -461,115 +1041,99 @@ def create_app(config_name=None):
     def delete_favorite(favorite_id):
         """Delete a saved favorite by ID."""
         try:
-            favorites_file = 'favorites.json'
-            
-            if not os.path.exists(favorites_file):
-                return jsonify({'error': 'No favorites found'}), 404
-            
-            with open(favorites_file, 'r') as f:
-                favorites = json.load(f)
-            
-            if favorite_id not in favorites:
+            # Remove only this favorite's row
+            if not get_favorites_store().delete(favorite_id):
                 return jsonify({'error': 'Favorite not found'}), 404
             
-            # Remove the favorite
-            del favorites[favorite_id]
-            
-            # Save back to file
-            with open(favorites_file, 'w') as f:
-                json.dump(favorites, f, indent=2)
-            
             return jsonify({
                 'success': True,
                 'message': 'Favorite deleted successfully'
             })
             
-        except (json.JSONDecodeError, IOError) as e:
+        except sqlite3.Error as e:
             return jsonify({'error': f'Failed to delete favorite: {str(e)}'}), 500
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
     @app.route('/api/favorites', methods=['GET'])
     def list_favorites():
-        """List all saved favorites with metadata."""
+        """
+        List saved favorites with metadata, newest first.
+        
+        Query parameters:
+        - fields: comma-separated subset of id, created_at, layer_count, thumbnail
+        - limit: page size (max 200); returns {favorites, next_cursor, total}
+        - cursor: next_cursor from the previous page
+        Without limit or cursor the full list is returned as a JSON array.
+        """
         try:
-            favorites_file = 'favorites.json'
-            
-            if not os.path.exists(favorites_file):
-                return jsonify([])
-            
-            with open(favorites_file, 'r') as f:
-                favorites = json.load(f)
-            
-            # Convert to list format with metadata
-            favorites_list = []
-            for favorite_id, favorite_data in favorites.items():
-                favorites_list.append({
-                    'id': favorite_id,
-                    'created_at': favorite_data.get('created_at'),
-                    'layer_count': len(favorite_data.get('state', {}).get('layers', [])),
-                    'thumbnail': favorite_data.get('thumbnail')  # Base64 canvas thumbnail
-                })
+            store = get_favorites_store()
+            fields_arg = request.args.get('fields')
+            fields = [field.strip() for field in fields_arg.split(',') if field.strip()] if fields_arg else None
+            cursor = request.args.get('cursor')
+            paginated = 'limit' in request.args or cursor is not None
+            
+            limit = None
+            if paginated:
+                try:
+                    limit = int(request.args.get('limit', FAVORITES_PAGE_SIZE))
+                except ValueError:
+                    return jsonify({'error': 'limit must be an integer'}), 400
+                if limit < 1:
+                    return jsonify({'error': 'limit must be at least 1'}), 400
+                limit = min(limit, FAVORITES_MAX_PAGE_SIZE)
+            
+            # Rows come straight off the (created_at, id) index
+            try:
+                favorites_page, next_cursor = store.page(limit, cursor=cursor, fields=fields)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            favorites_list = [with_thumbnail_url(favorite) for favorite in favorites_page]
             
-            # Sort by creation date (newest first)
-            favorites_list.sort(key=lambda x: x['created_at'], reverse=True)
+            if not paginated:
+                return jsonify(favorites_list)
             
-            return jsonify(favorites_list)
+            return jsonify({
+                'favorites': favorites_list,
+                'next_cursor': next_cursor,
+                'total': store.count()
+            })
             
-        except (json.JSONDecodeError, IOError) as e:
+        except sqlite3.Error as e:
             return jsonify({'error': f'Failed to load favorites: {str(e)}'}), 500
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
+    @app.route('/api/thumbnails/<filename>', methods=['GET'])
+    def get_favorite_thumbnail(filename):
+        """Serve a stored favorite thumbnail. Names are content hashes, so they never change."""
+        store = get_favorites_store()
+        thumbnail_path = store.thumbnail_path(filename)
+        if thumbnail_path is None:
+            return jsonify({'error': 'Thumbnail not found'}), 404
+        
+        response = send_from_directory(os.path.abspath(store.thumbnail_dir), filename,
+                                       etag=filename.split('.')[0], max_age=31536000)
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+    
     @app.route('/api/settings', methods=['GET'])
     def get_settings():
-        """Get all application settings."""
-        global remote_heartbeats
-        
+        """Get all application settings (304 when If-None-Match matches the current version)."""
         try:
-            # Track heartbeat if provided (from remote control)
-            heartbeat = request.args.get('heartbeat')
-            if heartbeat:
+            # Heartbeat from remotes that predate session IDs
+            if request.args.get('heartbeat'):
                 session_id = request.remote_addr + '_' + request.headers.get('User-Agent', '')[:50]
-                remote_heartbeats[session_id] = float(heartbeat)
-                # Clean up old heartbeats (older than 60 seconds)
-                cutoff_time = float(heartbeat) - 60000  # 60 seconds ago
-                remote_heartbeats = {k: v for k, v in remote_heartbeats.items() if v > cutoff_time}
-            settings_file = 'settings.json'
-            
-            # Default settings
-            default_settings = {
-                'speed': 1,
-                'maxLayers': 4,
-                'volume': 50,
-                'isWhiteBackground': False,
-                'isPlaying': True,  # Animation playing state
-                'gallery': {
-                    'brightness': 100,
-                    'contrast': 100,
-                    'saturation': 100,
-                    'whiteBalance': 100,
-                    'textureIntensity': 0
-                }
-            }
-            
-            if not os.path.exists(settings_file):
-                # Create settings file with defaults on first run
-                with open(settings_file, 'w') as f:
-                    json.dump(default_settings, f, indent=2)
-                return jsonify(default_settings)
-            
-            with open(settings_file, 'r') as f:
-                settings = json.load(f)
+                remote_sessions.touch(session_id, create=True)
             
-            # Merge with defaults to ensure all keys exist
-            merged_settings = {**default_settings, **settings}
-            merged_settings['gallery'] = {**default_settings['gallery'], **settings.get('gallery', {})}
+            store = get_settings_store()
+            settings, version = store.snapshot()
+            response = jsonify(settings)
+            response.set_etag(store.etag(version))
+            # Clients may cache the body but must revalidate, which is cheap while nothing changes
+            response.headers['Cache-Control'] = 'no-cache'
+            return response.make_conditional(request)
             
-            return jsonify(merged_settings)
-            
-        except (json.JSONDecodeError, IOError) as e:
-            return jsonify({'error': f'Failed to load settings: {str(e)}'}), 500
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
@@ -577,8 +1141,6 @@ def create_app(config_name=None):
     def update_settings():
         """Update application settings (partial or full update)."""
         try:
-            settings_file = 'settings.json'
-            
             # Get the update data from request
             try:
                 update_data = request.get_json()
@@ -588,30 +1150,7 @@ def create_app(config_name=None):
             if not update_data:
                 return jsonify({'error': 'No settings data provided'}), 400
             
-            # Load existing settings or use defaults
-            current_settings = {}
-            if os.path.exists(settings_file):
-                try:
-                    with open(settings_file, 'r') as f:
-                        current_settings = json.load(f)
-                except (json.JSONDecodeError, IOError) as e:
-                    print(f"Warning: Could not load existing settings: {e}")
-            
-            # Merge updates with current settings
-            if 'gallery' in update_data and 'gallery' in current_settings:
-                # Handle gallery settings specially to allow partial updates
-                current_settings['gallery'] = {**current_settings.get('gallery', {}), **update_data['gallery']}
-                del update_data['gallery']
-            
-            # Update other settings
-            updated_settings = {**current_settings, **update_data}
-            
-            # Save back to file
-            try:
-                with open(settings_file, 'w') as f:
-                    json.dump(updated_settings, f, indent=2)
-            except IOError as e:
-                return jsonify({'error': f'Failed to save settings: {str(e)}'}), 500
+            updated_settings = apply_settings_update(update_data, source=request.headers.get('X-Client-Id'))
             
             return jsonify({
                 'success': True,
@@ -621,54 +1160,357 @@ def create_app(config_name=None):
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
+    @app.route('/api/remote/sessions', methods=['POST'])
+    def create_remote_session():
+        """Issue a session ID to a remote; it stays active while heartbeats arrive."""
+        return jsonify({
+            'session_id': remote_sessions.create(),
+            'ttl': remote_sessions.ttl
+        }), 201
+    
+    @app.route('/api/remote/sessions/<session_id>/heartbeat', methods=['POST'])
+    def remote_session_heartbeat(session_id):
+        """Keep a remote session active (404 once it has expired, so the remote asks for a new one)."""
+        if not remote_sessions.touch(session_id):
+            return jsonify({'error': 'Session not found'}), 404
+        return '', 204
+    
+    @app.route('/api/remote/sessions/<session_id>', methods=['DELETE'])
+    def end_remote_session(session_id):
+        """End a remote session (e.g. when the remote goes idle)."""
+        remote_sessions.remove(session_id)
+        return '', 204
+    
     @app.route('/api/remote-status', methods=['GET'])
     def get_remote_status():
         """Get the status of active remote controls."""
-        global remote_heartbeats
-        
         try:
-            current_time = datetime.now().timestamp() * 1000  # Current time in milliseconds
-            active_cutoff = current_time - 35000  # 35 seconds ago
-            
-            # Count active remotes (heartbeats within last 35 seconds)
-            active_remotes = {k: v for k, v in remote_heartbeats.items() if v > active_cutoff}
-            active_count = len(active_remotes)
+            active_remotes = remote_sessions.active()
             
             return jsonify({
-                'active_remotes': active_count,
-                'last_heartbeats': {k: int(v) for k, v in active_remotes.items()},
-                'current_time': int(current_time)
+                'active_remotes': len(active_remotes),
+                'last_heartbeats': {k: int(v * 1000) for k, v in active_remotes.items()},
+                'current_time': int(time.time() * 1000)
             })
             
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/new-pattern', methods=['POST'])
-    def new_pattern():
-        """Trigger a new pattern generation on the main display."""
+    @app.route('/api/displays', methods=['GET'])
+    def list_displays():
+        """Registered displays with their last reported state (?all=true includes offline ones)."""
+        include_offline = request.args.get('all', 'false').lower() == 'true'
+        return jsonify({'displays': display_registry.list(include_offline)})
+    
+    @app.route('/api/displays', methods=['POST'])
+    def register_display():
+        """Register a display so it can be targeted by commands and report its state."""
+        data = request.get_json(silent=True) or {}
+        display_id = data.get('display_id')
+        if not isinstance(display_id, str) or not display_id.strip() or len(display_id) > 100:
+            return jsonify({'error': 'display_id is required'}), 400
+        
+        display = display_registry.register(display_id, name=data.get('name'), kiosk=data.get('kiosk', False))
+        # Commands issued from now on are kept for this display until it acknowledges them
+        command_log.register(display_id)
+        return jsonify(display)
+    
+    @app.route('/api/displays/<display_id>', methods=['GET'])
+    def get_display(display_id):
+        """One display's registration and last reported state."""
+        display = display_registry.get(display_id)
+        if display is None:
+            return jsonify({'error': 'Display not found'}), 404
+        return jsonify(display)
+    
+    @app.route('/api/displays/<display_id>', methods=['DELETE'])
+    def remove_display(display_id):
+        """Forget a display (it registers again the next time it loads)."""
+        if not display_registry.remove(display_id):
+            return jsonify({'error': 'Display not found'}), 404
+        frame_telemetry.remove(display_id)
+        return jsonify({'success': True})
+    
+    @app.route('/api/displays/<display_id>/state', methods=['POST'])
+    def report_display_state(display_id):
+        """Record a display's current state (seed, layers, fps, ...); also serves as its heartbeat."""
+        state = request.get_json(silent=True)
+        if not isinstance(state, dict):
+            return jsonify({'error': 'State must be a JSON object'}), 400
+        return jsonify(display_registry.update_state(display_id, state))
+    
+    def telemetry_since():
+        """Start of the ?minutes=N summary window (None for all stored reports)."""
+        minutes = request.args.get('minutes', type=float)
+        return time.time() - minutes * 60 if minutes and minutes > 0 else None
+    
+    @app.route('/api/displays/<display_id>/telemetry', methods=['POST'])
+    def report_display_telemetry(display_id):
+        """Record a display's frame-timing report (histograms for the last minute)."""
+        report = request.get_json(silent=True)
+        if not isinstance(report, dict):
+            return jsonify({'error': 'Telemetry must be a JSON object'}), 400
         try:
-            # Store the new pattern request timestamp so RemoteSync can detect it
-            settings_file = 'settings.json'
-            
-            # Read current settings
-            current_settings = {}
-            if os.path.exists(settings_file):
+            frame_telemetry.record(display_id, report)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'success': True})
+    
+    @app.route('/api/displays/<display_id>/telemetry', methods=['GET'])
+    def get_display_telemetry(display_id):
+        """Frame-time, decode and long-task summary for one display, overall and per animation settings."""
+        summary = frame_telemetry.summary(display_id, telemetry_since())
+        if summary is None:
+            return jsonify({'error': 'No telemetry for this display'}), 404
+        return jsonify(summary)
+    
+    @app.route('/api/telemetry', methods=['GET'])
+    def list_telemetry():
+        """Telemetry summaries for every display that has reported (?minutes=N limits the window)."""
+        since = telemetry_since()
+        summaries = [frame_telemetry.summary(display_id, since) for display_id in frame_telemetry.displays()]
+        return jsonify({'displays': [summary for summary in summaries if summary is not None]})
+    
+    def is_for_display(event, display_id):
+        """Whether an event goes to display_id (untargeted events go to every display)."""
+        target = event['data'].get('target')
+        return target is None or target == display_id
+    
+    @app.route('/api/events', methods=['GET'])
+    def stream_events():
+        """
+        Server-Sent Events stream of display events.
+        
+        Reconnecting clients send Last-Event-ID (or ?since=) and receive the
+        events they missed; if those are no longer available a 'resync' event
+        tells them to reload state instead. Commands aimed at one display are
+        only sent to streams opened with that ?display_id=.
+        """
+        display_id = request.args.get('display_id')
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('since')
+        try:
+            last_id = int(last_event_id) if last_event_id else event_bus.last_id
+        except ValueError:
+            return jsonify({'error': 'Invalid event ID'}), 400
+        keepalive = app.config.get('EVENTS_KEEPALIVE_SECONDS', 15)
+        
+        def resync_event():
+            return format_sse({'id': None, 'type': 'resync', 'data': {}, 'timestamp': time.time()})
+        
+        def generate(last_id):
+            yield 'retry: 2000\n\n'
+            if last_id > event_bus.last_id:
+                # ID from before a server restart
+                yield resync_event()
+                last_id = event_bus.last_id
+            while True:
+                events, complete = event_bus.wait_for_events(last_id, timeout=keepalive)
+                if not complete:
+                    # Some missed events were dropped from history; still deliver the rest
+                    yield resync_event()
+                if not events:
+                    # Comment line keeps proxies and idle connections open
+                    yield ': keepalive\n\n'
+                    continue
+                for event in events:
+                    if is_for_display(event, display_id):
+                        yield format_sse(event)
+                    last_id = event['id']
+        
+        return Response(
+            stream_with_context(generate(last_id)),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+    
+    @app.route('/api/commands', methods=['GET'])
+    def get_commands():
+        """
+        Commands a display has not acknowledged yet, oldest first.
+        
+        ?display_id= identifies the display (its cursor starts at the current
+        end of the log on first use); ?wait= holds the request up to that many
+        seconds until a command arrives. missed counts commands that dropped out
+        of the bounded log before the display read them.
+        """
+        display_id = request.args.get('display_id')
+        if not display_id:
+            return jsonify({'error': 'display_id is required'}), 400
+        try:
+            wait = min(max(float(request.args.get('wait', 0)), 0), app.config.get('COMMANDS_WAIT_MAX_SECONDS', 60))
+        except ValueError:
+            return jsonify({'error': 'Invalid wait'}), 400
+        
+        if wait:
+            commands, missed = command_log.wait(display_id, timeout=wait)
+        else:
+            commands, missed = command_log.read(display_id)
+        return jsonify({'commands': commands, 'missed': missed})
+    
+    @app.route('/api/commands/ack', methods=['POST'])
+    def ack_commands():
+        """Acknowledge a display's commands up to and including seq."""
+        data = request.get_json(silent=True) or {}
+        display_id = data.get('display_id')
+        if not display_id or not isinstance(data.get('seq'), int):
+            return jsonify({'error': 'display_id and integer seq are required'}), 400
+        return jsonify({'success': True, 'cursor': command_log.ack(display_id, data['seq'])})
+    
+    @app.route('/api/commands/wait', methods=['GET'])
+    def wait_for_commands():
+        """
+        Long-poll alternative to /api/events for networks that break streaming.
+        
+        Holds the request until there are events after ?cursor= (or until
+        ?timeout= seconds pass) and returns all of them in one response, with
+        the cursor to send next. resync is true when events were missed and the
+        client should reload its settings instead. ?display_id= filters
+        targeted commands as for /api/events.
+        """
+        cursor = request.args.get('cursor')
+        display_id = request.args.get('display_id')
+        try:
+            last_id = int(cursor) if cursor else None
+            timeout = float(request.args.get('timeout', app.config.get('COMMANDS_WAIT_TIMEOUT_SECONDS', 25)))
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor or timeout'}), 400
+        timeout = min(max(timeout, 0), app.config.get('COMMANDS_WAIT_MAX_SECONDS', 60))
+        
+        if last_id is None:
+            # First request: start from now
+            return jsonify({'events': [], 'cursor': event_bus.last_id, 'resync': False})
+        if last_id > event_bus.last_id:
+            # Cursor from before a server restart
+            return jsonify({'events': [], 'cursor': event_bus.last_id, 'resync': True})
+        
+        events, complete = event_bus.wait_for_events(last_id, timeout=timeout)
+        return jsonify({
+            'events': [event for event in events if is_for_display(event, display_id)],
+            'cursor': events[-1]['id'] if events else last_id,
+            'resync': not complete
+        })
+    
+    def handle_control_message(message, client_id):
+        """
+        Apply one control-channel message from a remote and return its acknowledgement.
+        
+        Messages are JSON objects with a type and an optional client sequence number:
+        - {"type": "settings", "seq": 1, "changes": {...}} - batched setting deltas
+        - {"type": "command", "seq": 2, "command": "new-pattern" | "play-pause" |
+          "save-favorite" | "load-favorite", "favorite_id": "...", "display_id": "..."}
+          (display_id sends the command to one display instead of all)
+        - {"type": "ping", "seq": 3} - keeps the remote counted as active
+        """
+        if not isinstance(message, dict):
+            return {'type': 'ack', 'seq': None, 'ok': False, 'error': 'Message must be an object'}
+        
+        seq = message.get('seq')
+        message_type = message.get('type')
+        try:
+            if message_type == 'settings':
+                changes = message.get('changes')
+                if not isinstance(changes, dict) or not changes:
+                    raise ValueError('No settings changes provided')
+                settings = apply_settings_update(changes, source=client_id)
+                return {'type': 'ack', 'seq': seq, 'ok': True, 'settings': settings}
+            
+            if message_type == 'command':
+                command = message.get('command')
+                target = message.get('display_id') or None
+                if command == 'new-pattern':
+                    request_new_pattern(target)
+                elif command == 'play-pause':
+                    request_play_pause(target)
+                elif command == 'save-favorite':
+                    request_save_favorite(target)
+                elif command == 'load-favorite':
+                    if not request_load_favorite(message.get('favorite_id'), target):
+                        raise ValueError('Favorite not found')
+                else:
+                    raise ValueError(f'Unknown command: {command}')
+                return {'type': 'ack', 'seq': seq, 'ok': True}
+            
+            if message_type == 'ping':
+                return {'type': 'ack', 'seq': seq, 'ok': True}
+            
+            raise ValueError(f'Unknown message type: {message_type}')
+        
+        except (ValueError, IOError, sqlite3.Error) as e:
+            return {'type': 'ack', 'seq': seq, 'ok': False, 'error': str(e)}
+    
+    if Sock is not None:
+        sock = Sock(app)
+        
+        @app.before_request
+        def refuse_unsupported_websocket():
+            # Without this, flask-sock fails with a 500 and a traceback on every reconnect attempt
+            if request.path == '/api/control' and not websocket_supported(request.environ):
+                return jsonify({'error': 'WebSockets are not supported by this server; use the REST endpoints'}), 426
+        
+        @sock.route('/api/control')
+        def control_channel(ws):
+            """
+            WebSocket control channel for remotes. Each frame holds one message or
+            a list of messages (see handle_control_message) and every message is
+            acknowledged. Settings changes made elsewhere are pushed back as
+            {"type": "state", "settings": {...}} so the phone mirrors the display.
+            """
+            client_id = request.args.get('client_id') or f'remote-{uuid.uuid4().hex[:8]}'
+            send_lock = threading.Lock()
+            closed = threading.Event()
+            
+            def send(message):
+                with send_lock:
+                    ws.send(json.dumps(message))
+            
+            def push_display_state(last_id):
                 try:
-                    with open(settings_file, 'r') as f:
-                        current_settings = json.load(f)
-                except json.JSONDecodeError:
-                    current_settings = {}
-            
-            # Add new pattern request timestamp
-            import time
-            current_settings['newPatternRequest'] = time.time()
+                    while not closed.is_set():
+                        events, _ = event_bus.wait_for_events(last_id, timeout=1)
+                        for event in events:
+                            last_id = event['id']
+                            # The sender already has its own changes in the ack
+                            if event['type'] == 'settings' and event['data'].get('source') != client_id:
+                                send({'type': 'state', 'settings': event['data']['settings']})
+                except ConnectionClosed:
+                    closed.set()
+            
+            # Take the event position before the snapshot so no change is missed
+            last_id = event_bus.last_id
+            # Remotes connect with their session ID as client_id, so frames count as its heartbeats
+            remote_sessions.touch(client_id, create=True)
+            send({'type': 'state', 'client_id': client_id, 'settings': load_settings()})
+            threading.Thread(target=push_display_state, args=(last_id,), daemon=True).start()
             
-            # Save updated settings
             try:
-                with open(settings_file, 'w') as f:
-                    json.dump(current_settings, f, indent=2)
-            except IOError as e:
-                return jsonify({'error': f'Failed to save new pattern request: {str(e)}'}), 500
+                while not closed.is_set():
+                    frame = ws.receive()
+                    remote_sessions.touch(client_id, create=True)
+                    try:
+                        messages = json.loads(frame)
+                    except (TypeError, ValueError):
+                        send({'type': 'ack', 'seq': None, 'ok': False, 'error': 'Invalid JSON format'})
+                        continue
+                    for message in messages if isinstance(messages, list) else [messages]:
+                        send(handle_control_message(message, client_id))
+            except ConnectionClosed:
+                pass
+            finally:
+                # The session is left to expire: it is usually the remote's REST session, which
+                # outlives a dropped socket, and removing it would flap the active-remote count
+                closed.set()
+    
+    @app.route('/api/new-pattern', methods=['POST'])
+    def new_pattern():
+        """Trigger a new pattern generation on all displays (or ?display_id=)."""
+        try:
+            try:
+                request_new_pattern(command_target())
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 404
             
             return jsonify({
                 'success': True,
@@ -682,28 +1524,13 @@ def create_app(config_name=None):
         """Load a specific favorite on the main display."""
         try:
             # This endpoint allows remote control to load favorites
-            # The main application should poll for favorite loads or use WebSocket
-            favorites_file = 'favorites.json'
-            
-            if not os.path.exists(favorites_file):
-                return jsonify({'error': 'No favorites found'}), 404
-            
-            with open(favorites_file, 'r') as f:
-                favorites = json.load(f)
-            
-            if favorite_id not in favorites:
+            try:
+                found = request_load_favorite(favorite_id, command_target())
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 404
+            if not found:
                 return jsonify({'error': 'Favorite not found'}), 404
             
-            # Store the favorite to be loaded in a temporary file for polling
-            load_request = {
-                'timestamp': datetime.now().isoformat(),
-                'favorite_id': favorite_id,
-                'favorite_data': favorites[favorite_id]
-            }
-            
-            with open('load_favorite.json', 'w') as f:
-                json.dump(load_request, f, indent=2)
-            
             return jsonify({
                 'success': True,
                 'message': 'Favorite loaded',
@@ -721,59 +1548,40 @@ def create_app(config_name=None):
             download = request.args.get('download', 'false').lower() == 'true'
             
             # Set up cache directory and file
-            cache_dir = Path('cache/favorites')
+            cache_dir = Path(HIGHRES_CACHE_DIR)
             cache_dir.mkdir(parents=True, exist_ok=True)
             
             # Clean up old cache files (run cleanup on every request for simplicity)
             cleanup_cache(cache_dir)
             
-            cache_file = cache_dir / f'{favorite_id}_1920x1080.png'
+            cache_file = get_highres_cache_file(favorite_id)
             
             # Check if cached version exists and is less than 24 hours old
-            if cache_file.exists():
-                file_age = time.time() - cache_file.stat().st_mtime
-                if file_age < 86400:  # 24 hours in seconds
-                    # Return cached file
-                    if download:
-                        return send_file(
-                            cache_file,
-                            mimetype='image/png',
-                            as_attachment=True,
-                            download_name=f'painting_{favorite_id}.png'
-                        )
-                    else:
-                        return send_file(cache_file, mimetype='image/png')
+            if is_cache_file_valid(cache_file):
+                record_render_metrics(metrics, True)
+                # Return cached file
+                if download:
+                    return send_file(
+                        cache_file,
+                        mimetype='image/png',
+                        as_attachment=True,
+                        download_name=f'painting_{favorite_id}.png'
+                    )
+                else:
+                    return send_file(cache_file, mimetype='image/png')
             
             # Need to generate high-res image
-            favorites_file = 'favorites.json'
+            favorite_data = get_favorites_store().get(favorite_id)
             
-            if not os.path.exists(favorites_file):
-                return jsonify({'error': 'No favorites found'}), 404
-            
-            with open(favorites_file, 'r') as f:
-                favorites = json.load(f)
-            
-            if favorite_id not in favorites:
+            if favorite_data is None:
                 return jsonify({'error': 'Favorite not found'}), 404
             
-            favorite_data = favorites[favorite_id]
-            
-            # For now, we'll generate the high-res image from the existing thumbnail
-            # This will be improved in Phase 2 when we add the frontend capture method
-            thumbnail_data = favorite_data.get('thumbnail')
-            if not thumbnail_data:
-                return jsonify({'error': 'No thumbnail data available'}), 400
+            # Generate high-resolution image from state data and save to cache
+            cache_file = render_favorite_to_cache(favorite_id, favorite_data, metrics)
             
-            # Generate high-resolution image from state data
-            highres_image = generate_highres_from_favorite(favorite_data)
-            
-            if not highres_image:
+            if not cache_file:
                 return jsonify({'error': 'Failed to generate high-resolution image'}), 500
             
-            # Save to cache
-            with open(cache_file, 'wb') as f:
-                f.write(highres_image)
-            
             # Return the image
             if download:
                 return send_file(
@@ -788,15 +1596,45 @@ def create_app(config_name=None):
         except Exception as e:
             return jsonify({'error': f'Failed to generate high-resolution image: {str(e)}'}), 500
     
+    @app.route('/api/favorites/export', methods=['GET'])
+    def export_favorites():
+        """Stream a ZIP of 1920x1080 renders for all (or selected) favorites."""
+        try:
+            # Optional comma-separated list of favorite IDs to export
+            ids_param = request.args.get('ids', '').strip()
+            requested_ids = [i for i in ids_param.split(',') if i] if ids_param else None
+            
+            # Thumbnails are not needed for rendering, so only states are loaded
+            favorites = get_favorites_store().get_states(requested_ids)
+            
+            if not favorites:
+                return jsonify({'error': 'No favorites found'}), 404
+            
+            cleanup_cache(HIGHRES_CACHE_DIR)
+            
+            filename = f"favorites_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+            return Response(
+                stream_with_context(stream_favorites_zip(favorites, metrics=metrics)),
+                mimetype='application/zip',
+                headers={
+                    'Content-Disposition': f'attachment; filename="{filename}"',
+                    'Cache-Control': 'no-store'
+                }
+            )
+        
+        except sqlite3.Error as e:
+            return jsonify({'error': f'Failed to load favorites: {str(e)}'}), 500
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    
     
     @app.route('/api/save-current-favorite', methods=['POST'])
     def save_current_favorite():
         """Endpoint for remote to request saving current display state as favorite."""
-        global save_favorite_request
-        save_favorite_request = {
-            'timestamp': datetime.now().isoformat(),
-            'processed': False
-        }
+        try:
+            request_save_favorite(command_target())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 404
         return jsonify({
             'success': True,
             'message': 'Save favorite request received'
@@ -804,14 +1642,12 @@ def create_app(config_name=None):
     
     @app.route('/api/check-save-favorite', methods=['GET'])
     def check_save_favorite():
-        """Check if there's a pending save favorite request."""
-        global save_favorite_request
-        if not save_favorite_request['processed']:
-            # Mark as processed and return the request
-            save_favorite_request['processed'] = True
+        """Check if there's a pending save favorite request (for displays without command cursors)."""
+        command = take_legacy_command('save-favorite')
+        if command:
             return jsonify({
                 'has_request': True,
-                'timestamp': save_favorite_request['timestamp']
+                'timestamp': datetime.fromtimestamp(command['timestamp']).isoformat()
             })
         else:
             return jsonify({
@@ -821,12 +1657,10 @@ def create_app(config_name=None):
     @app.route('/api/play-pause', methods=['POST'])
     def play_pause():
         """Endpoint for remote to toggle play/pause state."""
-        global play_pause_request
-        play_pause_request = {
-            'timestamp': datetime.now().isoformat(),
-            'processed': False,
-            'action': 'toggle'
-        }
+        try:
+            request_play_pause(command_target())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 404
         return jsonify({
             'success': True,
             'message': 'Play/pause request received'
@@ -834,15 +1668,13 @@ def create_app(config_name=None):
     
     @app.route('/api/check-play-pause', methods=['GET'])
     def check_play_pause():
-        """Check if there's a pending play/pause request."""
-        global play_pause_request
-        if not play_pause_request['processed']:
-            # Mark as processed and return the request
-            play_pause_request['processed'] = True
+        """Check if there's a pending play/pause request (for displays without command cursors)."""
+        command = take_legacy_command('play-pause')
+        if command:
             return jsonify({
                 'has_request': True,
-                'action': play_pause_request['action'],
-                'timestamp': play_pause_request['timestamp']
+                'action': command['data']['action'],
+                'timestamp': datetime.fromtimestamp(command['timestamp']).isoformat()
             })
         else:
             return jsonify({
@@ -851,15 +1683,19 @@ def create_app(config_name=None):
     
     @app.route('/api/load-favorite-status', methods=['GET'])
     def get_load_favorite_status():
-        """Check if there's a pending favorite load request."""
+        """Check if there's a pending favorite load request (for displays without command cursors)."""
         try:
-            load_file = 'load_favorite.json'
-            if os.path.exists(load_file):
-                with open(load_file, 'r') as f:
-                    load_request = json.load(f)
+            # Cleared by DELETE /load_favorite.json once the display has loaded it
+            command = take_legacy_command('load-favorite', acknowledge=False)
+            if command:
+                favorite_id = command['data']['favorite_id']
                 return jsonify({
                     'has_request': True,
-                    'request': load_request
+                    'request': {
+                        'timestamp': datetime.fromtimestamp(command['timestamp']).isoformat(),
+                        'favorite_id': favorite_id,
+                        'favorite_data': get_favorites_store().get(favorite_id)
+                    }
                 })
             else:
                 return jsonify({
@@ -870,11 +1706,9 @@ def create_app(config_name=None):
     
     @app.route('/load_favorite.json', methods=['DELETE'])
     def delete_load_favorite_request():
-        """Delete the favorite load request file."""
+        """Clear the pending favorite load request (the path is kept for older displays)."""
         try:
-            load_file = 'load_favorite.json'
-            if os.path.exists(load_file):
-                os.unlink(load_file)
+            take_legacy_command('load-favorite')
             return jsonify({'success': True})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
@@ -974,18 +1808,16 @@ def create_app(config_name=None):
     @app.route('/api/images/refresh', methods=['POST'])
     def refresh_images():
         """Request to refresh ImageManager and trigger newly uploaded images."""
-        global refresh_images_request
-        
         try:
             data = request.get_json() or {}
             uploaded_image_ids = data.get('uploaded_image_ids', [])
             
             print(f"DEBUG: Image refresh request received with IDs: {uploaded_image_ids}")
             
-            # Create refresh request
-            refresh_images_request['timestamp'] = datetime.now().isoformat()
-            refresh_images_request['processed'] = False
-            refresh_images_request['uploaded_images'] = uploaded_image_ids
+            try:
+                issue_command('refresh-images', {'uploaded_image_ids': uploaded_image_ids}, command_target())
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 404
             
             return jsonify({
                 'success': True,
@@ -998,16 +1830,19 @@ def create_app(config_name=None):
     
     @app.route('/api/check-refresh-images', methods=['GET'])
     def check_refresh_images():
-        """Check for refresh images requests from remote control."""
-        global refresh_images_request
-        
+        """Check for refresh images requests from remote control (for displays without command cursors)."""
         try:
-            if not refresh_images_request['processed'] and refresh_images_request['timestamp']:
-                # Return the request
+            consumer_id = LEGACY_COMMAND_CONSUMERS['refresh-images']
+            commands, _ = command_log.read(consumer_id, 'refresh-images')
+            if commands:
+                # Uploads from every pending request, so quick successive uploads are all shown
+                uploaded_image_ids = []
+                for command in commands:
+                    uploaded_image_ids += [i for i in command['data']['uploaded_image_ids'] if i not in uploaded_image_ids]
                 return jsonify({
                     'has_request': True,
-                    'timestamp': refresh_images_request['timestamp'],
-                    'uploaded_image_ids': refresh_images_request['uploaded_images']
+                    'timestamp': datetime.fromtimestamp(commands[-1]['timestamp']).isoformat(),
+                    'uploaded_image_ids': uploaded_image_ids
                 })
             else:
                 return jsonify({'has_request': False})
@@ -1017,14 +1852,9 @@ def create_app(config_name=None):
     
     @app.route('/api/refresh-images-status', methods=['DELETE'])
     def clear_refresh_images_request():
-        """Mark the refresh images request as processed."""
-        global refresh_images_request
-        
+        """Mark the refresh images requests as processed."""
         try:
-            refresh_images_request['processed'] = True
-            refresh_images_request['timestamp'] = None
-            refresh_images_request['uploaded_images'] = []
-            
+            take_legacy_command('refresh-images')
             return jsonify({'success': True})
             
         except Exception as e:
@@ -1032,24 +1862,37 @@ def create_app(config_name=None):
     
     @app.route('/api/debug-log', methods=['POST'])
     def debug_log():
-        """Log debug information to a file for analysis."""
+        """
+        Log debug information to a file for analysis. Accepts one {message} or
+        a batch {entries: [{message, timestamp}]} (timestamp in ms since the
+        epoch, when the browser logged it). Lines are written in the background.
+        """
         try:
-            data = request.get_json()
-            if not data or 'message' not in data:
+            data = request.get_json(silent=True)
+            if isinstance(data, dict) and 'entries' in data:
+                entries = data['entries']
+            elif isinstance(data, dict) and 'message' in data:
+                entries = [data]
+            else:
                 return jsonify({'error': 'Missing message in request'}), 400
+            if not isinstance(entries, list) or len(entries) > DEBUG_LOG_MAX_BATCH:
+                return jsonify({'error': f'entries must be a list of at most {DEBUG_LOG_MAX_BATCH} items'}), 400
+            
+            lines = []
+            for entry in entries:
+                if not isinstance(entry, dict) or 'message' not in entry:
+                    return jsonify({'error': 'Each entry needs a message'}), 400
+                logged_at = datetime.now()
+                if isinstance(entry.get('timestamp'), (int, float)):
+                    try:
+                        logged_at = datetime.fromtimestamp(entry['timestamp'] / 1000)
+                    except (OverflowError, OSError, ValueError):
+                        pass
+                timestamp = logged_at.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+                lines.append(f"[{timestamp}] {str(entry['message'])[:DEBUG_LOG_MAX_MESSAGE]}")
             
-            # Create debug log file path
-            debug_file = 'debug.log'
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-            
-            # Format log entry
-            log_entry = f"[{timestamp}] {data['message']}\n"
-            
-            # Append to debug file
-            with open(debug_file, 'a', encoding='utf-8') as f:
-                f.write(log_entry)
-            
-            return jsonify({'success': True})
+            accepted = get_debug_log().write(lines)
+            return jsonify({'success': True, 'accepted': accepted, 'dropped': len(lines) - accepted})
             
         except Exception as e:
             return jsonify({'error': str(e)}), 500
@@ -1058,13 +1901,96 @@ def create_app(config_name=None):
     def debug_clear():
         """Clear the debug log file."""
         try:
-            debug_file = 'debug.log'
-            if os.path.exists(debug_file):
-                open(debug_file, 'w').close()  # Truncate file
+            # Queued behind pending lines, so earlier messages cannot reappear after the clear
+            get_debug_log().clear()
             return jsonify({'success': True, 'message': 'Debug log cleared'})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
+    @app.route('/api/debug/profile')
+    def debug_profile():
+        """
+        Profile the server for ?seconds=N (default 5): collapsed stacks of all
+        threads for a flamegraph, plus pstats for requests handled meanwhile.
+        ?format=collapsed returns only the stacks as text (pipe into flamegraph.pl).
+        """
+        if not debug_access_allowed():
+            return jsonify({'error': 'Debug endpoints are only available locally or with X-Debug-Token'}), 403
+        
+        try:
+            seconds = float(request.args.get('seconds', 5))
+        except ValueError:
+            return jsonify({'error': 'seconds must be a number'}), 400
+        max_seconds = app.config.get('PROFILE_MAX_SECONDS', 30)
+        if not 0 < seconds <= max_seconds:
+            return jsonify({'error': f'seconds must be between 0 and {max_seconds}'}), 400
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in ('cumulative', 'tottime', 'ncalls'):
+            return jsonify({'error': 'sort must be cumulative, tottime or ncalls'}), 400
+        
+        try:
+            result = profiler.capture(seconds, sort=sort)
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 409
+        
+        if request.args.get('format') == 'collapsed':
+            return Response(result['collapsed'], mimetype='text/plain')
+        return jsonify({'seconds': seconds, 'interval': profiler.interval, **result})
+    
+    @app.route('/api/debug/memory')
+    def debug_memory():
+        """Process RSS, garbage collector counts, internal cache sizes and tracemalloc status."""
+        if not debug_access_allowed():
+            return jsonify({'error': 'Debug endpoints are only available locally or with X-Debug-Token'}), 403
+        
+        try:
+            return jsonify({
+                'process': process_memory(),
+                'gc': gc_stats(),
+                'caches': internal_cache_sizes(),
+                'tracemalloc': memory_tracker.status()
+            })
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/api/debug/memory/<action>', methods=['POST'])
+    def debug_memory_action(action):
+        """
+        Control tracemalloc: start (?frames=N, default 1), stop, or snapshot
+        (?limit=N&group_by=lineno|filename|traceback), which returns the top
+        allocation sites and the changes since the previous snapshot.
+        """
+        if not debug_access_allowed():
+            return jsonify({'error': 'Debug endpoints are only available locally or with X-Debug-Token'}), 403
+        
+        try:
+            if action == 'start':
+                memory_tracker.start(min(max(int(request.args.get('frames', 1)), 1), 50))
+                return jsonify(memory_tracker.status())
+            if action == 'stop':
+                memory_tracker.stop()
+                return jsonify(memory_tracker.status())
+            if action == 'snapshot':
+                group_by = request.args.get('group_by', 'lineno')
+                if group_by not in ('lineno', 'filename', 'traceback'):
+                    return jsonify({'error': 'group_by must be lineno, filename or traceback'}), 400
+                limit = min(max(int(request.args.get('limit', 20)), 1), 200)
+                try:
+                    report = memory_tracker.snapshot(limit, group_by)
+                except RuntimeError as e:
+                    return jsonify({'error': str(e)}), 409
+                return jsonify({
+                    **report,
+                    'process': process_memory(),
+                    'gc': gc_stats(),
+                    'caches': internal_cache_sizes()
+                })
+            return jsonify({'error': f'Unknown action: {action}'}), 404
+        except ValueError:
+            return jsonify({'error': 'frames and limit must be integers'}), 400
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    
     @app.route('/api/debug-config')
     def debug_config_info():
         """Debug endpoint to view current config state and environment"""
@@ -1112,21 +2038,42 @@ def create_app(config_name=None):
                 return jsonify({'error': 'CPU temperature only available on Raspberry Pi'}), 404
             
             # Read temperature from RPi thermal zone
-            temp_file = '/sys/class/thermal/thermal_zone0/temp'
-            if os.path.exists(temp_file):
-                with open(temp_file, 'r') as f:
-                    temp_millidegrees = int(f.read().strip())
-                    temp_celsius = temp_millidegrees / 1000.0
-                    return jsonify({
-                        'temperature': round(temp_celsius),
-                        'unit': 'C'
-                    })
+            temp_celsius = read_cpu_temperature()
+            if temp_celsius is not None:
+                return jsonify({
+                    'temperature': round(temp_celsius),
+                    'unit': 'C'
+                })
             else:
                 return jsonify({'error': 'Temperature sensor not found'}), 404
                 
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
+    @app.route('/api/thermal')
+    def get_thermal_state():
+        """
+        Thermal governor state: the current level and the limits displays
+        apply at it, the last temperature reading, how often and how long it
+        has throttled, and its recent level changes.
+        """
+        return jsonify({
+            **thermal_governor.state(),
+            'sampling': thermal_governor.sampling,
+            'levels': thermal_governor.levels,
+            'hysteresis': thermal_governor.hysteresis,
+            'history': thermal_governor.history()
+        })
+    
+    @app.route('/api/device-profile')
+    def get_device_profile():
+        """The cached first-boot benchmark and the settings it chose, and whether this environment applies it."""
+        from utils.device_profile import load_profile
+        return jsonify({
+            'auto_profile': bool(app.config.get('AUTO_PROFILE')),
+            'profile': load_profile()
+        })
+    
     @app.errorhandler(404)
     def not_found_error(error):
         return jsonify({'error': 'Not found'}), 404
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Render pipeline benchmark for ManyPaintings.
+Times generate_highres_from_favorite on synthetic favorites built from the
+test fixture images, reporting per-stage timings and peak memory, and can
+compare a run against a stored baseline.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+import contextlib
+from pathlib import Path
+
+from PIL import Image
+
+from app import generate_highres_from_favorite
+
+FIXTURE_DIR = Path(__file__).parent / 'tests' / 'fixtures' / 'test_images'
+STAGES = ['decode', 'transform', 'color', 'composite', 'encode']
+
+# (name, layer count, scale range, max rotation degrees, hue shift probability)
+SCENARIOS = [
+    ('1-layer-plain', 1, (1.0, 1.0), 0, 0.0),
+    ('1-layer-hue', 1, (1.0, 1.0), 0, 1.0),
+    ('3-layer-scaled', 3, (0.5, 1.5), 0, 0.0),
+    ('3-layer-mixed', 3, (0.5, 1.5), 60, 0.5),
+    ('5-layer-mixed', 5, (0.5, 1.5), 60, 0.5),
+    ('10-layer-mixed', 10, (0.5, 1.5), 60, 0.5),
+    ('10-layer-rotated-hue', 10, (0.8, 1.2), 180, 1.0),
+]
+
+
+def current_rss_bytes():
+    """Current resident set size of this process, or None if unavailable."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+class PeakMemorySampler:
+    """Samples RSS on a background thread and records the peak above the starting value."""
+    
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.start_rss = None
+        self.peak_rss = None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def __enter__(self):
+        self.start_rss = self.peak_rss = current_rss_bytes()
+        if self.start_rss is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._update()
+    
+    def _update(self):
+        rss = current_rss_bytes()
+        if rss is not None and rss > self.peak_rss:
+            self.peak_rss = rss
+    
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._update()
+    
+    @property
+    def peak_delta_mb(self):
+        if self.start_rss is None:
+            return None
+        return (self.peak_rss - self.start_rss) / (1024 * 1024)
+
+
+def prepare_source_images(target_dir, source_size):
+    """Upscale the fixture images to realistic painting sizes. Returns their image IDs."""
+    image_ids = []
+    for fixture in sorted(FIXTURE_DIR.iterdir()):
+        if fixture.suffix.lower() not in {'.png', '.jpg', '.jpeg'}:
+            continue
+        with Image.open(fixture) as img:
+            scale = source_size / max(img.size)
+            size = (round(img.width * scale), round(img.height * scale))
+            resized = img.convert('RGBA').resize(size, Image.Resampling.LANCZOS)
+        name = f'bench_{fixture.stem}.png'
+        resized.save(Path(target_dir) / name)
+        # Same ID scheme as utils/image_manager.py
+        image_ids.append(hashlib.md5(name.encode()).hexdigest()[:8])
+    return image_ids
+
+
+def build_favorite(image_ids, layer_count, scale_range, max_rotation, hue_probability, seed):
+    """Build a deterministic synthetic favorite for a scenario."""
+    rng = random.Random(seed)
+    layers = []
+    for _ in range(layer_count):
+        layers.append({
+            'imageId': rng.choice(image_ids),
+            'opacity': round(rng.uniform(0.7, 1.0), 2),
+            'transformations': {
+                'rotation': rng.uniform(-max_rotation, max_rotation) if max_rotation else 0,
+                'scale': rng.uniform(*scale_range),
+                'translateX': rng.randint(-400, 400),
+                'translateY': rng.randint(-200, 200),
+                'hueShift': rng.randint(1, 359) if rng.random() < hue_probability else 0
+            }
+        })
+    return {'state': {'layers': layers, 'backgroundColor': 'black'}}
+
+
+def run_scenario(favorite, image_dir, repeat):
+    """Render a favorite repeat times. Returns median stage timings and peak memory."""
+    totals, stage_runs, peaks = [], {stage: [] for stage in STAGES}, []
+    
+    for _ in range(repeat):
+        timings = {}
+        with PeakMemorySampler() as sampler:
+            started = time.perf_counter()
+            # The render path logs every step; keep benchmark output readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = generate_highres_from_favorite(favorite, image_dir=image_dir, timings=timings)
+            totals.append(time.perf_counter() - started)
+        if result is None:
+            raise RuntimeError('Render failed')
+        for stage in STAGES:
+            stage_runs[stage].append(timings.get(stage, 0.0))
+        if sampler.peak_delta_mb is not None:
+            peaks.append(sampler.peak_delta_mb)
+    
+    return {
+        'total_ms': statistics.median(totals) * 1000,
+        'stages_ms': {stage: statistics.median(runs) * 1000 for stage, runs in stage_runs.items()},
+        'peak_memory_mb': max(peaks) if peaks else None
+    }
+
+
+def print_results(results):
+    header = f"{'scenario':<22}{'total':>9}" + ''.join(f'{stage:>11}' for stage in STAGES) + f"{'peak MB':>10}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        stages = ''.join(f"{result['stages_ms'][stage]:>11.1f}" for stage in STAGES)
+        peak = result['peak_memory_mb']
+        peak_text = f'{peak:>10.1f}' if peak is not None else f"{'n/a':>10}"
+        print(f"{name:<22}{result['total_ms']:>9.1f}{stages}{peak_text}")
+    print('(times in milliseconds, median per run)')
+
+
+def compare_results(results, baseline, threshold):
+    """Print the change against a baseline. Returns True if no scenario regressed."""
+    print(f"\n=== Comparison against baseline ({baseline.get('created_at', 'unknown date')}) ===")
+    ok = True
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            print(f'{name:<22} (not in baseline)')
+            continue
+        change = (result['total_ms'] - base['total_ms']) / base['total_ms'] * 100
+        status = 'OK'
+        if change > threshold:
+            status = 'REGRESSION'
+            ok = False
+        elif change < -threshold:
+            status = 'IMPROVED'
+        stage_changes = []
+        for stage in STAGES:
+            before, after = base['stages_ms'].get(stage, 0.0), result['stages_ms'][stage]
+            if before > 1.0:
+                stage_changes.append(f'{stage} {(after - before) / before * 100:+.0f}%')
+        print(f"{name:<22}{base['total_ms']:>9.1f} -> {result['total_ms']:>9.1f} ms "
+              f"({change:+.1f}%) {status}  [{', '.join(stage_changes)}]")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the favorite render pipeline')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per scenario (median is reported)')
+    parser.add_argument('--source-size', type=int, default=1200, help='Longest side of the synthetic source images')
+    parser.add_argument('--scenario', action='append', help='Only run the named scenario (repeatable)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for synthetic favorites')
+    parser.add_argument('--baseline', default='benchmark_baseline.json', help='Baseline file path')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the baseline')
+    parser.add_argument('--compare', action='store_true', help='Compare this run against the baseline')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Regression threshold in percent')
+    
+    args = parser.parse_args()
+    
+    scenarios = [s for s in SCENARIOS if not args.scenario or s[0] in args.scenario]
+    if not scenarios:
+        print(f"No matching scenarios. Available: {', '.join(s[0] for s in SCENARIOS)}")
+        return 1
+    
+    print('=== Render Pipeline Benchmark ===')
+    print(f'Python {platform.python_version()} on {platform.machine()}, '
+          f'{args.repeat} runs per scenario, {args.source_size}px sources\n')
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as image_dir:
+        image_ids = prepare_source_images(image_dir, args.source_size)
+        for scenario in scenarios:
+            name, layer_count, scale_range, max_rotation, hue_probability = scenario
+            # Seed by position in the full list so filtered runs render identical favorites
+            favorite = build_favorite(image_ids, layer_count, scale_range, max_rotation,
+                                      hue_probability, seed=args.seed + SCENARIOS.index(scenario))
+            results[name] = run_scenario(favorite, image_dir, args.repeat)
+    
+    print_results(results)
+    
+    success = True
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f'\nBaseline not found: {args.baseline} (run with --save-baseline first)')
+            return 1
+        with open(args.baseline, 'r') as f:
+            success = compare_results(results, json.load(f), args.threshold)
+    
+    if args.save_baseline:
+        baseline = {
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'machine': platform.machine(),
+            'python': platform.python_version(),
+            'source_size': args.source_size,
+            'results': results
+        }
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f'\nBaseline saved to {args.baseline}')
+    
+    return 0 if success else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
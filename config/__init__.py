@@ -1,7 +1,23 @@
 import os
 import json
 import time
+import hashlib
+import threading
 from threading import Lock
+from collections import namedtuple
+from types import MappingProxyType
+
+# One loaded version of config.json. data is read-only (see freeze); a reload
+# replaces the whole snapshot instead of changing it.
+ConfigSnapshot = namedtuple('ConfigSnapshot', ['version', 'data', 'body', 'etag'])
+
+def freeze(value):
+    """A read-only copy of parsed JSON: dicts become MappingProxyType and lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
 
 def deep_merge_dict(base_dict, override_dict, path="", log_changes=False):
     """Deep merge two dictionaries, with override_dict taking precedence"""
@@ -109,6 +125,16 @@ def load_config_from_json(config_name='development'):
         if debug_config:
             print(f"CONFIG LOAD: No environment-specific config found for '{config_name}'")
     
+    # Fill in hardware-dependent settings from the cached first-boot benchmark (see utils/device_profile.py)
+    if base_config['performance'].get('auto_profile'):
+        from utils.device_profile import load_profile
+        profile = load_profile()
+        if profile:
+            if debug_config:
+                print(f"CONFIG LOAD: Applying '{profile['tier']}' device profile")
+            for section, values in profile['settings'].items():
+                base_config[section] = deep_merge_dict(base_config.get(section, {}), values, section, debug_config)
+    
     # Validate critical fields
     validate_critical_config_fields(base_config, config_name)
     
@@ -125,6 +151,10 @@ class Config:
         self._lock = Lock()
         self._config_data = load_config_from_json(config_name)
         self._load_configuration()
+        self._snapshot = None
+        self._listeners = []
+        self._watcher = None
+        self._update_snapshot()
     
     def _load_configuration(self):
         # Flask configuration
@@ -133,6 +163,16 @@ class Config:
         self.SECRET_KEY = flask_config.get('secret_key', 'dev-secret-key')
         self.FLASK_HOST = flask_config.get('host', '127.0.0.1')
         self.FLASK_PORT = flask_config.get('port', 5000)
+        # Lets /api/debug/* endpoints be used from other machines (sent as X-Debug-Token)
+        self.DEBUG_TOKEN = flask_config.get('debug_token')
+        
+        # Server used by the launcher: 'development' (Werkzeug) or 'production' (waitress)
+        server_config = flask_config.get('server', {})
+        self.SERVER_MODE = server_config.get('mode', 'development')
+        self.SERVER_THREADS = server_config.get('threads', 16)
+        self.SERVER_CONNECTION_LIMIT = server_config.get('connection_limit', 100)
+        self.SERVER_CHANNEL_TIMEOUT = server_config.get('channel_timeout', 120)
+        self.SERVER_BACKLOG = server_config.get('backlog', 1024)
         
         # Application configuration
         app_config = self._config_data.get('application', {})
@@ -145,6 +185,7 @@ class Config:
         self.ENABLE_CACHING = app_config.get('enable_caching', True)
         self.CACHE_MAX_AGE = app_config.get('cache_max_age', 3600)
         self.LAZY_LOADING = app_config.get('lazy_loading', True)
+        self.FAVORITES_DATABASE = app_config.get('favorites_database', 'favorites.db')
         
         # Animation timing configuration
         timing_config = self._config_data.get('animation_timing', {})
@@ -208,6 +249,8 @@ class Config:
         perf_config = self._config_data.get('performance', {})
         self.ANIMATION_QUALITY = perf_config.get('animation_quality', 'high')
         self.PRELOAD_TRANSFORM_CACHE = perf_config.get('preload_transform_cache', True)
+        self.THERMAL_GOVERNOR = perf_config.get('thermal_governor', {})
+        self.AUTO_PROFILE = perf_config.get('auto_profile', False)
         
         # Audio configuration
         audio_config = self._config_data.get('audio', {})
@@ -229,20 +272,66 @@ class Config:
         image_area_config = border_config.get('image_area', {})
         self.MATTE_BORDER_IMAGE_AREA_ASPECT_RATIO = image_area_config.get('aspect_ratio', '1:1')
     
+    def snapshot(self):
+        """The current ConfigSnapshot (version, data, serialized JSON body, ETag)."""
+        return self._snapshot
+    
+    def add_listener(self, callback):
+        """Call callback(snapshot) whenever a reload changes the configuration."""
+        self._listeners.append(callback)
+    
+    def _update_snapshot(self):
+        """Swap in a snapshot of _config_data if its content changed. Returns True if it did."""
+        body = json.dumps(self._config_data, sort_keys=True)
+        if self._snapshot is not None and body == self._snapshot.body:
+            return False
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        etag = hashlib.sha1(body.encode('utf-8')).hexdigest()[:16]
+        # Built from the body rather than _config_data, so later changes to that dict can't leak in
+        self._snapshot = ConfigSnapshot(version, freeze(json.loads(body)), body, etag)
+        return True
+    
+    def start_watching(self, interval=2.0):
+        """
+        Check config.json for changes every interval seconds on a background
+        thread, so requests can serve the current snapshot without checking
+        the file themselves. Safe to call more than once.
+        """
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(target=self._watch, args=(interval,), name='config-watcher', daemon=True)
+            self._watcher.start()
+    
+    def _watch(self, interval):
+        while True:
+            time.sleep(interval)
+            self._reload_if_changed()
+    
     def check_and_reload(self):
         """Check if config file has changed and reload if necessary"""
+        return self._reload_if_changed()
+    
+    def _reload_if_changed(self):
         try:
             current_modified = os.path.getmtime(self._config_path)
             if current_modified > self._last_modified:
                 with self._lock:
                     # Double-check after acquiring lock
                     current_modified = os.path.getmtime(self._config_path)
-                    if current_modified > self._last_modified:
-                        # Silently reload without print statements to avoid debugger issues
-                        self._config_data = load_config_from_json(self._config_name)
-                        self._load_configuration()
-                        self._last_modified = current_modified
-                        return True
+                    if current_modified <= self._last_modified:
+                        return False
+                    # Recorded first so an invalid file is reported once, not on every check;
+                    # load_config_from_json raises for it and the current snapshot stays in place
+                    self._last_modified = current_modified
+                    # Silently reload without print statements to avoid debugger issues
+                    self._config_data = load_config_from_json(self._config_name)
+                    self._load_configuration()
+                    changed = self._update_snapshot()
+                if changed:
+                    for listener in list(self._listeners):
+                        listener(self._snapshot)
+                return True
         except Exception as e:
             # Use app logger or stderr to avoid debugger issues
             import sys
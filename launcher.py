@@ -7,6 +7,7 @@ Cross-platform support for Windows and Raspberry Pi
 
 import os
 import sys
+import json
 import time
 import platform
 import threading
@@ -293,6 +294,64 @@ def wait_for_server(host="127.0.0.1", port=5000, timeout=30):
     print(f"Server failed to start within {timeout} seconds")
     return False
 
+def get_server_options(app_config):
+    """waitress options from the flask.server section of config.json"""
+    return {
+        # Worker threads; open event streams and long-polls each hold one while connected
+        'threads': app_config.get('SERVER_THREADS', 16),
+        'connection_limit': app_config.get('SERVER_CONNECTION_LIMIT', 100),
+        # Idle keep-alive connections are closed after this many seconds
+        'channel_timeout': app_config.get('SERVER_CHANNEL_TIMEOUT', 120),
+        'backlog': app_config.get('SERVER_BACKLOG', 1024),
+        'ident': 'ManyPaintings'
+    }
+
+def serve_production(app, host, port):
+    """Serve the app with waitress (works on Windows and Raspberry Pi)
+    
+    A single process with a thread pool: the event bus, command log and
+    settings store live in memory, so the app must not be split across worker
+    processes. Files sent with send_file (images, thumbnails, static assets)
+    are handed to waitress's file wrapper, which streams them from the I/O
+    thread and frees the worker thread; Flask handles Range and conditional
+    requests for them.
+    """
+    from waitress import serve
+    
+    options = get_server_options(app.config)
+    print(f"Starting production server (waitress) on {host}:{port} "
+          f"with {options['threads']} threads, connection limit {options['connection_limit']}")
+    serve(app, host=host, port=port, **options)
+
+def auto_profile_enabled(resource_path, config_name):
+    """Whether performance.auto_profile is set for config_name in config.json
+    
+    Reads the file directly: importing the config package loads every
+    environment, and with it the device profile, before calibration.
+    """
+    try:
+        with open(os.path.join(resource_path, 'config.json'), 'r') as f:
+            config_data = json.load(f)
+    except (OSError, ValueError):
+        return False
+    performance = dict(config_data.get('performance', {}))
+    performance.update(config_data.get('environments', {}).get(config_name, {}).get('performance', {}))
+    return bool(performance.get('auto_profile'))
+
+def calibrate_device(resource_path):
+    """Benchmark the device on first boot so the config can pick layers, FPS and quality for it
+    
+    The result is cached in device_profile.json (see utils/device_profile.py)
+    and reused until the hardware changes; set RECALIBRATE=1 to measure again.
+    Runs before the app is imported, because the configuration is loaded on import.
+    """
+    try:
+        sys.path.insert(0, resource_path)
+        from utils.device_profile import calibrate
+        calibrate(os.path.join(resource_path, 'static', 'images'), force=os.environ.get('RECALIBRATE') == '1')
+    except Exception as e:
+        print(f"Device calibration failed, using configured settings: {e}")
+
 def run_flask_server():
     """Run Flask server in background thread"""
     try:
@@ -306,6 +365,8 @@ def run_flask_server():
             os.environ['FLASK_CONFIG'] = 'raspberry_pi'
             host = '0.0.0.0'  # Bind to all interfaces for external access
             print("Using Raspberry Pi configuration (external access enabled)")
+            if auto_profile_enabled(resource_path, 'raspberry_pi'):
+                calibrate_device(resource_path)
         else:
             os.environ['FLASK_CONFIG'] = 'production'
             host = '127.0.0.1'  # Keep localhost for Windows/dev
@@ -320,10 +381,17 @@ def run_flask_server():
         app = create_app()
         port = int(os.environ.get('FLASK_PORT', 5000))
         
-        print(f"Starting Flask server on {host}:{port}")
         print(f"Current working directory: {os.getcwd()}")
         print(f"Python path: {sys.path[:3]}...")  # Show first 3 entries
         
+        if app.config.get('SERVER_MODE') == 'production':
+            try:
+                serve_production(app, host, port)
+                return
+            except ImportError:
+                print("waitress is not installed, falling back to the development server")
+        
+        print(f"Starting Flask server on {host}:{port}")
         app.run(host=host, port=port, debug=False, use_reloader=False, threaded=True)
     except Exception as e:
         print(f"ERROR in Flask server startup: {e}")
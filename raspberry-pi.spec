@@ -95,6 +95,7 @@ a = Analysis(
         'utils.image_manager',
         'flask',
         'werkzeug',
+        'waitress',
         'jinja2',
         'PIL',
         'PIL.Image',
@@ -20,6 +20,7 @@ import { GalleryManager } from './ui/GalleryManager.js';
 import { ImageManagerUI } from './modules/imageManagerUI.js';
 import { AnimationEngine } from './modules/AnimationEngine.js';
 import { GridManager } from './utils/GridManager.js';
+import { takeBootstrap, bootstrapEtag } from './utils/Bootstrap.js';
 
 // Application state
 let config = {};
@@ -40,16 +41,21 @@ const App = {
     try {
       console.log('Initializing Many Paintings App...');
 
-      // Initialize ConfigManager and load configuration
-      console.log('Initializing ConfigManager and loading configuration...');
-      const configManager = new ConfigManager();
-      window.configManager = configManager; // Make globally available
-      
-      const configResponse = await fetch('/api/config');
-      if (!configResponse.ok) {
-        throw new Error(`Failed to load config: ${configResponse.status}`);
+      // Load configuration (embedded in the page on first load) and initialize ConfigManager
+      console.log('Loading configuration and initializing ConfigManager...');
+      let apiConfig = takeBootstrap('config');
+      let configEtag = bootstrapEtag('config');
+      if (!apiConfig) {
+        const configResponse = await fetch('/api/config');
+        if (!configResponse.ok) {
+          throw new Error(`Failed to load config: ${configResponse.status}`);
+        }
+        apiConfig = await configResponse.json();
+        configEtag = configResponse.headers.get('ETag');
       }
-      const apiConfig = await configResponse.json();
+      
+      const configManager = new ConfigManager(apiConfig, configEtag);
+      window.configManager = configManager; // Make globally available
       
       // Start config polling for hot reload (every 10 seconds)
       configManager.startPolling(10000);
@@ -1,7 +1,8 @@
 export default class ConfigManager {
-  constructor() {
-    this.config = window.APP_CONFIG || {};
+  constructor(initialConfig = null, etag = null) {
+    this.config = initialConfig || window.APP_CONFIG || {};
     this.lastConfigString = JSON.stringify(this.config);
+    this.etag = etag; // Version of the config last fetched; the server answers 304 while it is current
     this.pollInterval = null;
     this.listeners = new Set();
   }
@@ -53,20 +54,23 @@ export default class ConfigManager {
 
   async checkForConfigChanges() {
     try {
+      // Conditional request: an unchanged config costs a bodyless 304
       const response = await fetch('/api/config', {
-        cache: 'no-cache',
-        headers: {
-          'Cache-Control': 'no-cache',
-          'Pragma': 'no-cache'
-        }
+        cache: 'no-store',
+        headers: this.etag ? { 'If-None-Match': this.etag } : {}
       });
       
+      if (response.status === 304) {
+        return;
+      }
+      
       if (!response.ok) {
         console.error('Failed to fetch config:', response.status);
         return;
       }
       
       const newConfig = await response.json();
+      this.etag = response.headers.get('ETag');
       const newConfigString = JSON.stringify(newConfig);
       
       if (newConfigString !== this.lastConfigString) {
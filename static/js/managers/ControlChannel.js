@@ -0,0 +1,294 @@
+/**
+ * ControlChannel - Sends remote control messages to the server
+ * Uses the /api/control WebSocket when available and falls back to the REST
+ * endpoints otherwise. Setting changes are merged into one delta per flush, so
+ * dragging a slider sends a handful of messages instead of a request per step.
+ */
+
+const COMMAND_ENDPOINTS = {
+    'new-pattern': () => '/api/new-pattern',
+    'play-pause': () => '/api/play-pause',
+    'save-favorite': () => '/api/save-current-favorite',
+    'load-favorite': (params) => `/api/favorites/${encodeURIComponent(params.favorite_id)}/load`
+};
+
+export class ControlChannel {
+    constructor({ onState = () => {}, onStatus = () => {}, enabled = true } = {}) {
+        this.onState = onState;   // Called with display settings pushed by the server
+        this.onStatus = onStatus; // Called with 'connected' / 'disconnected'
+        this.enabled = enabled;   // False when the server cannot serve WebSockets; REST is used throughout
+        this.clientId = `remote-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`;
+        this.target = null; // Display ID commands are sent to (null = all displays)
+
+        this.socket = null;
+        this.connected = false;
+        this.shouldConnect = false;
+        this.reconnectDelay = 1000;
+        this.maxReconnectDelay = 30000;
+        this.reconnectTimer = null;
+        this.pingInterval = 15000; // Keeps the remote counted as active while idle
+        this.pingTimer = null;
+
+        this.seq = 0;
+        this.pendingAcks = new Map(); // seq -> { resolve, reject, timer }
+        this.ackTimeout = 5000;
+
+        // Setting deltas waiting for the next flush
+        this.pendingChanges = null;
+        this.pendingWaiters = [];
+        this.flushTimer = null;
+        this.flushDelay = 100;
+    }
+
+    /**
+     * Open the WebSocket (no-op where the browser or server doesn't support it)
+     */
+    connect() {
+        if (!this.enabled || typeof WebSocket === 'undefined') {
+            return;
+        }
+
+        this.shouldConnect = true;
+        if (this.socket) {
+            return;
+        }
+
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        const url = `${protocol}//${window.location.host}/api/control?client_id=${encodeURIComponent(this.clientId)}`;
+        const socket = new WebSocket(url);
+        this.socket = socket;
+
+        socket.onopen = () => {
+            this.connected = true;
+            this.reconnectDelay = 1000;
+            this.startPing();
+            this.onStatus('connected');
+            console.log('ControlChannel: WebSocket connected');
+        };
+
+        socket.onmessage = (event) => this.handleMessage(event.data);
+
+        socket.onclose = () => {
+            const wasConnected = this.connected;
+            this.socket = null;
+            this.connected = false;
+            this.stopPing();
+            this.rejectPendingAcks(new Error('Control channel closed'));
+
+            if (wasConnected) {
+                console.log('ControlChannel: WebSocket closed, using REST until it reconnects');
+                this.onStatus('disconnected');
+            }
+            if (this.shouldConnect) {
+                this.scheduleReconnect();
+            }
+        };
+
+        // Errors are followed by close, which handles reconnection
+        socket.onerror = () => {};
+    }
+
+    /**
+     * Close the WebSocket and stop reconnecting
+     */
+    disconnect() {
+        this.shouldConnect = false;
+        if (this.reconnectTimer) {
+            clearTimeout(this.reconnectTimer);
+            this.reconnectTimer = null;
+        }
+        if (this.socket) {
+            this.socket.close();
+        }
+    }
+
+    scheduleReconnect() {
+        if (this.reconnectTimer) {
+            return;
+        }
+        this.reconnectTimer = setTimeout(() => {
+            this.reconnectTimer = null;
+            if (this.shouldConnect) {
+                this.connect();
+            }
+        }, this.reconnectDelay);
+        this.reconnectDelay = Math.min(this.reconnectDelay * 2, this.maxReconnectDelay);
+    }
+
+    startPing() {
+        this.stopPing();
+        this.pingTimer = setInterval(() => {
+            this.send({ type: 'ping' }).catch(() => {});
+        }, this.pingInterval);
+    }
+
+    stopPing() {
+        if (this.pingTimer) {
+            clearInterval(this.pingTimer);
+            this.pingTimer = null;
+        }
+    }
+
+    handleMessage(raw) {
+        let message;
+        try {
+            message = JSON.parse(raw);
+        } catch (error) {
+            console.warn('ControlChannel: Ignoring malformed message:', error);
+            return;
+        }
+
+        if (message.type === 'ack') {
+            const pending = this.pendingAcks.get(message.seq);
+            if (!pending) {
+                return;
+            }
+            this.pendingAcks.delete(message.seq);
+            clearTimeout(pending.timer);
+            if (message.ok) {
+                pending.resolve(message);
+            } else {
+                pending.reject(new Error(message.error || 'Request failed'));
+            }
+        } else if (message.type === 'state' && message.settings) {
+            this.onState(message.settings);
+        }
+    }
+
+    rejectPendingAcks(error) {
+        for (const pending of this.pendingAcks.values()) {
+            clearTimeout(pending.timer);
+            pending.reject(error);
+        }
+        this.pendingAcks.clear();
+    }
+
+    /**
+     * Send one message over the WebSocket and wait for its acknowledgement
+     */
+    send(message) {
+        if (!this.connected) {
+            return Promise.reject(new Error('Control channel not connected'));
+        }
+
+        const seq = ++this.seq;
+        return new Promise((resolve, reject) => {
+            const timer = setTimeout(() => {
+                this.pendingAcks.delete(seq);
+                reject(new Error('Timed out waiting for acknowledgement'));
+            }, this.ackTimeout);
+            this.pendingAcks.set(seq, { resolve, reject, timer });
+            this.socket.send(JSON.stringify({ ...message, seq }));
+        });
+    }
+
+    /**
+     * Queue a settings delta. Deltas made before the next flush are merged and
+     * sent together; the promise settles when that batch is saved.
+     */
+    updateSettings(changes) {
+        const merged = this.pendingChanges || {};
+        for (const [key, value] of Object.entries(changes)) {
+            if (key === 'gallery' && merged.gallery) {
+                merged.gallery = { ...merged.gallery, ...value };
+            } else {
+                merged[key] = value;
+            }
+        }
+        this.pendingChanges = merged;
+
+        if (!this.flushTimer) {
+            this.flushTimer = setTimeout(() => this.flush(), this.flushDelay);
+        }
+
+        return new Promise((resolve, reject) => {
+            this.pendingWaiters.push({ resolve, reject });
+        });
+    }
+
+    async flush() {
+        const changes = this.pendingChanges;
+        const waiters = this.pendingWaiters;
+        this.pendingChanges = null;
+        this.pendingWaiters = [];
+        this.flushTimer = null;
+
+        if (!changes) {
+            return;
+        }
+
+        try {
+            let settings;
+            if (this.connected) {
+                try {
+                    settings = (await this.send({ type: 'settings', changes })).settings;
+                } catch (error) {
+                    // Rejected by the server: report it; connection lost: retry over REST
+                    if (this.connected) {
+                        throw error;
+                    }
+                }
+            }
+            if (settings === undefined) {
+                settings = await this.postSettings(changes);
+            }
+            waiters.forEach(waiter => waiter.resolve(settings));
+        } catch (error) {
+            waiters.forEach(waiter => waiter.reject(error));
+        }
+    }
+
+    /**
+     * Send a display command (new-pattern, play-pause, save-favorite, load-favorite)
+     */
+    async sendCommand(command, params = {}) {
+        if (this.target) {
+            params = { ...params, display_id: this.target };
+        }
+        if (this.connected) {
+            try {
+                return await this.send({ type: 'command', command, ...params });
+            } catch (error) {
+                // Rejected by the server: report it; connection lost: retry over REST
+                if (this.connected) {
+                    throw error;
+                }
+            }
+        }
+        return this.postCommand(command, params);
+    }
+
+    async postSettings(changes) {
+        const response = await fetch('/api/settings', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-Client-Id': this.clientId
+            },
+            body: JSON.stringify(changes)
+        });
+
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+
+        return (await response.json()).settings;
+    }
+
+    async postCommand(command, params) {
+        const endpoint = COMMAND_ENDPOINTS[command];
+        if (!endpoint) {
+            throw new Error(`Unknown command: ${command}`);
+        }
+
+        const response = await fetch(endpoint(params), {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(params.display_id ? { display_id: params.display_id } : {})
+        });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        return response.json();
+    }
+}
@@ -3,210 +3,6 @@
  * Extracted from main.js for better modularity
  */
 export const FavoritesManager = {
-  async captureCanvasThumbnail() {
-    try {
-      // Check if html2canvas is available
-      if (typeof html2canvas === 'undefined') {
-        console.error('FavoritesManager: html2canvas library not loaded');
-        return null;
-      }
-
-      // Get the image layers container
-      const layersContainer = document.getElementById('image-layers');
-      if (!layersContainer) {
-        throw new Error('Image layers container not found');
-      }
-
-      console.log('FavoritesManager: Capturing thumbnail with html2canvas...');
-
-      // Use html2canvas to capture the layers container
-      const canvas = await html2canvas(layersContainer, {
-        width: layersContainer.offsetWidth,
-        height: layersContainer.offsetHeight,
-        backgroundColor: null, // Keep transparency to get the actual background
-        scale: 200 / Math.max(layersContainer.offsetWidth, layersContainer.offsetHeight), // Scale to fit 200px
-        logging: false,
-        useCORS: true, // Allow cross-origin images
-        allowTaint: true, // Allow images from same origin
-        ignoreElements: (element) => {
-          // Don't ignore any elements - capture everything including opacity
-          return false;
-        },
-        onclone: (clonedDoc, element) => {
-          // Ensure all computed styles are preserved in the clone, especially opacity
-          const originalLayers = layersContainer.querySelectorAll('.image-layer');
-          const clonedLayers = element.querySelectorAll('.image-layer');
-          
-          originalLayers.forEach((originalLayer, index) => {
-            if (clonedLayers[index]) {
-              const computedStyle = window.getComputedStyle(originalLayer);
-              const clonedLayer = clonedLayers[index];
-              
-              // Force all styles to ensure they're preserved
-              clonedLayer.style.opacity = computedStyle.opacity;
-              clonedLayer.style.transform = computedStyle.transform;
-              clonedLayer.style.filter = computedStyle.filter;
-              clonedLayer.style.display = computedStyle.display;
-              clonedLayer.style.visibility = computedStyle.visibility;
-              clonedLayer.style.position = computedStyle.position;
-              clonedLayer.style.left = computedStyle.left;
-              clonedLayer.style.top = computedStyle.top;
-              clonedLayer.style.width = computedStyle.width;
-              clonedLayer.style.height = computedStyle.height;
-              clonedLayer.style.zIndex = computedStyle.zIndex;
-              
-              // Force remove any transitions that might interfere
-              clonedLayer.style.transition = 'none';
-              clonedLayer.style.animation = 'none';
-              
-              // Ensure minimum opacity for very low values
-              const opacity = parseFloat(computedStyle.opacity);
-              if (opacity > 0 && opacity < 0.01) {
-                clonedLayer.style.opacity = '0.01'; // Make very low opacity visible
-              }
-            }
-          });
-        }
-      });
-
-      // Create final thumbnail canvas at 200x200
-      const thumbnailCanvas = document.createElement('canvas');
-      const ctx = thumbnailCanvas.getContext('2d');
-      thumbnailCanvas.width = 200;
-      thumbnailCanvas.height = 200;
-
-      // Fill background color first - check the actual background mode
-      const isWhiteBackground = document.body.classList.contains('white-background');
-      const bgColor = isWhiteBackground ? '#ffffff' : '#000000';
-      ctx.fillStyle = bgColor;
-      ctx.fillRect(0, 0, 200, 200);
-
-      // Calculate centering for the captured canvas
-      const scale = Math.min(200 / canvas.width, 200 / canvas.height);
-      const scaledWidth = canvas.width * scale;
-      const scaledHeight = canvas.height * scale;
-      const x = (200 - scaledWidth) / 2;
-      const y = (200 - scaledHeight) / 2;
-
-      // Draw the captured canvas centered in the thumbnail
-      ctx.drawImage(canvas, x, y, scaledWidth, scaledHeight);
-
-      console.log('FavoritesManager: Thumbnail captured successfully');
-      return thumbnailCanvas.toDataURL('image/png', 0.8);
-      
-    } catch (error) {
-      console.error('FavoritesManager: Failed to capture canvas thumbnail:', error);
-      return null;
-    }
-  },
-
-  async captureHighResolution() {
-    /**
-     * Capture high-resolution 1920x1080 image for hero display and export.
-     * This will be used by the backend API to generate proper high-res images
-     * instead of scaling up thumbnails.
-     */
-    try {
-      // Check if html2canvas is available
-      if (typeof html2canvas === 'undefined') {
-        console.error('FavoritesManager: html2canvas library not loaded');
-        return null;
-      }
-
-      // Get the image layers container
-      const layersContainer = document.getElementById('image-layers');
-      if (!layersContainer) {
-        throw new Error('Image layers container not found');
-      }
-
-      console.log('FavoritesManager: Capturing high-resolution image at 1920x1080...');
-
-      // Calculate scale to achieve 1920px width
-      const targetWidth = 1920;
-      const currentWidth = layersContainer.offsetWidth;
-      const scale = targetWidth / currentWidth;
-
-      // Use html2canvas to capture at high resolution
-      const canvas = await html2canvas(layersContainer, {
-        width: layersContainer.offsetWidth,
-        height: layersContainer.offsetHeight,
-        scale: scale, // Scale to achieve 1920px width
-        backgroundColor: null, // Keep transparency to get the actual background
-        logging: false,
-        useCORS: true,
-        allowTaint: true,
-        ignoreElements: (element) => {
-          // Don't ignore any elements - capture everything including opacity
-          return false;
-        },
-        onclone: (clonedDoc, element) => {
-          // Ensure all computed styles are preserved in the clone
-          const originalLayers = layersContainer.querySelectorAll('.image-layer');
-          const clonedLayers = element.querySelectorAll('.image-layer');
-          
-          originalLayers.forEach((originalLayer, index) => {
-            if (clonedLayers[index]) {
-              const computedStyle = window.getComputedStyle(originalLayer);
-              const clonedLayer = clonedLayers[index];
-              
-              // Force all styles to ensure they're preserved
-              clonedLayer.style.opacity = computedStyle.opacity;
-              clonedLayer.style.transform = computedStyle.transform;
-              clonedLayer.style.filter = computedStyle.filter;
-              clonedLayer.style.display = computedStyle.display;
-              clonedLayer.style.visibility = computedStyle.visibility;
-              clonedLayer.style.position = computedStyle.position;
-              clonedLayer.style.left = computedStyle.left;
-              clonedLayer.style.top = computedStyle.top;
-              clonedLayer.style.width = computedStyle.width;
-              clonedLayer.style.height = computedStyle.height;
-              clonedLayer.style.zIndex = computedStyle.zIndex;
-              
-              // Force remove any transitions that might interfere
-              clonedLayer.style.transition = 'none';
-              clonedLayer.style.animation = 'none';
-              
-              // Ensure minimum opacity for very low values
-              const opacity = parseFloat(computedStyle.opacity);
-              if (opacity > 0 && opacity < 0.01) {
-                clonedLayer.style.opacity = '0.01'; // Make very low opacity visible
-              }
-            }
-          });
-        }
-      });
-
-      // Create final high-resolution canvas at exactly 1920x1080
-      const hdCanvas = document.createElement('canvas');
-      const ctx = hdCanvas.getContext('2d');
-      hdCanvas.width = 1920;
-      hdCanvas.height = 1080;
-
-      // Fill background color first - check the actual background mode
-      const isWhiteBackground = document.body.classList.contains('white-background');
-      const bgColor = isWhiteBackground ? '#ffffff' : '#000000';
-      ctx.fillStyle = bgColor;
-      ctx.fillRect(0, 0, 1920, 1080);
-
-      // Calculate centering for the captured canvas on 1920x1080
-      const scale1080 = Math.min(1920 / canvas.width, 1080 / canvas.height);
-      const scaledWidth = canvas.width * scale1080;
-      const scaledHeight = canvas.height * scale1080;
-      const x = (1920 - scaledWidth) / 2;
-      const y = (1080 - scaledHeight) / 2;
-
-      // Draw the captured canvas centered in the 1920x1080 frame
-      ctx.drawImage(canvas, x, y, scaledWidth, scaledHeight);
-
-      console.log('FavoritesManager: High-resolution image captured successfully (1920x1080)');
-      return hdCanvas.toDataURL('image/png', 0.95); // Higher quality for high-res
-      
-    } catch (error) {
-      console.error('FavoritesManager: Failed to capture high-resolution image:', error);
-      return null;
-    }
-  },
-
   async captureCurrentState() {
     // Capture only visible layers from AnimationEngine
     const layers = [];
@@ -259,17 +55,16 @@ export const FavoritesManager = {
   async saveFavorite() {
     try {
       const state = await this.captureCurrentState();
-      const thumbnail = await this.captureCanvasThumbnail();
 
+      // Thumbnail is rendered server-side from the layer state, so no DOM capture
+      // is needed here and the animation keeps running smoothly
       const favoriteData = {
-        state: state,
-        thumbnail: thumbnail
+        state: state
       };
 
-      console.log('FavoritesManager: Saving favorite with thumbnail:', {
+      console.log('FavoritesManager: Saving favorite:', {
         stateSize: JSON.stringify(state).length,
-        thumbnailSize: thumbnail ? thumbnail.length : 0,
-        hasThumbnail: !!thumbnail
+        layerCount: state.layers.length
       });
 
       const response = await fetch('/api/favorites', {
@@ -409,6 +204,21 @@ export const FavoritesManager = {
     }
   },
 
+  async listFavoritesPage({ limit = 24, cursor = null, fields = null } = {}) {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) params.set('cursor', cursor);
+    if (fields) params.set('fields', fields.join(','));
+
+    const response = await fetch(`/api/favorites?${params}`);
+
+    if (!response.ok) {
+      throw new Error(`Failed to load favorites: ${response.statusText}`);
+    }
+
+    // { favorites, next_cursor, total }
+    return response.json();
+  },
+
   async deleteFavorite(favoriteId) {
     try {
       const response = await fetch(`/api/favorites/${favoriteId}`, {
@@ -2,6 +2,8 @@
  * Image Manager - Handles loading, caching, and memory management
  * Extracted from main.js for better modularity
  */
+import { takeBootstrap } from '../utils/Bootstrap.js';
+
 export const ImageManager = {
   images: new Map(),
   loadedImages: new Map(),
@@ -12,16 +14,8 @@ export const ImageManager = {
 
   async init() {
     try {
-      // Add cache-busting parameter to prevent stale data
-      const cacheBuster = Date.now();
-      const response = await fetch(`/api/images?_t=${cacheBuster}`, {
-        cache: 'no-cache',
-        headers: {
-          'Cache-Control': 'no-cache',
-          'Pragma': 'no-cache'
-        }
-      });
-      const data = await response.json();
+      // The page carries the catalog on first load; reloads (e.g. after an upload) fetch it
+      const data = takeBootstrap('images') || await this.fetchCatalog();
 
       this.images.clear();
       data.images.forEach(img => {
@@ -39,6 +33,19 @@ export const ImageManager = {
     }
   },
 
+  async fetchCatalog() {
+    // Add cache-busting parameter to prevent stale data
+    const cacheBuster = Date.now();
+    const response = await fetch(`/api/images?_t=${cacheBuster}`, {
+      cache: 'no-cache',
+      headers: {
+        'Cache-Control': 'no-cache',
+        'Pragma': 'no-cache'
+      }
+    });
+    return response.json();
+  },
+
   async loadImage(imageId) {
     if (this.loadedImages.has(imageId)) {
       return this.loadedImages.get(imageId);
@@ -51,7 +58,15 @@ export const ImageManager = {
 
     return new Promise((resolve, reject) => {
       const img = new Image();
-      img.onload = () => {
+      img.onload = async () => {
+        // Decode now, off the main thread, so the first paint of the layer doesn't stall a frame
+        const decodeStart = performance.now();
+        try {
+          await img.decode();
+          window.App?.AnimationEngine?.recordImageDecode(performance.now() - decodeStart);
+        } catch (error) {
+          // Decoding will happen on first paint instead
+        }
         this.loadedImages.set(imageId, img);
         console.log(`ImageManager: Loaded image ${imageInfo.filename}`);
         resolve(img);
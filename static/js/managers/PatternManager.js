@@ -2,6 +2,8 @@
  * Pattern Manager - Handles deterministic pattern generation and image sequencing
  * Extracted from main.js for better modularity
  */
+import { takeBootstrap } from '../utils/Bootstrap.js';
+
 export const PatternManager = {
   currentPattern: null,
   currentSeed: null,
@@ -11,9 +13,18 @@ export const PatternManager = {
   initialPatternCode: null,
 
   async init() {
-    // Fetch initial pattern code from config
-    await this.loadInitialPatternCode();
-    await this.generateNewPattern(this.initialPatternCode);
+    // The page carries the initial pattern (the configured code or a fresh seed); otherwise fetch the config
+    const pattern = takeBootstrap('pattern');
+    let seed;
+    if (pattern) {
+      this.initialPatternCode = pattern.initial_pattern_code;
+      seed = pattern.seed;
+      console.log(`PatternManager: Initial pattern from page - seed: ${seed}, fixed: ${!!this.initialPatternCode}`);
+    } else {
+      await this.loadInitialPatternCode();
+      seed = this.initialPatternCode;
+    }
+    await this.generateNewPattern(seed);
     this.startPatternSequence();
   },
 
@@ -29,7 +40,7 @@ export const PatternManager = {
       const configData = await response.json();
       
       // Use config pattern if set, otherwise will generate random
-      this.initialPatternCode = configData.initial_pattern_code;
+      this.initialPatternCode = configData.application?.initial_pattern_code ?? configData.initial_pattern_code;
 
       console.log(`PatternManager: Config loaded - initial_pattern_code: ${this.initialPatternCode}`);
 
@@ -75,7 +86,8 @@ export const PatternManager = {
 
       // Preload upcoming images
       const config = window.APP_CONFIG || {};
-      const upcomingImages = this.imageSequence.slice(0, config.application?.preload_buffer_size || 5);
+      const preloadDepth = window.App?.AnimationEngine?.limitPreloadDepth(config.application?.preload_buffer_size || 5) ?? (config.application?.preload_buffer_size || 5);
+      const upcomingImages = this.imageSequence.slice(0, preloadDepth);
       await ImageManager.preloadImages(upcomingImages, true);
 
     } catch (error) {
@@ -85,6 +97,7 @@ export const PatternManager = {
   },
 
   generateDeterministicSequence(seed, length) {
+    // utils/pattern_sequence.py repeats this on the server to preload the first images; keep them in step
     // Create a seeded random number generator
     const seededRandom = this.createSeededRandom(seed);
 
@@ -282,7 +295,8 @@ export const PatternManager = {
 
     // Preload upcoming images (regardless of success/failure)
     const config = window.APP_CONFIG || {};
-    const upcomingCount = Math.min(config.application?.preload_buffer_size || 5, this.imageSequence.length);
+    const preloadDepth = window.App?.AnimationEngine?.limitPreloadDepth(config.application?.preload_buffer_size || 5) ?? (config.application?.preload_buffer_size || 5);
+    const upcomingCount = Math.min(preloadDepth, this.imageSequence.length);
     const upcomingImages = [];
 
     for (let i = 0; i < upcomingCount; i++) {
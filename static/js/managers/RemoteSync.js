@@ -1,6 +1,8 @@
 /**
  * RemoteSync Manager - Handles synchronization with remote control changes
- * Polls server for setting changes and applies them to the main display
+ * Subscribes to the server's /api/events stream and applies remote changes to
+ * the main display, falling back to long-polling /api/commands/wait where
+ * EventSource is unavailable or the stream cannot get through a proxy
  */
 
 export class RemoteSync {
@@ -10,11 +12,29 @@ export class RemoteSync {
         this.isPolling = false;
         this.pollTimer = null;
         this.lastSettings = {};
-        this.lastPollTime = 0;
-        this.lastPatternRequest = null; // Track last pattern request timestamp
         this.hasActiveRemotes = false; // Track if we currently have active remotes
         this.consecutiveEmptyChecks = 0; // Count consecutive checks with no remotes
         
+        // Server-Sent Events subscription
+        this.eventSource = null;
+        this.eventQueue = Promise.resolve(); // Handle events one at a time, in order
+        // Highest command sequence number handled, so a command seen twice runs once
+        this.lastCommandSeq = 0;
+        // Sequence numbers restart at 1 with the server; one this far below the last is from a new log
+        this.commandSeqRestartGap = 256;
+        
+        // Long-poll fallback: one held request returns every pending event
+        this.isLongPolling = false;
+        this.longPollCursor = null;
+        this.longPollController = null;
+        this.longPollRetryDelay = 1000;
+        // Sent as X-Client-Id with our own settings saves so their echoes are not treated as remote changes
+        this.clientId = `display-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`;
+        // Stable ID in the server's display registry, used for targeted commands and state reports
+        this.displayId = RemoteSync.resolveDisplayId();
+        this.stateReportInterval = 10000;
+        this.stateReportTimer = null;
+        
         // Global toast cooldown to prevent spam
         this.lastToastTime = 0;
         this.toastCooldownPeriod = 2000; // 2 seconds between toasts
@@ -23,22 +43,371 @@ export class RemoteSync {
     }
     
     /**
-     * Start polling for remote changes
+     * Start listening for remote changes
      */
     async init() {
         try {
             // Load initial settings to establish baseline
             await this.loadCurrentSettings();
             
-            // Start polling
-            this.startPolling();
+            // Register so commands sent from here on are kept for us, then report state periodically
+            await this.registerDisplay();
+            this.startStateReporting();
+            await this.loadThermalState();
             
-            console.log('RemoteSync: Started polling for remote changes');
+            if (typeof EventSource !== 'undefined') {
+                this.connectEvents();
+                console.log('RemoteSync: Subscribed to server events');
+            } else {
+                this.startLongPolling();
+                console.log('RemoteSync: EventSource unavailable, long-polling for remote changes');
+            }
         } catch (error) {
             console.error('RemoteSync: Failed to initialize:', error);
         }
     }
     
+    /**
+     * Subscribe to the server event stream. The browser reconnects on its own
+     * and resumes from the last event ID it received.
+     */
+    connectEvents() {
+        if (this.eventSource) {
+            return;
+        }
+        
+        this.eventSource = new EventSource(`/api/events?display_id=${encodeURIComponent(this.displayId)}`);
+        
+        for (const type of Object.keys(this.eventHandlers())) {
+            this.eventSource.addEventListener(type, (event) => {
+                let data = {};
+                try {
+                    data = JSON.parse(event.data);
+                } catch (error) {
+                    console.warn(`RemoteSync: Ignoring malformed ${type} event:`, error);
+                    return;
+                }
+                this.queueEvent(type, data);
+            });
+        }
+        
+        // Commands sent before the stream (re)opened are waiting in the command log;
+        // any the stream also delivers are skipped by sequence number
+        this.eventSource.onopen = () => this.checkCommands();
+        
+        this.eventSource.onerror = () => {
+            if (this.eventSource && this.eventSource.readyState === EventSource.CLOSED) {
+                // The stream was refused (e.g. by a buffering proxy); fall back to long-polling
+                console.warn('RemoteSync: Event stream closed, falling back to long-polling');
+                this.disconnectEvents();
+                this.startLongPolling();
+            } else {
+                console.warn('RemoteSync: Event stream interrupted, reconnecting...');
+            }
+        };
+    }
+    
+    /**
+     * Handlers for each server event type (shared by the stream and long-poll transports)
+     */
+    eventHandlers() {
+        return {
+            'settings': (data) => this.handleSettingsEvent(data),
+            'new-pattern': () => this.generateNewPatternFromRemote(),
+            'load-favorite': (data) => this.loadFavoriteFromRequest(data),
+            'save-favorite': () => this.saveFavoriteFromRemote(),
+            'play-pause': () => this.handlePlayPauseFromRemote(),
+            'refresh-images': (data) => this.handleImageRefreshFromRemote(data.uploaded_image_ids || []),
+            'remotes': (data) => this.handleRemotesEvent(data),
+            // config.json was reloaded on the server; fetch it now instead of waiting for the next poll
+            'config': () => window.configManager?.checkForConfigChanges(),
+            // The server's thermal governor changed level
+            'thermal': (data) => window.App?.AnimationEngine?.applyThermalLimits(data),
+            // Events were missed while disconnected (or the server restarted and its
+            // command sequence began again); catch up on settings, thermal limits and
+            // pending commands. checkCommands waits on this queue, so it isn't awaited here
+            'resync': () => {
+                this.lastCommandSeq = 0;
+                this.checkCommands();
+                return Promise.all([this.checkSettingsChanges(), this.loadThermalState()]);
+            }
+        };
+    }
+    
+    /**
+     * Apply the thermal governor's current limits (pushed as 'thermal' events after this)
+     */
+    async loadThermalState() {
+        try {
+            const response = await fetch('/api/thermal');
+            if (response.ok) {
+                const state = await response.json();
+                if (state.level > 0 || window.App?.AnimationEngine?.thermalLimits) {
+                    window.App?.AnimationEngine?.applyThermalLimits(state);
+                }
+            }
+        } catch (error) {
+            console.warn('RemoteSync: Failed to load thermal state:', error);
+        }
+    }
+    
+    /**
+     * Track the number of active remotes, pushed by the server whenever it changes
+     */
+    handleRemotesEvent(data) {
+        const hasRemotes = data.active_remotes > 0;
+        if (hasRemotes !== this.hasActiveRemotes) {
+            console.log(`RemoteSync: ${hasRemotes ? `${data.active_remotes} remote(s) connected` : 'No active remotes'}`);
+        }
+        this.hasActiveRemotes = hasRemotes;
+    }
+    
+    /**
+     * Queue a server event so events are applied one at a time, in order
+     */
+    queueEvent(type, data) {
+        const handler = this.eventHandlers()[type];
+        if (!handler) {
+            return;
+        }
+        console.log(`RemoteSync: Received ${type} event`);
+        this.eventQueue = this.eventQueue
+            .then(async () => {
+                // Commands carry a sequence number; skip ones already handled via another transport
+                if (data.seq !== undefined) {
+                    if (data.seq < this.lastCommandSeq - this.commandSeqRestartGap) {
+                        console.log('RemoteSync: Command sequence restarted (server restart), accepting new commands');
+                        this.lastCommandSeq = 0;
+                    }
+                    if (data.seq <= this.lastCommandSeq) {
+                        return;
+                    }
+                    this.lastCommandSeq = data.seq;
+                }
+                await handler(data);
+                if (data.seq !== undefined) {
+                    this.ackCommand(data.seq);
+                    // Commands usually change the seed, layers or play state
+                    this.reportState();
+                }
+            })
+            .catch(error => console.error(`RemoteSync: Failed to handle ${type} event:`, error));
+    }
+    
+    /**
+     * This display's registry ID: ?display=<id> in the page URL (e.g. a kiosk
+     * started as /kiosk?display=projector), otherwise one generated once and
+     * kept in localStorage
+     */
+    static resolveDisplayId() {
+        const fromUrl = new URLSearchParams(window.location.search).get('display');
+        if (fromUrl) {
+            return fromUrl;
+        }
+        
+        try {
+            let displayId = localStorage.getItem('manypaintings-display-id');
+            if (!displayId) {
+                displayId = `display-${Math.random().toString(36).slice(2, 10)}`;
+                localStorage.setItem('manypaintings-display-id', displayId);
+            }
+            return displayId;
+        } catch (error) {
+            // Storage unavailable (e.g. private mode); use a per-page ID
+            return `display-${Math.random().toString(36).slice(2, 10)}`;
+        }
+    }
+    
+    /**
+     * Register with the server's display registry
+     */
+    async registerDisplay() {
+        try {
+            const response = await fetch('/api/displays', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    display_id: this.displayId,
+                    name: new URLSearchParams(window.location.search).get('name') || this.displayId,
+                    kiosk: !!window.kioskMode
+                })
+            });
+            if (response.ok) {
+                console.log(`RemoteSync: Registered as display ${this.displayId}`);
+            }
+        } catch (error) {
+            console.warn('RemoteSync: Failed to register display:', error);
+        }
+    }
+    
+    /**
+     * Report pattern seed, layer count and frame rate every stateReportInterval
+     */
+    startStateReporting() {
+        if (this.stateReportTimer) {
+            return;
+        }
+        this.reportState();
+        this.stateReportTimer = setInterval(() => this.reportState(), this.stateReportInterval);
+    }
+    
+    reportState() {
+        const AnimationEngine = window.App?.AnimationEngine;
+        const PatternManager = window.App?.PatternManager;
+        const state = {
+            seed: PatternManager?.currentSeed ?? null,
+            layers: AnimationEngine ? AnimationEngine.activeLayers.size : null,
+            fps: AnimationEngine ? AnimationEngine.measuredFps : null,
+            isPlaying: AnimationEngine ? AnimationEngine.isPlaying : null,
+            width: window.innerWidth,
+            height: window.innerHeight
+        };
+        
+        fetch(`/api/displays/${encodeURIComponent(this.displayId)}/state`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(state)
+        }).catch(error => console.warn('RemoteSync: Failed to report display state:', error));
+    }
+    
+    /**
+     * Fetch the commands this display has not acknowledged yet
+     */
+    async fetchCommands() {
+        try {
+            const response = await fetch(`/api/commands?display_id=${encodeURIComponent(this.displayId)}`);
+            if (!response.ok) {
+                return [];
+            }
+            const result = await response.json();
+            if (result.missed > 0) {
+                console.warn(`RemoteSync: ${result.missed} command(s) expired before they were read`);
+            }
+            return result.commands;
+        } catch (error) {
+            console.warn('RemoteSync: Failed to fetch commands:', error);
+            return [];
+        }
+    }
+    
+    /**
+     * Poll for pending commands and apply them in order
+     */
+    async checkCommands() {
+        const commands = await this.fetchCommands();
+        for (const command of commands) {
+            this.queueEvent(command.type, { ...command.data, seq: command.seq, timestamp: command.timestamp });
+        }
+        await this.eventQueue;
+    }
+    
+    /**
+     * Tell the server a command has been processed so it is not delivered again
+     */
+    ackCommand(seq) {
+        fetch('/api/commands/ack', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ display_id: this.displayId, seq })
+        }).catch(error => console.warn('RemoteSync: Failed to acknowledge command:', error));
+    }
+    
+    /**
+     * Start long-polling /api/commands/wait. Each request is held by the server
+     * until something happens, so an idle display makes one request every ~25s.
+     */
+    async startLongPolling() {
+        if (this.isLongPolling) {
+            return;
+        }
+        this.isLongPolling = true;
+        
+        while (this.isLongPolling) {
+            try {
+                const query = new URLSearchParams({ display_id: this.displayId });
+                if (this.longPollCursor !== null) {
+                    query.set('cursor', this.longPollCursor);
+                }
+                this.longPollController = new AbortController();
+                const response = await fetch(`/api/commands/wait?${query}`, { signal: this.longPollController.signal });
+                
+                if (response.status === 404) {
+                    // Older server without the endpoint
+                    console.warn('RemoteSync: Long-poll endpoint unavailable, falling back to polling');
+                    this.stopLongPolling();
+                    this.startPolling();
+                    return;
+                }
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+                
+                const result = await response.json();
+                if (result.resync) {
+                    // The resync handler also reads pending commands
+                    this.queueEvent('resync', {});
+                } else if (this.longPollCursor === null) {
+                    // The first poll only returns a cursor; commands already waiting are in the command log
+                    this.checkCommands();
+                }
+                for (const event of result.events) {
+                    this.queueEvent(event.type, { ...event.data, timestamp: event.timestamp });
+                }
+                this.longPollCursor = result.cursor;
+                this.longPollRetryDelay = 1000;
+            } catch (error) {
+                if (!this.isLongPolling) {
+                    return;
+                }
+                console.warn('RemoteSync: Long-poll failed, retrying:', error);
+                await new Promise(resolve => setTimeout(resolve, this.longPollRetryDelay));
+                this.longPollRetryDelay = Math.min(this.longPollRetryDelay * 2, 30000);
+            }
+        }
+    }
+    
+    /**
+     * Stop long-polling and abort the held request
+     */
+    stopLongPolling() {
+        this.isLongPolling = false;
+        if (this.longPollController) {
+            this.longPollController.abort();
+            this.longPollController = null;
+        }
+    }
+    
+    /**
+     * Close the event stream subscription
+     */
+    disconnectEvents() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+    }
+    
+    /**
+     * Apply a settings change pushed by the server
+     */
+    async handleSettingsEvent(data) {
+        const newSettings = data.settings || {};
+        
+        if (data.source === this.clientId) {
+            // Our own save echoed back; the display already shows it
+            this.lastSettings = newSettings;
+            return;
+        }
+        
+        const changes = this.detectSettingsChanges(this.lastSettings, newSettings);
+        this.lastSettings = newSettings;
+        
+        if (Object.keys(changes).length > 0) {
+            console.log('RemoteSync: Settings changed remotely:', changes);
+            await this.applySettingsChanges(changes);
+        }
+    }
+    
     /**
      * Load current settings from server to establish baseline
      */
@@ -129,20 +498,8 @@ export class RemoteSync {
                 // Check for settings changes
                 await this.checkSettingsChanges();
                 
-                // Check for pattern generation requests
-                await this.checkPatternRequests();
-                
-                // Check for favorite load requests
-                await this.checkFavoriteRequests();
-                
-                // Check for save favorite requests
-                await this.checkSimpleSaveFavoriteRequests();
-                
-                // Check for play/pause requests
-                await this.checkPlayPauseRequests();
-                
-                // Check for image refresh requests
-                await this.checkImageRefreshRequests();
+                // Check for commands (patterns, favorites, play/pause, image refresh)
+                await this.checkCommands();
                 
                 this.consecutiveEmptyChecks = 0;
             } else {
@@ -316,36 +673,6 @@ export class RemoteSync {
         }
     }
     
-    /**
-     * Check for new pattern generation requests
-     */
-    async checkPatternRequests() {
-        try {
-            const response = await fetch('/api/settings');
-            if (!response.ok) return;
-            
-            const settings = await response.json();
-            
-            // Initialize lastPatternRequest on first poll to avoid false positives
-            if (this.lastPatternRequest === null) {
-                this.lastPatternRequest = settings.newPatternRequest || 0;
-                console.log('RemoteSync: Initialized pattern request tracking');
-                return; // Skip triggering on initialization
-            }
-            
-            // Check if there's a new pattern request timestamp
-            if (settings.newPatternRequest && settings.newPatternRequest !== this.lastPatternRequest) {
-                console.log('RemoteSync: New pattern request detected');
-                this.lastPatternRequest = settings.newPatternRequest;
-                
-                // Trigger new pattern generation
-                await this.generateNewPatternFromRemote();
-            }
-        } catch (error) {
-            console.warn('RemoteSync: Failed to check pattern requests:', error);
-        }
-    }
-
     /**
      * Generate a new pattern triggered by remote control
      */
@@ -374,76 +701,6 @@ export class RemoteSync {
         }
     }
     
-    /**
-     * Check for favorite load requests
-     */
-    async checkFavoriteRequests() {
-        try {
-            const response = await fetch('/api/load-favorite-status');
-            if (response.ok) {
-                const status = await response.json();
-                
-                if (status.has_request && status.request) {
-                    const requestTime = new Date(status.request.timestamp).getTime();
-                    
-                    // Only process requests newer than our last poll
-                    if (requestTime > this.lastPollTime) {
-                        console.log('RemoteSync: Detected favorite load request:', status.request.favorite_id);
-                        await this.loadFavoriteFromRequest(status.request);
-                        
-                        // Clean up the request file
-                        await fetch('/load_favorite.json', { method: 'DELETE' }).catch(() => {});
-                    }
-                }
-                // No logging needed when has_request is false - this is normal
-            } else {
-                console.warn('RemoteSync: Failed to check favorite load status:', response.status);
-            }
-        } catch (error) {
-            console.warn('RemoteSync: Error checking favorite requests:', error);
-        }
-        
-        this.lastPollTime = Date.now();
-    }
-    
-    /**
-     * Check for save favorite requests (simplified approach)
-     */
-    async checkSimpleSaveFavoriteRequests() {
-        try {
-            const response = await fetch('/api/check-save-favorite');
-            if (response.ok) {
-                const result = await response.json();
-                
-                if (result.has_request) {
-                    console.log('RemoteSync: Detected save favorite request from remote');
-                    await this.saveFavoriteFromRemote();
-                }
-            }
-        } catch (error) {
-            // This is expected when no requests are pending
-        }
-    }
-    
-    /**
-     * Check for play/pause requests
-     */
-    async checkPlayPauseRequests() {
-        try {
-            const response = await fetch('/api/check-play-pause');
-            if (response.ok) {
-                const result = await response.json();
-                
-                if (result.has_request) {
-                    console.log('RemoteSync: Detected play/pause request from remote');
-                    await this.handlePlayPauseFromRemote();
-                }
-            }
-        } catch (error) {
-            // This is expected when no requests are pending
-        }
-    }
-    
     /**
      * Handle play/pause triggered by remote control
      */
@@ -507,28 +764,6 @@ export class RemoteSync {
         }
     }
     
-    /**
-     * Check for image refresh requests from remote control
-     */
-    async checkImageRefreshRequests() {
-        try {
-            const response = await fetch('/api/check-refresh-images');
-            if (response.ok) {
-                const result = await response.json();
-                
-                if (result.has_request) {
-                    console.log('RemoteSync: Detected image refresh request from remote with uploaded IDs:', result.uploaded_image_ids);
-                    await this.handleImageRefreshFromRemote(result.uploaded_image_ids || []);
-                    
-                    // Clear the request
-                    await fetch('/api/refresh-images-status', { method: 'DELETE' }).catch(() => {});
-                }
-            }
-        } catch (error) {
-            // This is expected when no requests are pending
-        }
-    }
-    
     /**
      * Handle image refresh triggered by remote control
      */
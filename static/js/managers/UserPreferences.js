@@ -2,6 +2,8 @@
  * UserPreferences Manager - Handles server-side storage for user settings
  * Provides centralized management of user preferences with API integration
  */
+import { takeBootstrap } from '../utils/Bootstrap.js';
+
 export class UserPreferences {
     constructor() {
         this.VERSION = '1.0';
@@ -35,6 +37,15 @@ export class UserPreferences {
             return this.cache;
         }
         
+        // The page carries the settings on first load
+        const embedded = takeBootstrap('settings');
+        if (embedded) {
+            this.cache = embedded;
+            this.initialized = true;
+            console.log('UserPreferences: Loaded from page:', embedded);
+            return embedded;
+        }
+        
         try {
             console.log('UserPreferences: Loading initial settings from server...');
             const response = await fetch('/api/settings');
@@ -170,11 +181,18 @@ export class UserPreferences {
                 }
             }
             
+            const headers = {
+                'Content-Type': 'application/json'
+            };
+            // Lets RemoteSync recognise the settings event for its own save
+            const clientId = window.App?.remoteSync?.clientId;
+            if (clientId) {
+                headers['X-Client-Id'] = clientId;
+            }
+            
             const response = await fetch('/api/settings', {
                 method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
+                headers,
                 body: JSON.stringify(payload)
             });
             
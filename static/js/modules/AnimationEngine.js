@@ -12,16 +12,35 @@ export const AnimationEngine = {
   isPlaying: true,
   frameRate: 30,
   frameInterval: 1000 / 30,
+  configuredFrameRate: 30,
+  thermalLimits: null, // Limits from the server's thermal governor while the CPU runs hot, otherwise null
   lastFrameTime: 0,
+  measuredFps: 0, // Layer updates per second over the last full second, reported to the server
+  fpsWindowStart: 0,
+  fpsFrameCount: 0,
   transformationCache: new Map(),
   layoutPointIndex: 0,
   debugBordersVisible: false,
+  // Frame-timing telemetry sent to the server once a minute; bucket bounds (ms) match utils/frame_telemetry.py
+  frameTimeBounds: [17, 20, 25, 34, 50, 67, 100, 250, 500],
+  decodeTimeBounds: [5, 10, 20, 50, 100, 200, 500, 1000],
+  telemetryInterval: 60000,
+  telemetry: null,
+  telemetryTimer: null,
+  lastTelemetryFrame: 0,
+  debugLogBuffer: [], // Entries waiting for the next batched POST to /api/debug-log
+  debugLogTimer: null,
+  debugLogUnloadHandler: null,
+  debugLogDropped: 0,
+  debugLogFlushInterval: 2000,
+  debugLogMaxBatch: 500, // Server limit per request; older entries are dropped beyond this
 
   init() {
     this.layersContainer = document.getElementById('image-layers');
     const config = window.APP_CONFIG || {};
     this.frameRate = config.application?.animation_fps || 30;
     this.frameInterval = 1000 / this.frameRate;
+    this.configuredFrameRate = this.frameRate;
 
     if (!this.layersContainer) {
       throw new Error('Image layers container not found');
@@ -42,6 +61,8 @@ export const AnimationEngine = {
       this.updateCenterDotVisibility();
     }, 100);
 
+    this.startTelemetry();
+
     console.log(`AnimationEngine: Initialized with ${this.frameRate} FPS target and virtual coordinate system`);
     console.log(`AnimationEngine: Max concurrent layers: ${config.layer_management?.max_concurrent_layers || 5}`);
     console.log(`AnimationEngine: Animation quality: ${config.animationQuality || 'high'}`);
@@ -129,6 +150,8 @@ export const AnimationEngine = {
       });
       
       console.log(`AnimationEngine: Started and resumed ${this.activeLayers.size} layer animations`);
+      this.fpsWindowStart = performance.now();
+      this.fpsFrameCount = 0;
       this.animate();
     }
   },
@@ -197,6 +220,13 @@ export const AnimationEngine = {
     if (currentTime - this.lastFrameTime >= this.frameInterval) {
       this.updateLayers();
       this.lastFrameTime = currentTime;
+      this.fpsFrameCount++;
+    }
+
+    if (currentTime - this.fpsWindowStart >= 1000) {
+      this.measuredFps = Math.round(this.fpsFrameCount * 1000 / (currentTime - this.fpsWindowStart));
+      this.fpsWindowStart = currentTime;
+      this.fpsFrameCount = 0;
     }
 
     this.animationId = requestAnimationFrame(this.animate.bind(this));
@@ -217,8 +247,9 @@ export const AnimationEngine = {
     const configManager = window.configManager;
     const config = configManager ? configManager.getConfig() : (window.APP_CONFIG || {});
     // Check if we've reached the concurrent layer limit
-    if (this.activeLayers.size >= (config.layer_management?.max_concurrent_layers || 5)) {
-      console.log(`AnimationEngine: Max concurrent layers (${config.layer_management?.max_concurrent_layers || 5}) reached, skipping ${imageId}`);
+    const maxLayers = this.getMaxLayers(config);
+    if (this.activeLayers.size >= maxLayers) {
+      console.log(`AnimationEngine: Max concurrent layers (${maxLayers}) reached, skipping ${imageId}`);
       return null;
     }
 
@@ -547,7 +578,8 @@ export const AnimationEngine = {
       }
     }
 
-    if (config.color_remapping?.enabled) {
+    // Hue filters are skipped while the thermal governor has turned them off
+    if (config.color_remapping?.enabled && this.thermalLimits?.color_filters !== false) {
       const probability = config.color_remapping.probability || 1.0;
       if (random() < probability) {
         const minDegrees = config.color_remapping.hue_shift_range?.min_degrees || 0;
@@ -857,15 +889,190 @@ export const AnimationEngine = {
     console.log(`AnimationEngine: Removed ${removed} excess layers`);
   },
 
+  // Thermal Governor Methods
+  // The server steps quality down as its CPU heats up; displays on that
+  // machine (the kiosk) apply the limits, remote browsers are unaffected
+  applyThermalLimits(state) {
+    const onServerMachine = window.kioskMode || ['localhost', '127.0.0.1', '[::1]'].includes(window.location.hostname);
+    if (!onServerMachine) {
+      return;
+    }
+
+    this.thermalLimits = state?.limits || null;
+    this.frameRate = Math.min(this.configuredFrameRate, this.thermalLimits?.fps || Infinity);
+    this.frameInterval = 1000 / this.frameRate;
+    console.log(`AnimationEngine: Thermal level ${state?.level || 0} at ${state?.temperature ?? '?'}°C, limits:`, this.thermalLimits || 'none');
+
+    // Fade out the oldest layers over the limit rather than cutting them off
+    const config = window.configManager ? window.configManager.getConfig() : (window.APP_CONFIG || {});
+    let excess = this.activeLayers.size - this.getMaxLayers(config);
+    for (const layerInfo of this.activeLayers.values()) {
+      if (excess <= 0) break;
+      if (layerInfo.phase === 'fade-out') continue;
+      clearTimeout(layerInfo.holdTimeout);
+      this.startFadeOut(layerInfo);
+      excess--;
+    }
+  },
+
+  getMaxLayers(config) {
+    const configured = config.layer_management?.max_concurrent_layers || 5;
+    return Math.min(configured, this.thermalLimits?.max_layers || Infinity);
+  },
+
+  limitPreloadDepth(depth) {
+    return Math.min(depth, this.thermalLimits?.preload_depth ?? Infinity);
+  },
+
+  // Frame Timing Telemetry Methods
+  // Frame times are sampled on every animation frame, independently of the
+  // layer update rate, so dropped frames from CSS transitions show up too
+  startTelemetry() {
+    if (this.telemetryTimer) {
+      return;
+    }
+    this.telemetry = this.newTelemetryWindow();
+
+    const sampleFrame = (now) => {
+      if (this.lastTelemetryFrame) {
+        this.recordHistogram(this.telemetry.frames, this.frameTimeBounds, now - this.lastTelemetryFrame);
+        const layers = this.telemetry.layers;
+        layers.sum += this.activeLayers.size;
+        layers.samples++;
+        layers.max = Math.max(layers.max, this.activeLayers.size);
+      }
+      this.lastTelemetryFrame = now;
+      requestAnimationFrame(sampleFrame);
+    };
+    requestAnimationFrame(sampleFrame);
+
+    // Hidden pages get no frames; don't count the gap as one long frame
+    document.addEventListener('visibilitychange', () => {
+      this.lastTelemetryFrame = 0;
+    });
+
+    if (window.PerformanceObserver && PerformanceObserver.supportedEntryTypes?.includes('longtask')) {
+      new PerformanceObserver((list) => {
+        const longTasks = this.telemetry.long_tasks;
+        list.getEntries().forEach(entry => {
+          longTasks.count++;
+          longTasks.total_ms += entry.duration;
+          longTasks.max_ms = Math.max(longTasks.max_ms, entry.duration);
+        });
+      }).observe({ type: 'longtask' });
+    }
+
+    this.telemetryTimer = setInterval(() => this.sendTelemetry(), this.telemetryInterval);
+  },
+
+  newTelemetryWindow() {
+    return {
+      started: performance.now(),
+      frames: { counts: new Array(this.frameTimeBounds.length + 1).fill(0), sum_ms: 0 },
+      decode: { counts: new Array(this.decodeTimeBounds.length + 1).fill(0), sum_ms: 0 },
+      long_tasks: { count: 0, total_ms: 0, max_ms: 0 },
+      layers: { max: 0, sum: 0, samples: 0 }
+    };
+  },
+
+  recordHistogram(histogram, bounds, value) {
+    let index = bounds.findIndex(bound => value <= bound);
+    if (index === -1) {
+      index = bounds.length;
+    }
+    histogram.counts[index]++;
+    histogram.sum_ms += value;
+  },
+
+  recordImageDecode(durationMs) {
+    if (this.telemetry) {
+      this.recordHistogram(this.telemetry.decode, this.decodeTimeBounds, durationMs);
+    }
+  },
+
+  sendTelemetry() {
+    const report = this.telemetry;
+    this.telemetry = this.newTelemetryWindow();
+
+    const displayId = window.App?.remoteSync?.displayId;
+    if (!displayId || report.layers.samples === 0) {
+      return;
+    }
+
+    const config = window.configManager ? window.configManager.getConfig() : (window.APP_CONFIG || {});
+    const body = {
+      duration_ms: Math.round(performance.now() - report.started),
+      frames: { ...report.frames, sum_ms: Math.round(report.frames.sum_ms) },
+      decode: { ...report.decode, sum_ms: Math.round(report.decode.sum_ms) },
+      long_tasks: { ...report.long_tasks, total_ms: Math.round(report.long_tasks.total_ms), max_ms: Math.round(report.long_tasks.max_ms) },
+      layers: report.layers,
+      config: {
+        fps: this.frameRate,
+        max_layers: config.layer_management?.max_concurrent_layers || 5,
+        quality: config.animationQuality || 'high'
+      }
+    };
+
+    fetch(`/api/displays/${encodeURIComponent(displayId)}/telemetry`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body)
+    }).catch(error => console.warn('AnimationEngine: Failed to send telemetry:', error));
+  },
+
   // Debug Logging Methods
-  async debugLog(message) {
+  // Messages are buffered and sent in one request per interval, so logging
+  // from the animation loop never waits on the network or the server's disk
+  debugLog(message) {
+    if (this.debugLogBuffer.length >= this.debugLogMaxBatch) {
+      this.debugLogBuffer.shift();
+      this.debugLogDropped++;
+    }
+    this.debugLogBuffer.push({ message: String(message), timestamp: Date.now() });
+
+    if (!this.debugLogTimer) {
+      this.debugLogTimer = setTimeout(() => this.flushDebugLog(), this.debugLogFlushInterval);
+      if (!this.debugLogUnloadHandler) {
+        this.debugLogUnloadHandler = () => this.flushDebugLog({ beacon: true });
+        window.addEventListener('pagehide', this.debugLogUnloadHandler);
+      }
+    }
+  },
+
+  async flushDebugLog({ beacon = false } = {}) {
+    clearTimeout(this.debugLogTimer);
+    this.debugLogTimer = null;
+    if (this.debugLogBuffer.length === 0) {
+      return;
+    }
+
+    const entries = this.debugLogBuffer;
+    this.debugLogBuffer = [];
+    if (this.debugLogDropped > 0) {
+      // The note takes the place of the oldest message so the batch stays within the server's limit
+      if (entries.length >= this.debugLogMaxBatch) {
+        entries.shift();
+        this.debugLogDropped++;
+      }
+      entries.unshift({ message: `[debugLog] ${this.debugLogDropped} messages dropped (buffer full)`, timestamp: Date.now() });
+      this.debugLogDropped = 0;
+    }
+    const body = JSON.stringify({ entries });
+
+    // The page is going away; sendBeacon survives the unload where fetch may not
+    if (beacon && navigator.sendBeacon) {
+      navigator.sendBeacon('/api/debug-log', new Blob([body], { type: 'application/json' }));
+      return;
+    }
+
     try {
       await fetch('/api/debug-log', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ message: message })
+        body,
+        keepalive: body.length < 60000 // Browsers cap keepalive bodies at 64KB
       });
     } catch (error) {
       console.error('Failed to send debug log:', error);
@@ -873,6 +1080,8 @@ export const AnimationEngine = {
   },
 
   async clearDebugLog() {
+    // Send what was logged before the clear, so it cannot arrive afterwards
+    await this.flushDebugLog();
     try {
       await fetch('/api/debug-clear', {
         method: 'POST',
@@ -3,10 +3,17 @@
  * iPhone-optimized web interface for controlling the main display
  */
 
+import { ControlChannel } from './managers/ControlChannel.js';
+
 class RemoteController {
     constructor() {
         this.settings = {};
         this.favorites = [];
+        this.favoritesTotal = 0;
+        this.favoritesCursor = null; // Cursor for the next favorites page
+        this.favoritesPageSize = 24;
+        this.favoritesPageLoading = false;
+        this.favoritesObserver = null;
         this.images = [];
         this.connectionStatus = 'connecting';
         this.isLoading = false;
@@ -25,6 +32,16 @@ class RemoteController {
         this.activityTimer = null;
         this.isActive = true;
         
+        // Session issued by the server; heartbeats keep this remote counted as active
+        this.sessionId = null;
+        
+        // WebSocket control channel (falls back to the REST endpoints when unavailable)
+        this.control = new ControlChannel({
+            onState: (settings) => this.applyDisplayState(settings),
+            onStatus: (status) => this.updateConnectionStatus(status),
+            enabled: window.CONTROL_WEBSOCKET !== false
+        });
+        
         // Hero image cycling properties
         this.heroImages = [];
         this.currentHeroIndex = 0;
@@ -58,6 +75,10 @@ class RemoteController {
         this.elements.backgroundToggleBtn = document.getElementById('remote-background-toggle-btn');
         this.elements.favoriteBtn = document.getElementById('remote-favorite-btn');
         
+        // Display targeting
+        this.elements.displayTargetRow = document.getElementById('remote-display-target-row');
+        this.elements.displayTarget = document.getElementById('remote-display-target');
+        
         // Control sliders
         this.elements.speedSlider = document.getElementById('remote-speed-slider');
         this.elements.speedValue = document.getElementById('remote-speed-value');
@@ -104,6 +125,13 @@ class RemoteController {
     }
     
     setupEventListeners() {
+        // Display targeting - refresh the list when opened
+        this.elements.displayTarget?.addEventListener('focus', () => this.loadDisplays());
+        this.elements.displayTarget?.addEventListener('change', (e) => {
+            this.recordActivity();
+            this.control.target = e.target.value || null;
+        });
+        
         // Quick action buttons - wrapped with activity tracking
         this.elements.playPauseBtn?.addEventListener('click', () => {
             this.recordActivity();
@@ -200,6 +228,14 @@ class RemoteController {
             await this.loadSettings();
             this.updateConnectionStatus('connected');
             
+            // Open the control channel under our session; display state is pushed over it once connected
+            await this.startSession();
+            this.control.connect();
+            window.addEventListener('pagehide', () => this.endSession());
+            
+            // Offer display targeting when several screens are connected
+            await this.loadDisplays();
+            
             // Load favorites
             await this.loadFavorites();
             
@@ -236,6 +272,7 @@ class RemoteController {
             this.updateConnectionStatus('connecting');
             
             // Resume polling immediately
+            this.startSession().then(() => this.control.connect());
             this.startPolling();
             
             // Resume hero cycling
@@ -285,6 +322,8 @@ class RemoteController {
             clearInterval(this.pollTimer);
             this.pollTimer = null;
         }
+        this.control.disconnect();
+        this.endSession();
         
         // Pause hero rotation to save battery
         this.pauseHeroRotation();
@@ -296,6 +335,46 @@ class RemoteController {
         // No toast notification for disconnect to avoid interrupting user
     }
     
+    /**
+     * Get a session ID from the server; it is also our control channel client ID
+     */
+    async startSession() {
+        try {
+            const response = await fetch('/api/remote/sessions', { method: 'POST' });
+            if (response.ok) {
+                this.sessionId = (await response.json()).session_id;
+                this.control.clientId = this.sessionId;
+            }
+        } catch (error) {
+            console.warn('Remote Controller: Failed to start session:', error);
+        }
+    }
+    
+    /**
+     * Keep our session active (starts a new one if it expired)
+     */
+    async sendHeartbeat() {
+        if (!this.sessionId) {
+            return this.startSession();
+        }
+        
+        const response = await fetch(`/api/remote/sessions/${this.sessionId}/heartbeat`, { method: 'POST' });
+        if (response.status === 404) {
+            await this.startSession();
+        }
+    }
+    
+    /**
+     * End our session so displays stop counting this remote straight away
+     */
+    endSession() {
+        if (!this.sessionId) {
+            return;
+        }
+        fetch(`/api/remote/sessions/${this.sessionId}`, { method: 'DELETE', keepalive: true }).catch(() => {});
+        this.sessionId = null;
+    }
+    
     /**
      * Stop activity monitoring (cleanup)
      */
@@ -325,17 +404,8 @@ class RemoteController {
     
     async saveSettings(updates) {
         try {
-            const response = await fetch(`/api/settings`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify(updates)
-            });
-            
-            if (!response.ok) {
-                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-            }
+            // Deltas are batched by the control channel, so rapid slider moves share one message
+            await this.control.updateSettings(updates);
             
             // Update local settings
             Object.assign(this.settings, updates);
@@ -350,22 +420,36 @@ class RemoteController {
         }
     }
     
+    async fetchFavoritesPage(cursor = null) {
+        const params = new URLSearchParams({
+            limit: String(this.favoritesPageSize),
+            fields: 'id,created_at,thumbnail'
+        });
+        if (cursor) params.set('cursor', cursor);
+        
+        const response = await fetch(`/api/favorites?${params}`);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        return response.json();
+    }
+    
     async loadFavorites() {
         try {
             this.showFavoritesLoading(true);
             
-            const response = await fetch(`/api/favorites`);
-            if (!response.ok) {
-                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-            }
-            
-            this.favorites = await response.json();
+            // Only the newest page is fetched up front; the rest load on scroll
+            const page = await this.fetchFavoritesPage();
+            this.favorites = page.favorites;
+            this.favoritesTotal = page.total;
+            this.favoritesCursor = page.next_cursor;
             this.updateFavoritesDisplay();
+            this.observeFavoritesEnd();
             
             // Update hero images when favorites change
             this.updateHeroImages();
             
-            console.log('Remote Controller: Favorites loaded:', this.favorites.length);
+            console.log(`Remote Controller: Favorites loaded: ${this.favorites.length} of ${this.favoritesTotal}`);
         } catch (error) {
             console.error('Remote Controller: Failed to load favorites:', error);
             this.showFavoritesEmpty(true);
@@ -513,7 +597,7 @@ class RemoteController {
                 case 'play-pause':
                     // Trigger play/pause on main display
                     const currentlyPlaying = this.settings.isPlaying !== false;
-                    await fetch(`/api/play-pause`, { method: 'POST' });
+                    await this.control.sendCommand('play-pause');
                     // Show what state we're switching TO
                     message = currentlyPlaying ? 'Paused' : 'Playing';
                     // Optimistically update the state (will be corrected by polling if wrong)
@@ -523,7 +607,7 @@ class RemoteController {
                     
                 case 'new-pattern':
                     // Trigger new pattern via API call
-                    await fetch(`/api/new-pattern`, { method: 'POST' });
+                    await this.control.sendCommand('new-pattern');
                     message = 'New pattern generated';
                     break;
                     
@@ -534,7 +618,7 @@ class RemoteController {
                     
                 case 'save-favorite':
                     // Request save and start progressive refresh
-                    await fetch(`/api/save-current-favorite`, { method: 'POST' });
+                    await this.control.sendCommand('save-favorite');
                     message = 'Saving favorite...';
                     this.startProgressiveRefresh();
                     break;
@@ -580,13 +664,7 @@ class RemoteController {
     
     async loadFavorite(favoriteId) {
         try {
-            const response = await fetch(`/api/favorites/${favoriteId}/load`, {
-                method: 'POST'
-            });
-            
-            if (!response.ok) {
-                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-            }
+            await this.control.sendCommand('load-favorite', { favorite_id: favoriteId });
             
             this.showToast('Favorite loaded');
         } catch (error) {
@@ -610,9 +688,10 @@ class RemoteController {
             
             // Update local favorites array
             this.favorites = this.favorites.filter(fav => fav.id !== favoriteId);
+            this.favoritesTotal = Math.max(0, this.favoritesTotal - 1);
             
             // Check if grid is now empty
-            if (this.favorites.length === 0) {
+            if (this.favoritesTotal === 0) {
                 this.showFavoritesEmpty(true);
             }
             
@@ -943,6 +1022,40 @@ class RemoteController {
         }
     }
 
+    observeFavoritesEnd() {
+        if (this.favoritesObserver || !this.elements.favoritesGrid || !('IntersectionObserver' in window)) return;
+        
+        const sentinel = document.createElement('div');
+        sentinel.className = 'favorites-page-sentinel';
+        this.elements.favoritesGrid.insertAdjacentElement('afterend', sentinel);
+        
+        this.favoritesObserver = new IntersectionObserver((entries) => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                this.loadMoreFavorites();
+            }
+        }, { rootMargin: '400px' });
+        this.favoritesObserver.observe(sentinel);
+    }
+    
+    async loadMoreFavorites() {
+        if (!this.favoritesCursor || this.favoritesPageLoading) return;
+        
+        this.favoritesPageLoading = true;
+        try {
+            const page = await this.fetchFavoritesPage(this.favoritesCursor);
+            this.favoritesCursor = page.next_cursor;
+            this.favoritesTotal = page.total;
+            this.favorites = this.favorites.concat(page.favorites);
+            page.favorites.forEach(favorite => {
+                this.elements.favoritesGrid.appendChild(this.createFavoriteElement(favorite));
+            });
+        } catch (error) {
+            console.error('Remote Controller: Failed to load more favorites:', error);
+        } finally {
+            this.favoritesPageLoading = false;
+        }
+    }
+    
     formatFileSize(bytes) {
         if (bytes === 0) return '0 B';
         const k = 1024;
@@ -983,6 +1096,8 @@ class RemoteController {
         thumbnail.className = 'favorite-thumbnail';
         thumbnail.src = favorite.thumbnail || 'data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMTAwIiBoZWlnaHQ9IjEwMCIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj48cmVjdCB3aWR0aD0iMTAwIiBoZWlnaHQ9IjEwMCIgZmlsbD0iIzMzMyIvPjwvc3ZnPg==';
         thumbnail.alt = favorite.name || 'Favorite';
+        thumbnail.loading = 'lazy';
+        thumbnail.decoding = 'async';
         
         // Prevent default image behaviors but allow parent events to bubble
         thumbnail.draggable = false;
@@ -1235,54 +1350,60 @@ class RemoteController {
         console.log('Remote Controller: Started polling for main display changes');
     }
     
-    async pollForChanges() {
+    /**
+     * Load the connected displays into the "Send to" selector
+     */
+    async loadDisplays() {
+        const select = this.elements.displayTarget;
+        if (!select) {
+            return;
+        }
+        
         try {
-            // Include heartbeat in request to signal we're active
-            const response = await fetch(`/api/settings?heartbeat=${Date.now()}`);
+            const response = await fetch('/api/displays');
             if (!response.ok) {
-                this.updateConnectionStatus('disconnected');
                 return;
             }
+            const { displays } = await response.json();
+            
+            // Keep the current choice if that display is still online
+            const selected = displays.some(display => display.id === this.control.target) ? this.control.target : '';
+            select.innerHTML = '<option value="">All displays</option>';
+            displays.forEach(display => {
+                const option = document.createElement('option');
+                option.value = display.id;
+                const fps = display.state.fps ? ` - ${display.state.fps} fps` : '';
+                option.textContent = `${display.name}${display.kiosk ? ' (kiosk)' : ''}${fps}`;
+                select.appendChild(option);
+            });
+            select.value = selected;
+            this.control.target = selected || null;
             
-            const currentSettings = await response.json();
-            
-            // Check if background setting changed
-            if (currentSettings.isWhiteBackground !== this.settings.isWhiteBackground) {
-                console.log(`Remote Controller: Background changed from main display to ${currentSettings.isWhiteBackground ? 'white' : 'black'}`);
-                this.settings.isWhiteBackground = currentSettings.isWhiteBackground;
-                this.updateRemoteBackground();
-                this.updateUI(); // Update the toggle button visual state
-            }
-            
-            // Check if play/pause state changed
-            if (currentSettings.isPlaying !== this.settings.isPlaying) {
-                console.log(`Remote Controller: Play state changed from main display to ${currentSettings.isPlaying ? 'playing' : 'paused'}`);
-                this.settings.isPlaying = currentSettings.isPlaying;
-                this.updatePlayPauseButton();
-            }
-            
-            // Check if other settings changed and update UI if needed
-            let hasOtherChanges = false;
-            if (currentSettings.speed !== this.settings.speed ||
-                currentSettings.maxLayers !== this.settings.maxLayers ||
-                currentSettings.volume !== this.settings.volume ||
-                currentSettings.isPlaying !== this.settings.isPlaying) {
-                hasOtherChanges = true;
-            }
-            
-            // Check gallery settings
-            const currentGallery = currentSettings.gallery || {};
-            const localGallery = this.settings.gallery || {};
-            if (JSON.stringify(currentGallery) !== JSON.stringify(localGallery)) {
-                hasOtherChanges = true;
+            if (this.elements.displayTargetRow) {
+                this.elements.displayTargetRow.style.display = displays.length > 1 ? '' : 'none';
             }
+        } catch (error) {
+            console.warn('Remote Controller: Failed to load displays:', error);
+        }
+    }
+    
+    async pollForChanges() {
+        // Display state is pushed over the control channel while it is open
+        if (this.control.connected) {
+            return;
+        }
+        
+        try {
+            // Signal we're active
+            await this.sendHeartbeat();
             
-            if (hasOtherChanges) {
-                this.settings = currentSettings;
-                this.updateUI();
-                console.log('Remote Controller: Updated settings from main display');
+            const response = await fetch('/api/settings');
+            if (!response.ok) {
+                this.updateConnectionStatus('disconnected');
+                return;
             }
             
+            this.applyDisplayState(await response.json());
             this.updateConnectionStatus('connected');
             
         } catch (error) {
@@ -1291,6 +1412,48 @@ class RemoteController {
         }
     }
     
+    /**
+     * Mirror the main display's settings (from polling or the control channel)
+     */
+    applyDisplayState(currentSettings) {
+        // Check if background setting changed
+        if (currentSettings.isWhiteBackground !== this.settings.isWhiteBackground) {
+            console.log(`Remote Controller: Background changed from main display to ${currentSettings.isWhiteBackground ? 'white' : 'black'}`);
+            this.settings.isWhiteBackground = currentSettings.isWhiteBackground;
+            this.updateRemoteBackground();
+            this.updateUI(); // Update the toggle button visual state
+        }
+        
+        // Check if play/pause state changed
+        if (currentSettings.isPlaying !== this.settings.isPlaying) {
+            console.log(`Remote Controller: Play state changed from main display to ${currentSettings.isPlaying ? 'playing' : 'paused'}`);
+            this.settings.isPlaying = currentSettings.isPlaying;
+            this.updatePlayPauseButton();
+        }
+        
+        // Check if other settings changed and update UI if needed
+        let hasOtherChanges = false;
+        if (currentSettings.speed !== this.settings.speed ||
+            currentSettings.maxLayers !== this.settings.maxLayers ||
+            currentSettings.volume !== this.settings.volume ||
+            currentSettings.isPlaying !== this.settings.isPlaying) {
+            hasOtherChanges = true;
+        }
+        
+        // Check gallery settings
+        const currentGallery = currentSettings.gallery || {};
+        const localGallery = this.settings.gallery || {};
+        if (JSON.stringify(currentGallery) !== JSON.stringify(localGallery)) {
+            hasOtherChanges = true;
+        }
+        
+        if (hasOtherChanges) {
+            this.settings = currentSettings;
+            this.updateUI();
+            console.log('Remote Controller: Updated settings from main display');
+        }
+    }
+    
     /**
      * Start progressive refresh after saving a favorite
      */
@@ -1303,7 +1466,7 @@ class RemoteController {
         }
         
         // Track original favorites count to detect new ones
-        const originalCount = this.favorites.length;
+        const originalCount = this.favoritesTotal;
         let attempts = 0;
         const maxAttempts = 5;
         
@@ -1314,19 +1477,18 @@ class RemoteController {
                 // Set refresh visual state
                 this.setRefreshState(true);
                 
-                const response = await fetch(`/api/favorites`);
-                if (response.ok) {
-                    const newFavorites = await response.json();
-                    
-                    // Check if we got a new favorite
-                    if (newFavorites.length > originalCount) {
-                        console.log('Remote Controller: New favorite detected, refreshing display');
-                        this.favorites = newFavorites;
-                        this.updateFavoritesDisplay();
-                        this.setRefreshState(false);
-                        this.showToast('Favorite saved');
-                        return; // Success - stop trying
-                    }
+                const page = await this.fetchFavoritesPage();
+                
+                // Check if we got a new favorite
+                if (page.total > originalCount) {
+                    console.log('Remote Controller: New favorite detected, refreshing display');
+                    this.favorites = page.favorites;
+                    this.favoritesTotal = page.total;
+                    this.favoritesCursor = page.next_cursor;
+                    this.updateFavoritesDisplay();
+                    this.setRefreshState(false);
+                    this.showToast('Favorite saved');
+                    return; // Success - stop trying
                 }
                 
                 // If no new favorite yet and we haven't exceeded max attempts
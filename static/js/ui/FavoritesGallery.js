@@ -7,6 +7,11 @@ export const FavoritesGallery = {
   grid: null,
   loading: null,
   empty: null,
+  pageSize: 24,
+  nextCursor: null,
+  loadingPage: false,
+  pageObserver: null,
+  sentinel: null,
 
   init() {
     this.modal = document.getElementById('favorites-modal');
@@ -36,6 +41,19 @@ export const FavoritesGallery = {
     };
     document.addEventListener('keydown', this.escKeyHandler);
 
+    // Fetch the next page whenever the end of the grid scrolls into view
+    if (this.grid && 'IntersectionObserver' in window) {
+      this.sentinel = document.createElement('div');
+      this.sentinel.className = 'favorites-page-sentinel';
+      this.grid.insertAdjacentElement('afterend', this.sentinel);
+      this.pageObserver = new IntersectionObserver((entries) => {
+        if (entries.some(entry => entry.isIntersecting)) {
+          this.loadNextPage();
+        }
+      }, { root: this.modal, rootMargin: '400px' });
+      this.pageObserver.observe(this.sentinel);
+    }
+
     console.log('FavoritesGallery: Initialized', {
       modal: !!this.modal,
       grid: !!this.grid,
@@ -63,8 +81,16 @@ export const FavoritesGallery = {
         throw new Error('FavoritesManager not available');
       }
 
-      const favorites = await FavoritesManager.listFavorites();
-      this.renderFavorites(favorites);
+      // Only the first page is fetched up front, so large galleries open immediately
+      const page = await FavoritesManager.listFavoritesPage({ limit: this.pageSize });
+      this.nextCursor = page.next_cursor;
+      this.renderFavorites(page.favorites);
+      if (!this.pageObserver) {
+        // No IntersectionObserver: fall back to loading every page
+        while (this.nextCursor) {
+          await this.loadNextPage();
+        }
+      }
     } catch (error) {
       console.error('FavoritesGallery: Failed to load favorites:', error);
       this.showEmpty();
@@ -95,12 +121,30 @@ export const FavoritesGallery = {
     if (this.grid) this.grid.classList.remove('hidden');
   },
 
+  async loadNextPage() {
+    if (!this.nextCursor || this.loadingPage) return;
+    if (!this.modal || this.modal.classList.contains('hidden')) return;
+
+    this.loadingPage = true;
+    try {
+      const page = await window.App.FavoritesManager.listFavoritesPage({
+        limit: this.pageSize,
+        cursor: this.nextCursor
+      });
+      this.nextCursor = page.next_cursor;
+      page.favorites.forEach(favorite => {
+        this.grid.appendChild(this.createFavoriteCard(favorite));
+      });
+    } catch (error) {
+      console.error('FavoritesGallery: Failed to load more favorites:', error);
+      this.nextCursor = null;
+    } finally {
+      this.loadingPage = false;
+    }
+  },
+
   renderFavorites(favorites) {
-    console.log('FavoritesGallery: Rendering favorites:', favorites);
     console.log('FavoritesGallery: Number of favorites:', favorites.length);
-    if (favorites.length > 0) {
-      console.log('FavoritesGallery: First favorite structure:', favorites[0]);
-    }
     
     if (!this.grid) return;
 
@@ -112,9 +156,7 @@ export const FavoritesGallery = {
     this.showGrid();
     this.grid.innerHTML = '';
 
-    favorites.forEach((favorite, index) => {
-      console.log(`FavoritesGallery: Creating card for favorite ${index}:`, favorite);
-      console.log(`FavoritesGallery: Preview data:`, favorite.preview);
+    favorites.forEach(favorite => {
       const card = this.createFavoriteCard(favorite);
       this.grid.appendChild(card);
     });
@@ -184,14 +226,13 @@ export const FavoritesGallery = {
     return cardContainer;
   },
 
-  createCanvasThumbnail(thumbnailData) {
-    console.log('FavoritesGallery: Using canvas thumbnail');
-    
-    if (!thumbnailData) {
+  createCanvasThumbnail(thumbnailUrl) {
+    if (!thumbnailUrl) {
       return '<div class="preview-no-image">No Thumbnail</div>';
     }
     
-    return `<img src="${thumbnailData}" alt="Favorite thumbnail" style="width: 100%; height: 100%; object-fit: cover;" />`;
+    // Thumbnail URLs are content-addressed and cached by the browser; load them as cards scroll into view
+    return `<img src="${thumbnailUrl}" alt="Favorite thumbnail" loading="lazy" decoding="async" style="width: 100%; height: 100%; object-fit: cover;" />`;
   },
 
 
@@ -234,8 +275,8 @@ export const FavoritesGallery = {
       await FavoritesManager.deleteFavorite(favoriteId);
       cardElement.remove();
 
-      // Check if grid is now empty
-      if (this.grid && this.grid.children.length === 0) {
+      // Check if grid is now empty (and no further pages remain)
+      if (this.grid && this.grid.children.length === 0 && !this.nextCursor) {
         this.showEmpty();
       }
 
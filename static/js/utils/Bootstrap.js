@@ -0,0 +1,59 @@
+/**
+ * Bootstrap - Startup data the server embeds in the display pages
+ * (config, image catalog, settings and the initial pattern), so the first
+ * layer doesn't wait on a series of API round trips
+ */
+
+// Must match BOOTSTRAP_VERSION in app.py
+const BOOTSTRAP_VERSION = 1;
+
+let payload;
+
+function readBootstrap() {
+  if (payload !== undefined) {
+    return payload;
+  }
+
+  payload = null;
+  const element = document.getElementById('bootstrap-data');
+  if (!element) {
+    return payload;
+  }
+
+  try {
+    const data = JSON.parse(element.textContent);
+    if (data?.version === BOOTSTRAP_VERSION) {
+      payload = data;
+    } else {
+      console.warn(`Bootstrap: Ignoring payload version ${data?.version}, expected ${BOOTSTRAP_VERSION}`);
+    }
+  } catch (error) {
+    console.warn('Bootstrap: Ignoring malformed payload:', error);
+  }
+  return payload;
+}
+
+/**
+ * Return a section of the embedded data, once. Later calls get undefined so
+ * anything reloaded afterwards (e.g. the catalog after an upload) is fetched fresh.
+ * @param {string} section - 'config', 'images', 'settings' or 'pattern'
+ * @returns {*} The section, or undefined if it is missing or already taken
+ */
+export function takeBootstrap(section) {
+  const data = readBootstrap();
+  if (!data || data[section] == null) {
+    return undefined;
+  }
+  const value = data[section];
+  delete data[section];
+  return value;
+}
+
+/**
+ * Entity tag the embedded config or settings were served with, for conditional requests
+ * @param {string} section - 'config' or 'settings'
+ * @returns {string|null}
+ */
+export function bootstrapEtag(section) {
+  return readBootstrap()?.[`${section}_etag`] || null;
+}
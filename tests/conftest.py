@@ -53,6 +53,13 @@ def temp_image_dir():
         yield temp_dir
 
 
+@pytest.fixture
+def isolated_cwd(tmp_path, monkeypatch):
+    """Run in a temporary working directory so favorites, settings and caches stay out of the repo."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
 @pytest.fixture
 def temp_favorites_file():
     """Create a temporary favorites.json file for testing."""
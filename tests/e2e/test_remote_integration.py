@@ -237,5 +237,37 @@ def test_multiple_remote_sessions_comprehensive(browser: Browser, live_server):
     context2.close()
 
 
+# Command Sequence Tests
+
+@pytest.mark.e2e
+def test_commands_handled_after_server_restart(browser: Browser, live_server):
+    """Test a display keeps handling commands once the server's command log restarts its sequence."""
+    context = browser.new_context()
+    main_page_obj = context.new_page()
+    main_page = MainPage(main_page_obj).set_base_url(f"http://localhost:{live_server.port}")
+    main_page.load_main_page().wait_for_application_ready()
+    main_page_obj.wait_for_function("() => window.App?.remoteSync?.displayId")
+    play_pause_url = f"http://localhost:{live_server.port}/api/play-pause"
+    
+    # The display last saw a sequence number far above the restarted log's
+    main_page_obj.evaluate("() => { window.App.remoteSync.lastCommandSeq = 100000; }")
+    main_page_obj.request.post(play_pause_url)
+    main_page_obj.wait_for_function("() => window.App.remoteSync.lastCommandSeq < 100000")
+    handled = main_page_obj.evaluate("() => window.App.remoteSync.lastCommandSeq")
+    assert handled > 0
+    
+    # A restart with only a few commands handled before it is caught by the resync
+    main_page_obj.evaluate("""() => {
+        window.App.remoteSync.lastCommandSeq += 5;
+        window.App.remoteSync.queueEvent('resync', {});
+    }""")
+    main_page_obj.request.post(play_pause_url)
+    main_page_obj.wait_for_function(
+        f"() => window.App.remoteSync.lastCommandSeq > {handled} && window.App.remoteSync.lastCommandSeq < {handled + 5}"
+    )
+    
+    context.close()
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file
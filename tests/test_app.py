@@ -7,6 +7,10 @@ import json
 import tempfile
 import os
 import io
+import base64
+import hashlib
+import zipfile
+import weakref
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
@@ -29,6 +33,62 @@ class TestBasicRoutes:
         response_text = response.data.decode()
         assert 'html' in response_text.lower() or 'canvas' in response_text.lower()
     
+    @patch('utils.image_manager.ImageManager')
+    def test_display_pages_embed_bootstrap(self, mock_image_manager, client, isolated_cwd):
+        """Test the main and kiosk pages carry config, catalog, settings and a pattern seed."""
+        mock_image_manager.return_value.get_image_catalog.return_value = {'images': [{'id': 'a'}], 'total_count': 1}
+        
+        for path in ('/', '/kiosk'):
+            response = client.get(path)
+            assert response.headers['Cache-Control'] == 'no-store'
+            html = response.data.decode()
+            start = html.index('<script id="bootstrap-data" type="application/json">')
+            payload = json.loads(html[html.index('>', start) + 1:html.index('</script>', start)])
+            
+            assert payload['version'] == 1
+            assert payload['config'] == json.loads(client.get('/api/config').data)
+            assert payload['images']['images'] == [{'id': 'a'}]
+            assert payload['settings']['speed'] == 1
+            assert payload['pattern']['seed']
+        
+        # The embedded ETags make the displays' first polls conditional hits
+        assert client.get('/api/config', headers={'If-None-Match': payload['config_etag']}).status_code == 304
+        assert client.get('/api/settings', headers={'If-None-Match': payload['settings_etag']}).status_code == 304
+    
+    @patch('utils.image_manager.ImageManager')
+    def test_display_pages_preload_first_images(self, mock_image_manager, app, client, isolated_cwd):
+        """Test the first images of the embedded pattern are announced in Link headers and preload tags."""
+        from utils.pattern_sequence import generate_sequence
+        images = [{'id': f'img{i}', 'path': f'/static/images/image {i}.png'} for i in range(20)]
+        mock_image_manager.return_value.get_image_catalog.return_value = {'images': images}
+        
+        response = client.get('/kiosk')
+        html = response.data.decode()
+        start = html.index('<script id="bootstrap-data" type="application/json">')
+        seed = json.loads(html[html.index('>', start) + 1:html.index('</script>', start)])['pattern']['seed']
+        
+        depth = app.config['PRELOAD_BUFFER_SIZE']
+        first = list(dict.fromkeys(generate_sequence(seed, [img['id'] for img in images])[:depth]))
+        assert first
+        links = response.headers['Link'].split(', ')
+        assert links == [f'</static/images/image%20{image_id[3:]}.png>; rel=preload; as=image' for image_id in first]
+        for image_id in first:
+            assert f'<link rel="preload" as="image" href="/static/images/image {image_id[3:]}.png">' in html
+        
+        # /api/pattern returns the same sequence the page's displays will show
+        pattern = json.loads(client.get(f'/api/pattern/{seed}').data)['pattern']
+        assert list(dict.fromkeys(pattern[:depth])) == first
+    
+    @patch('utils.image_manager.ImageManager')
+    def test_bootstrap_survives_catalog_errors(self, mock_image_manager, client, isolated_cwd):
+        """Test the page still renders (and the display fetches the catalog) when scanning fails."""
+        mock_image_manager.return_value.get_image_catalog.side_effect = OSError('unreadable')
+        
+        response = client.get('/kiosk')
+        assert response.status_code == 200
+        assert b'"images": null' in response.data
+        assert 'Link' not in response.headers
+    
     def test_health_endpoint(self, client):
         """Test the health check endpoint."""
         response = client.get('/health')
@@ -88,26 +148,24 @@ class TestImageAPI:
 class TestFavoritesAPI:
     """Test favorites-related API endpoints."""
     
-    @patch('builtins.open')
-    @patch('os.path.exists')
-    def test_get_favorites_empty(self, mock_exists, mock_open, client):
+    def save_favorite(self, client, favorite):
+        response = client.post('/api/favorites',
+                             data=json.dumps(favorite),
+                             content_type='application/json')
+        assert response.status_code == 200
+        return json.loads(response.data)['id']
+    
+    def test_get_favorites_empty(self, client, isolated_cwd):
         """Test GET favorites when no favorites exist."""
-        mock_exists.return_value = False
-        
         response = client.get('/api/favorites')
         assert response.status_code == 200
         
         data = json.loads(response.data)
         assert data == []  # Returns empty list, not empty object
     
-    @patch('builtins.open')
-    @patch('os.path.exists')
-    def test_get_favorites_with_data(self, mock_exists, mock_open, client, sample_favorite):
+    def test_get_favorites_with_data(self, client, isolated_cwd, sample_favorite):
         """Test GET favorites when favorites exist."""
-        mock_exists.return_value = True
-        mock_file = MagicMock()
-        mock_file.read.return_value = json.dumps({'fav1': sample_favorite})
-        mock_open.return_value.__enter__.return_value = mock_file
+        favorite_id = self.save_favorite(client, sample_favorite)
         
         response = client.get('/api/favorites')
         assert response.status_code == 200
@@ -115,18 +173,39 @@ class TestFavoritesAPI:
         data = json.loads(response.data)
         assert isinstance(data, list)
         assert len(data) == 1
-        assert data[0]['id'] == 'fav1'
+        assert data[0]['id'] == favorite_id
         assert data[0]['layer_count'] == 1
         assert 'thumbnail' in data[0]
     
-    @patch('builtins.open')
-    @patch('os.path.exists')
-    def test_post_favorite(self, mock_exists, mock_open, client):
-        """Test POST new favorite."""
-        mock_exists.return_value = False
-        mock_file = MagicMock()
-        mock_open.return_value.__enter__.return_value = mock_file
+    def test_get_favorites_paginated(self, client, isolated_cwd, sample_favorite):
+        """Test limit/cursor pages with a total count and field projection."""
+        saved_ids = [self.save_favorite(client, sample_favorite) for _ in range(3)]
         
+        response = client.get('/api/favorites?limit=2&fields=id,layer_count')
+        assert response.status_code == 200
+        page = json.loads(response.data)
+        assert page['total'] == 3
+        assert len(page['favorites']) == 2
+        assert set(page['favorites'][0]) == {'id', 'layer_count'}
+        assert page['next_cursor']
+        
+        response = client.get(f"/api/favorites?limit=2&fields=id&cursor={page['next_cursor']}")
+        last_page = json.loads(response.data)
+        assert len(last_page['favorites']) == 1
+        assert last_page['next_cursor'] is None
+        
+        listed = [f['id'] for f in page['favorites'] + last_page['favorites']]
+        assert sorted(listed) == sorted(saved_ids)
+    
+    def test_get_favorites_bad_parameters(self, client, isolated_cwd):
+        """Test invalid limit, cursor or fields return 400."""
+        assert client.get('/api/favorites?limit=abc').status_code == 400
+        assert client.get('/api/favorites?limit=0').status_code == 400
+        assert client.get('/api/favorites?cursor=garbage').status_code == 400
+        assert client.get('/api/favorites?fields=state').status_code == 400
+    
+    def test_post_favorite(self, client, isolated_cwd):
+        """Test POST new favorite."""
         favorite_data = {
             'state': {
                 'layers': [{'imageId': 'test', 'opacity': 0.8}],
@@ -143,48 +222,198 @@ class TestFavoritesAPI:
         data = json.loads(response.data)
         assert 'id' in data or 'success' in data
     
-    @patch('builtins.open')
-    @patch('os.path.exists') 
-    def test_get_single_favorite(self, mock_exists, mock_open, client, sample_favorite):
+    def test_get_single_favorite(self, client, isolated_cwd, sample_favorite):
         """Test GET single favorite by ID."""
-        mock_exists.return_value = True
-        mock_file = MagicMock()
-        mock_file.read.return_value = json.dumps({'test-id': sample_favorite})
-        mock_open.return_value.__enter__.return_value = mock_file
+        favorite_id = self.save_favorite(client, sample_favorite)
         
-        response = client.get('/api/favorites/test-id')
+        response = client.get(f'/api/favorites/{favorite_id}')
         assert response.status_code == 200
         
         data = json.loads(response.data)
-        assert data['id'] == 'test-favorite-123'
+        assert data['id'] == favorite_id
+        assert data['state'] == sample_favorite['state']
+        assert data['thumbnail'].startswith('/api/thumbnails/')
     
-    @patch('builtins.open')
-    @patch('os.path.exists')
-    def test_get_single_favorite_not_found(self, mock_exists, mock_open, client):
-        """Test GET single favorite that doesn't exist."""
-        mock_exists.return_value = True
-        mock_file = MagicMock()
-        mock_file.read.return_value = json.dumps({})
-        mock_open.return_value.__enter__.return_value = mock_file
+    def test_thumbnail_served_by_url(self, client, isolated_cwd, sample_favorite):
+        """Test thumbnails are served from a content-addressed, cacheable URL."""
+        favorite_id = self.save_favorite(client, sample_favorite)
+        thumbnail_url = json.loads(client.get('/api/favorites').data)[0]['thumbnail']
+        
+        response = client.get(thumbnail_url)
+        assert response.status_code == 200
+        assert response.mimetype == 'image/png'
+        assert response.data == base64.b64decode(sample_favorite['thumbnail'].split(',', 1)[1])
+        assert 'immutable' in response.headers['Cache-Control']
         
+        cached = client.get(thumbnail_url, headers={'If-None-Match': response.headers['ETag']})
+        assert cached.status_code == 304
+    
+    def test_thumbnail_not_found(self, client, isolated_cwd):
+        """Test unknown or malformed thumbnail names return 404."""
+        assert client.get('/api/thumbnails/' + '0' * 64 + '.png').status_code == 404
+        assert client.get('/api/thumbnails/favorites.db').status_code == 404
+    
+    def test_get_single_favorite_not_found(self, client, isolated_cwd):
+        """Test GET single favorite that doesn't exist."""
         response = client.get('/api/favorites/nonexistent')
         assert response.status_code == 404
     
-    @patch('builtins.open')
-    @patch('os.path.exists')
-    def test_delete_favorite(self, mock_exists, mock_open, client, sample_favorite):
+    def test_delete_favorite(self, client, isolated_cwd, sample_favorite):
         """Test DELETE favorite."""
-        mock_exists.return_value = True
-        mock_file = MagicMock()
-        mock_file.read.return_value = json.dumps({'test-id': sample_favorite})
-        mock_open.return_value.__enter__.return_value = mock_file
+        favorite_id = self.save_favorite(client, sample_favorite)
         
-        response = client.delete('/api/favorites/test-id')
+        response = client.delete(f'/api/favorites/{favorite_id}')
         assert response.status_code == 200
         
         data = json.loads(response.data)
         assert data['success'] is True
         assert 'message' in data
+        
+        assert client.get(f'/api/favorites/{favorite_id}').status_code == 404
+        assert client.delete(f'/api/favorites/{favorite_id}').status_code == 404
+    
+    def test_legacy_favorites_json_is_migrated(self, client, isolated_cwd, sample_favorite):
+        """Test an existing favorites.json is imported on first use."""
+        with open('favorites.json', 'w') as f:
+            json.dump({'test-id': sample_favorite}, f)
+        
+        response = client.get('/api/favorites/test-id')
+        assert response.status_code == 200
+        assert json.loads(response.data)['state'] == sample_favorite['state']
+        
+        # Original file is kept as a backup and not re-imported
+        assert not (isolated_cwd / 'favorites.json').exists()
+        assert (isolated_cwd / 'favorites.json.migrated').exists()
+
+
+class TestFavoritesExport:
+    """Test bulk ZIP export of favorites."""
+    
+    @pytest.fixture
+    def favorites_dir(self, isolated_cwd, sample_favorite):
+        """Run in a temp working directory with two saved favorites."""
+        favorites = {
+            'fav-a': {**sample_favorite, 'id': 'fav-a'},
+            'fav-b': {**sample_favorite, 'id': 'fav-b'}
+        }
+        with open('favorites.json', 'w') as f:
+            json.dump(favorites, f)
+        return isolated_cwd
+    
+    @patch('app.generate_highres_from_favorite')
+    def test_export_all_favorites(self, mock_generate, client, favorites_dir):
+        """Test exporting every favorite streams a ZIP with one PNG each."""
+        mock_generate.return_value = b'png-bytes'
+        
+        response = client.get('/api/favorites/export')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/zip'
+        assert 'attachment' in response.headers['Content-Disposition']
+        
+        with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+            assert sorted(archive.namelist()) == ['painting_fav-a.png', 'painting_fav-b.png']
+            assert archive.read('painting_fav-a.png') == b'png-bytes'
+        
+        # Renders are cached for later reuse
+        assert (favorites_dir / 'cache' / 'favorites' / 'fav-a_1920x1080.png').exists()
+    
+    @patch('app.generate_highres_from_favorite')
+    def test_export_selected_reuses_cache(self, mock_generate, client, favorites_dir):
+        """Test exporting selected favorites reuses valid cached renders."""
+        cache_dir = favorites_dir / 'cache' / 'favorites'
+        cache_dir.mkdir(parents=True)
+        (cache_dir / 'fav-b_1920x1080.png').write_bytes(b'cached')
+        
+        response = client.get('/api/favorites/export?ids=fav-b,missing')
+        assert response.status_code == 200
+        
+        with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+            assert archive.namelist() == ['painting_fav-b.png']
+            assert archive.read('painting_fav-b.png') == b'cached'
+        mock_generate.assert_not_called()
+    
+    @patch('app.generate_highres_from_favorite')
+    def test_export_reports_failed_renders(self, mock_generate, client, favorites_dir):
+        """Test favorites that fail to render are listed in the archive."""
+        mock_generate.return_value = None
+        
+        response = client.get('/api/favorites/export?ids=fav-a')
+        assert response.status_code == 200
+        
+        with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+            assert archive.namelist() == ['export_errors.txt']
+            assert b'fav-a' in archive.read('export_errors.txt')
+    
+    def test_export_no_matching_favorites(self, client, favorites_dir):
+        """Test exporting unknown IDs returns 404."""
+        response = client.get('/api/favorites/export?ids=nonexistent')
+        assert response.status_code == 404
+
+
+class TestFavoriteThumbnails:
+    """Test server-side thumbnail rendering from saved layer state."""
+    
+    @pytest.fixture
+    def image_dir(self, isolated_cwd):
+        """Run in a temp working directory with a single red source image."""
+        from PIL import Image
+        
+        images = isolated_cwd / 'static' / 'images'
+        images.mkdir(parents=True)
+        Image.new('RGBA', (400, 400), (255, 0, 0, 255)).save(images / 'red.png')
+        return images
+    
+    def red_favorite(self, background='black'):
+        image_id = hashlib.md5('red.png'.encode()).hexdigest()[:8]
+        return {
+            'state': {
+                'layers': [{'imageId': image_id, 'opacity': 1.0, 'transformations': {}}],
+                'backgroundColor': background
+            }
+        }
+    
+    def decode_thumbnail(self, png_bytes):
+        from PIL import Image
+        
+        return Image.open(io.BytesIO(png_bytes))
+    
+    def test_thumbnail_rendered_from_state(self, image_dir):
+        """Test thumbnails composite layers at low resolution on a square canvas."""
+        from app import generate_thumbnail_from_favorite
+        
+        thumbnail = self.decode_thumbnail(generate_thumbnail_from_favorite(self.red_favorite('white')))
+        assert thumbnail.size == (200, 200)
+        # Layer is centered, letterbox keeps the background color
+        assert thumbnail.getpixel((100, 100))[:3] == (255, 0, 0)
+        assert thumbnail.getpixel((100, 2))[:3] == (255, 255, 255)
+    
+    def test_render_stage_timings(self, image_dir):
+        """Test the render pipeline reports per-stage timings when asked."""
+        from app import generate_highres_from_favorite
+        
+        favorite = self.red_favorite()
+        favorite['state']['layers'][0]['transformations'] = {'hueShift': 90, 'scale': 0.5}
+        timings = {}
+        assert generate_highres_from_favorite(favorite, timings=timings)
+        assert set(timings) == {'decode', 'transform', 'color', 'composite', 'encode'}
+        assert all(seconds >= 0 for seconds in timings.values())
+    
+    def test_thumbnail_without_layers(self, image_dir):
+        """Test thumbnail rendering returns None when there is nothing to draw."""
+        from app import generate_thumbnail_from_favorite
+        
+        assert generate_thumbnail_from_favorite({'state': {'layers': []}}) is None
+    
+    def test_save_favorite_renders_thumbnail(self, client, image_dir):
+        """Test saving a favorite without a thumbnail stores a server-rendered one."""
+        response = client.post('/api/favorites',
+                             data=json.dumps(self.red_favorite()),
+                             content_type='application/json')
+        assert response.status_code == 200
+        favorite_id = json.loads(response.data)['id']
+        
+        saved = json.loads(client.get(f'/api/favorites/{favorite_id}').data)
+        assert self.decode_thumbnail(client.get(saved['thumbnail']).data).size == (200, 200)
 
 
 class TestPatternAPI:
@@ -238,7 +467,183 @@ class TestConfigAPI:
         # Should return configuration data
         assert isinstance(data, dict)
         # Likely to have animation_timing, application, etc.
+    
+    def test_config_conditional_get(self, client):
+        """Test an unchanged config revalidates with 304 and carries its version."""
+        response = client.get('/api/config')
+        assert response.headers['X-Config-Version']
         
+        cached = client.get('/api/config', headers={'If-None-Match': response.headers['ETag']})
+        assert cached.status_code == 304
+        assert cached.data == b''
+    
+    def test_apps_share_one_config_listener(self):
+        """Test creating apps doesn't add config listeners, and discarded apps stop receiving reloads."""
+        import gc
+        from app import create_app
+        from config import config
+        
+        config_obj = config['testing']
+        create_app('testing')
+        listeners = len(config_obj._listeners)
+        kept = create_app('testing')
+        discarded = create_app('testing')
+        assert len(config_obj._listeners) == listeners
+        
+        discarded_bus = weakref.ref(discarded.extensions['event_bus'])
+        del discarded
+        gc.collect()
+        assert discarded_bus() is None
+        
+        last_id = kept.extensions['event_bus'].last_id
+        for listener in config_obj._listeners:
+            listener(config_obj.snapshot())
+        events, _ = kept.extensions['event_bus'].wait_for_events(last_id, timeout=0)
+        assert [event['type'] for event in events] == ['config']
+        
+
+class TestMetricsAPI:
+    """Test the Prometheus metrics endpoint."""
+    
+    def test_requests_are_timed_per_route(self, client, isolated_cwd):
+        """Test requests are counted by route template and internal counters are exported."""
+        client.get('/api/favorites/missing')
+        client.post('/api/settings', data=json.dumps({'speed': 3}), content_type='application/json')
+        
+        response = client.get('/api/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        
+        output = response.data.decode()
+        assert 'manypaintings_http_requests_total{method="GET",route="/api/favorites/<favorite_id>",status="404"} 1' in output
+        assert 'manypaintings_http_request_duration_seconds_count{method="POST",route="/api/settings"} 1' in output
+        assert 'manypaintings_settings_updates_total{outcome="applied"} 1' in output
+        assert 'manypaintings_settings_writes_total' in output
+        # The metrics request itself is still being handled
+        assert 'manypaintings_http_requests_in_flight 1' in output
+
+
+class TestDebugLogAPI:
+    """Test the debug log endpoints."""
+    
+    def test_single_and_batched_messages(self, client, isolated_cwd):
+        """Test single messages and batches are appended with their timestamps."""
+        from utils.log_writer import get_log_writer
+        assert client.post('/api/debug-log', json={'message': 'one'}).status_code == 200
+        response = client.post('/api/debug-log', json={'entries': [
+            {'message': 'two', 'timestamp': 3 * 86400 * 1000},
+            {'message': 'three'}
+        ]})
+        assert response.get_json()['accepted'] == 2
+        get_log_writer('debug.log').flush()
+        
+        lines = (isolated_cwd / 'debug.log').read_text().splitlines()
+        assert [line.split('] ', 1)[1] for line in lines] == ['one', 'two', 'three']
+        assert lines[1].startswith('[1970-01-0')
+        
+        client.post('/api/debug-clear')
+        get_log_writer('debug.log').flush()
+        assert (isolated_cwd / 'debug.log').read_text() == ''
+    
+    def test_invalid_batches_are_rejected(self, client, isolated_cwd):
+        """Test malformed and oversized batches return 400."""
+        assert client.post('/api/debug-log', json={}).status_code == 400
+        assert client.post('/api/debug-log', json={'entries': [{'text': 'x'}]}).status_code == 400
+        assert client.post('/api/debug-log', json={'entries': [{'message': 'x'}] * 501}).status_code == 400
+
+
+class TestDebugProfileAPI:
+    """Test the sampling profiler endpoint."""
+    
+    def test_profile_returns_stacks_and_pstats(self, client):
+        """Test a short capture returns collapsed stacks and a pstats field."""
+        response = client.get('/api/debug/profile?seconds=0.05')
+        assert response.status_code == 200
+        
+        data = response.get_json()
+        assert data['samples'] > 0
+        assert data['collapsed'].endswith('\n')
+        assert 'pstats' in data
+        
+        collapsed = client.get('/api/debug/profile?seconds=0.05&format=collapsed')
+        assert collapsed.mimetype == 'text/plain'
+    
+    def test_profile_is_guarded(self, app, client):
+        """Test remote callers need the debug token and the window is bounded."""
+        remote = {'REMOTE_ADDR': '192.168.1.20'}
+        assert client.get('/api/debug/profile?seconds=0.05', environ_base=remote).status_code == 403
+        
+        app.config['DEBUG_TOKEN'] = 'secret'
+        response = client.get('/api/debug/profile?seconds=0.05', environ_base=remote,
+                              headers={'X-Debug-Token': 'secret'})
+        assert response.status_code == 200
+        
+        assert client.get('/api/debug/profile?seconds=600').status_code == 400
+        assert client.get('/api/debug/profile?seconds=abc').status_code == 400
+
+
+class TestDebugMemoryAPI:
+    """Test the memory instrumentation endpoints."""
+    
+    def test_memory_report(self, client):
+        """Test the report includes RSS, GC counts and internal cache sizes."""
+        response = client.get('/api/debug/memory')
+        assert response.status_code == 200
+        
+        data = response.get_json()
+        assert 'rss_bytes' in data['process']
+        assert len(data['gc']['counts']) == 3
+        assert data['caches']['command_consumers'] >= 0
+        assert data['tracemalloc']['tracing'] is False
+    
+    def test_tracemalloc_snapshots(self, client):
+        """Test tracing is started, snapshotted and stopped on request."""
+        assert client.post('/api/debug/memory/snapshot').status_code == 409
+        try:
+            assert client.post('/api/debug/memory/start').get_json()['tracing'] is True
+            response = client.post('/api/debug/memory/snapshot?limit=5')
+            assert response.status_code == 200
+            data = response.get_json()
+            assert len(data['top']) <= 5
+            assert 'caches' in data
+        finally:
+            assert client.post('/api/debug/memory/stop').get_json()['tracing'] is False
+        
+        assert client.post('/api/debug/memory/snapshot?group_by=size').status_code == 400
+        assert client.get('/api/debug/memory', environ_base={'REMOTE_ADDR': '10.0.0.2'}).status_code == 403
+
+
+class TestThermalAPI:
+    """Test the thermal governor endpoint."""
+    
+    def test_thermal_state_and_events(self, app, client):
+        """Test level changes are exposed at /api/thermal and published to displays."""
+        data = client.get('/api/thermal').get_json()
+        assert data['level'] == 0
+        assert data['limits'] is None
+        assert len(data['levels']) == data['max_level']
+        
+        governor = app.extensions['thermal_governor']
+        governor.update(governor.levels[0]['above_c'] + 1)
+        
+        data = client.get('/api/thermal').get_json()
+        assert data['level'] == 1
+        assert data['limits']['max_layers'] == governor.levels[0]['max_layers']
+        assert data['history'][-1]['to'] == 1
+        events, _ = app.extensions['event_bus'].events_since(0)
+        assert events[-1]['type'] == 'thermal'
+
+
+class TestStaticFiles:
+    """Test static file serving."""
+    
+    def test_range_requests(self, client):
+        """Test static files answer byte-range requests so large images can be fetched in parts."""
+        response = client.get('/static/js/main.js', headers={'Range': 'bytes=0-9'})
+        assert response.status_code == 206
+        assert len(response.data) == 10
+        assert response.headers['Accept-Ranges'] == 'bytes'
+
 
 class TestImageUploadAPI:
     """Test image upload and deletion endpoints."""
@@ -320,14 +725,20 @@ class TestConfigurationSystem:
         # Config should be available in template context
         
     @patch('config.Config.check_and_reload')
-    def test_config_reload_on_page_load(self, mock_reload, client):
-        """Test that config is reloaded on page requests."""
-        client.get('/')
-        mock_reload.assert_called_once()
-        
-        mock_reload.reset_mock()
-        client.get('/kiosk')
-        mock_reload.assert_called_once()
+    def test_pages_serve_config_snapshot(self, mock_reload, client, isolated_cwd):
+        """Test page loads embed the watcher's current snapshot instead of checking config.json."""
+        from config import config
+        snapshot = config['testing'].snapshot()
+        
+        for path in ['/', '/kiosk', '/remote']:
+            assert client.get(path).status_code == 200
+        mock_reload.assert_not_called()
+        
+        html = client.get('/').data.decode()
+        start = html.index('<script id="bootstrap-data" type="application/json">')
+        bootstrap = json.loads(html[html.index('>', start) + 1:html.index('</script>', start)])
+        assert bootstrap['config'] == json.loads(snapshot.body)
+        assert bootstrap['config_etag'] == f'"{snapshot.etag}"'
 
 
 class TestErrorHandling:
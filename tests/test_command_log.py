@@ -0,0 +1,90 @@
+"""
+Tests for the CommandLog behind /api/commands.
+"""
+
+import pytest
+import threading
+import time
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.command_log import CommandLog
+
+
+class TestCommandLog:
+    """Tests for sequencing, per-consumer cursors and acknowledgements."""
+    
+    def test_consumers_start_at_the_end(self):
+        """Test a new consumer does not replay commands issued before it registered."""
+        log = CommandLog()
+        log.append('play-pause')
+        log.register('tv')
+        log.append('save-favorite')
+        
+        commands, missed = log.read('tv')
+        assert [command['type'] for command in commands] == ['save-favorite']
+        assert missed == 0
+    
+    def test_unacknowledged_commands_are_redelivered(self):
+        """Test reads do not consume commands and acks are per consumer."""
+        log = CommandLog()
+        log.register('tv')
+        log.register('projector')
+        first = log.append('play-pause')
+        second = log.append('play-pause')
+        
+        assert [c['seq'] for c in log.read('tv')[0]] == [first['seq'], second['seq']]
+        assert log.ack('tv', first['seq']) == first['seq']
+        assert [c['seq'] for c in log.read('tv')[0]] == [second['seq']]
+        
+        # The other display still sees both quick presses
+        assert len(log.read('projector')[0]) == 2
+        
+        # Cursors never move backwards or past the end
+        assert log.ack('tv', 0) == first['seq']
+        assert log.ack('tv', 99) == second['seq']
+        assert log.read('tv')[0] == []
+    
+    def test_overflow_reports_missed_commands(self):
+        """Test commands dropped from the bounded log are counted."""
+        log = CommandLog(capacity=3)
+        log.register('tv')
+        for _ in range(5):
+            log.append('new-pattern')
+        
+        commands, missed = log.read('tv')
+        assert len(commands) == 3
+        assert missed == 2
+    
+    def test_read_filters_by_type(self):
+        """Test a consumer can read only one command type."""
+        log = CommandLog()
+        log.register('legacy')
+        log.append('play-pause')
+        log.append('refresh-images', {'uploaded_image_ids': ['a']})
+        
+        commands, _ = log.read('legacy', 'refresh-images')
+        assert [command['data'] for command in commands] == [{'uploaded_image_ids': ['a']}]
+    
+    def test_idle_consumers_expire(self):
+        """Test consumers that stop reading are forgotten, unless registered as permanent."""
+        log = CommandLog(consumer_ttl=0.05)
+        log.register('old')
+        log.register('legacy', expires=False)
+        time.sleep(0.1)
+        log.register('new')
+        
+        assert set(log.consumers()) == {'legacy', 'new'}
+    
+    def test_wait_returns_when_a_command_arrives(self):
+        """Test wait blocks until there is something for the consumer."""
+        log = CommandLog()
+        log.register('tv')
+        threading.Timer(0.05, log.append, args=('save-favorite',)).start()
+        
+        started = time.time()
+        commands, _ = log.wait('tv', timeout=5)
+        assert time.time() - started < 5
+        assert [command['type'] for command in commands] == ['save-favorite']
@@ -290,6 +290,67 @@ class TestConfigClass:
             # Should not raise exception, just return False
             result = config.check_and_reload()
             assert result is False
+    
+    
+    @patch('config.os.path.getmtime')
+    def test_config_snapshot_versions(self, mock_getmtime, mock_config_file):
+        """Test reloads only swap in a new snapshot (and notify listeners) when the content changes."""
+        config = Config('development')
+        snapshot = config.snapshot()
+        reloads = []
+        config.add_listener(reloads.append)
+        
+        # Saved without changes: same snapshot
+        mock_getmtime.return_value = time.time() + 100
+        assert config.check_and_reload() is True
+        assert config.snapshot() is snapshot
+        
+        with open(mock_config_file) as f:
+            data = json.load(f)
+        data['flask']['port'] = 9090
+        with open(mock_config_file, 'w') as f:
+            json.dump(data, f)
+        mock_getmtime.return_value = time.time() + 200
+        config.check_and_reload()
+        
+        new_snapshot = config.snapshot()
+        assert new_snapshot.version == snapshot.version + 1
+        assert new_snapshot.etag != snapshot.etag
+        assert json.loads(new_snapshot.body)['flask']['port'] == 9090
+        assert reloads == [new_snapshot]
+        
+        # Snapshots are read-only and independent of the loaded config dict
+        with pytest.raises(TypeError):
+            new_snapshot.data['flask']['port'] = 1
+        config._config_data['flask']['port'] = 1
+        assert new_snapshot.data['flask']['port'] == 9090
+        
+        # An invalid file keeps the last good snapshot
+        with open(mock_config_file, 'w') as f:
+            f.write('{invalid')
+        mock_getmtime.return_value = time.time() + 300
+        assert config.check_and_reload() is False
+        assert config.snapshot() is new_snapshot
+    
+    @patch('config.os.path.getmtime')
+    def test_config_watcher(self, mock_getmtime, mock_config_file):
+        """Test the background watcher picks up changes without any request."""
+        mock_getmtime.return_value = 0
+        config = Config('development')
+        config.start_watching(0.02)
+        
+        with open(mock_config_file) as f:
+            data = json.load(f)
+        data['flask']['port'] = 9191
+        with open(mock_config_file, 'w') as f:
+            json.dump(data, f)
+        mock_getmtime.return_value = time.time()
+        
+        deadline = time.time() + 2
+        while config.snapshot().version == 1 and time.time() < deadline:
+            time.sleep(0.02)
+        assert config.snapshot().version == 2
+        assert config.FLASK_PORT == 9191
 
 
 class TestSpecificConfigs:
@@ -0,0 +1,79 @@
+"""
+Tests for the first-boot device benchmark and its cached performance profile.
+"""
+
+import pytest
+import json
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import device_profile
+from utils.device_profile import (benchmark_images, calibrate, choose_tier, load_profile, profile_directory,
+                                  LOW_MEMORY_BYTES, PROFILE_TIERS)
+from config import load_config_from_json
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'test_images')
+
+
+class TestDeviceProfile:
+    """Tests for benchmarking, tier selection and profile caching."""
+    
+    def test_benchmark_measures_decode_and_resize(self):
+        """Test the benchmark reports positive per-megapixel timings for the fixture images."""
+        results = benchmark_images(FIXTURE_DIR, max_images=2, repeats=1)
+        assert results['images'] == 2
+        assert results['decode_ms_per_megapixel'] > 0
+        assert results['resize_ms_per_megapixel'] > 0
+    
+    def test_tiers_follow_speed_and_memory(self):
+        """Test faster devices get richer settings and low-memory devices are capped."""
+        fast = {'decode_ms_per_megapixel': 5, 'resize_ms_per_megapixel': 5}
+        slow = {'decode_ms_per_megapixel': 400, 'resize_ms_per_megapixel': 400}
+        
+        assert choose_tier(fast)[0] == 'high'
+        assert choose_tier(slow)[0] == 'minimal'
+        assert choose_tier(fast, memory_bytes=LOW_MEMORY_BYTES // 2)[0] == 'low'
+        layers = [settings['layer_management']['max_concurrent_layers'] for _, _, settings in PROFILE_TIERS]
+        assert layers == sorted(layers, reverse=True)
+    
+    def test_calibrate_caches_profile(self, tmp_path):
+        """Test the profile is written once and reused, and recalibrated when forced."""
+        path = str(tmp_path / 'device_profile.json')
+        profile = calibrate(FIXTURE_DIR, path)
+        assert load_profile(path) == profile
+        assert calibrate(FIXTURE_DIR, path)['created_at'] == profile['created_at']
+        assert calibrate(FIXTURE_DIR, path, force=True)['created_at'] >= profile['created_at']
+    
+    def test_profile_from_other_device_is_ignored(self, tmp_path):
+        """Test a cached profile with a different fingerprint is not used."""
+        path = tmp_path / 'device_profile.json'
+        profile = calibrate(FIXTURE_DIR, str(path))
+        profile['fingerprint']['cpu_count'] = -1
+        path.write_text(json.dumps(profile))
+        assert load_profile(str(path)) is None
+    
+    def test_profile_kept_outside_the_working_directory(self, isolated_cwd, monkeypatch):
+        """Test the profile is cached next to config.json, or next to the executable in a frozen build."""
+        repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        assert profile_directory() == repo_dir
+        
+        monkeypatch.setattr(sys, 'frozen', True, raising=False)
+        monkeypatch.setattr(sys, 'executable', str(isolated_cwd / 'dist' / 'ManyPaintings'))
+        assert profile_directory() == str(isolated_cwd / 'dist')
+    
+    def test_config_applies_profile_when_enabled(self, tmp_path, monkeypatch):
+        """Test the raspberry_pi environment takes its settings from the cached profile."""
+        monkeypatch.setattr(device_profile, 'PROFILE_PATH', str(tmp_path / 'device_profile.json'))
+        profile = calibrate(FIXTURE_DIR)
+        
+        pi_config = load_config_from_json('raspberry_pi')
+        assert pi_config['performance']['auto_profile'] is True
+        assert pi_config['layer_management']['max_concurrent_layers'] == \
+            profile['settings']['layer_management']['max_concurrent_layers']
+        assert pi_config['application']['animation_fps'] == profile['settings']['application']['animation_fps']
+        
+        # Environments without auto_profile keep config.json's values
+        dev_config = load_config_from_json('development')
+        assert 'auto_profile' not in dev_config['performance']
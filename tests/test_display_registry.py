@@ -0,0 +1,55 @@
+"""
+Tests for the DisplayRegistry behind /api/displays.
+"""
+
+import pytest
+import time
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.display_registry import DisplayRegistry
+
+
+class TestDisplayRegistry:
+    """Tests for registration, state reports and expiry."""
+    
+    def test_register_and_report_state(self):
+        """Test displays keep their name and the latest reported state fields."""
+        registry = DisplayRegistry()
+        registry.register('tv', name='Living room', kiosk=True)
+        registry.update_state('tv', {'seed': 'abc', 'layers': 3, 'fps': 29, 'unknown': 1})
+        registry.update_state('tv', {'layers': 4})
+        
+        display = registry.get('tv')
+        assert display['name'] == 'Living room'
+        assert display['kiosk'] is True
+        assert display['online'] is True
+        assert display['state'] == {'seed': 'abc', 'layers': 4, 'fps': 29}
+    
+    def test_state_report_registers_unknown_display(self):
+        """Test a report from an unregistered display (e.g. after a server restart) registers it."""
+        registry = DisplayRegistry()
+        registry.update_state('projector', {'fps': 30})
+        assert [d['id'] for d in registry.list()] == ['projector']
+    
+    def test_offline_and_forgotten_displays(self):
+        """Test silent displays go offline, then are forgotten."""
+        registry = DisplayRegistry(ttl=0.05, forget_after=0.2)
+        registry.register('tv')
+        time.sleep(0.1)
+        
+        assert registry.list() == []
+        assert registry.list(include_offline=True)[0]['online'] is False
+        
+        time.sleep(0.15)
+        registry.register('projector')
+        assert registry.get('tv') is None
+    
+    def test_remove(self):
+        """Test removing a display."""
+        registry = DisplayRegistry()
+        registry.register('tv')
+        assert registry.remove('tv') is True
+        assert registry.remove('tv') is False
@@ -0,0 +1,69 @@
+"""
+Tests for the EventBus used by the /api/events stream.
+"""
+
+import pytest
+import threading
+import time
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.event_bus import EventBus, format_sse
+
+
+class TestEventBus:
+    """Tests for event publishing, replay and waiting."""
+    
+    def test_publish_assigns_increasing_ids(self):
+        """Test events are numbered in publish order and replayed after an ID."""
+        bus = EventBus()
+        first = bus.publish('settings', {'speed': 2})
+        second = bus.publish('play-pause')
+        
+        assert (first['id'], second['id']) == (1, 2)
+        assert bus.last_id == 2
+        
+        events, complete = bus.events_since(1)
+        assert complete
+        assert [event['type'] for event in events] == ['play-pause']
+        assert events[0]['data'] == {}
+    
+    def test_history_overflow_is_reported(self):
+        """Test a subscriber that fell behind the bounded history is told so."""
+        bus = EventBus(history_size=3)
+        for i in range(5):
+            bus.publish('new-pattern', {'n': i})
+        
+        events, complete = bus.events_since(0)
+        assert not complete
+        assert [event['data']['n'] for event in events] == [2, 3, 4]
+        
+        assert bus.events_since(2)[1] is True
+        assert bus.events_since(99) == ([], False)
+    
+    def test_wait_wakes_on_publish(self):
+        """Test a waiting subscriber is woken by a publish from another thread."""
+        bus = EventBus()
+        threading.Timer(0.05, bus.publish, args=('save-favorite',)).start()
+        
+        started = time.monotonic()
+        events, complete = bus.wait_for_events(0, timeout=5)
+        assert time.monotonic() - started < 2
+        assert [event['type'] for event in events] == ['save-favorite']
+    
+    def test_wait_times_out_without_events(self):
+        """Test waiting returns an empty list after the timeout."""
+        assert EventBus().wait_for_events(0, timeout=0.01) == ([], True)
+    
+    def test_format_sse(self):
+        """Test events serialize to the SSE wire format."""
+        message = format_sse({'id': 7, 'type': 'load-favorite', 'data': {'favorite_id': 'abc'}, 'timestamp': 1.5})
+        assert message == 'id: 7\nevent: load-favorite\ndata: {"favorite_id": "abc", "timestamp": 1.5}\n\n'
+        
+        assert not format_sse({'id': None, 'type': 'resync', 'data': {}, 'timestamp': 0}).startswith('id:')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
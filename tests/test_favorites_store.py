@@ -0,0 +1,263 @@
+"""
+Tests for the SQLite-backed FavoritesStore.
+"""
+
+import pytest
+import json
+import base64
+import hashlib
+import sqlite3
+import threading
+import os
+from pathlib import Path
+
+# Import the FavoritesStore
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.favorites_store import FavoritesStore, get_favorites_store, decode_cursor
+
+
+def thumbnail_data_url(content):
+    return 'data:image/png;base64,' + base64.b64encode(content.encode()).decode()
+
+
+def make_favorite(favorite_id, created_at, layer_count=1, thumbnail=None):
+    return {
+        'id': favorite_id,
+        'created_at': created_at,
+        'state': {
+            'layers': [{'imageId': f'img{i}', 'opacity': 0.8} for i in range(layer_count)],
+            'backgroundColor': 'black'
+        },
+        'thumbnail': thumbnail_data_url(thumbnail or favorite_id)
+    }
+
+
+def thumbnail_name(content):
+    return hashlib.sha256(content.encode()).hexdigest() + '.png'
+
+
+class TestFavoritesStore:
+    """Tests for row-level favorites storage."""
+    
+    def test_save_get_delete(self, tmp_path):
+        """Test a favorite round-trips and deletes only its own row."""
+        store = FavoritesStore(tmp_path / 'favorites.db')
+        store.save(make_favorite('a', '2025-01-01T10:00:00'))
+        store.save(make_favorite('b', '2025-01-02T10:00:00', layer_count=3))
+        
+        expected = make_favorite('a', '2025-01-01T10:00:00')
+        expected['thumbnail_file'] = thumbnail_name('a')
+        del expected['thumbnail']
+        assert store.get('a') == expected
+        assert store.get('missing') is None
+        assert store.count() == 2
+        
+        assert store.delete('a') is True
+        assert store.delete('a') is False
+        assert store.get('a') is None
+        assert store.get('b')['state']['layers'][2]['imageId'] == 'img2'
+    
+    def test_list_is_newest_first_with_layer_counts(self, tmp_path):
+        """Test list returns metadata ordered by created_at descending."""
+        store = FavoritesStore(tmp_path / 'favorites.db')
+        store.save(make_favorite('old', '2025-01-01T10:00:00', layer_count=2))
+        store.save(make_favorite('new', '2025-03-01T10:00:00', layer_count=4))
+        store.save(make_favorite('mid', '2025-02-01T10:00:00'))
+        
+        favorites = store.list()
+        assert [f['id'] for f in favorites] == ['new', 'mid', 'old']
+        assert favorites[0] == {
+            'id': 'new',
+            'created_at': '2025-03-01T10:00:00',
+            'layer_count': 4,
+            'thumbnail_file': thumbnail_name('new')
+        }
+    
+    def test_page_walks_cursor_in_created_order(self, tmp_path):
+        """Test keyset pages cover every favorite once, including equal timestamps."""
+        store = FavoritesStore(tmp_path / 'favorites.db')
+        for i in range(7):
+            store.save(make_favorite(f'f{i}', f'2025-01-0{i % 3 + 1}T10:00:00'))
+        
+        seen, cursor = [], None
+        while True:
+            page, cursor = store.page(3, cursor=cursor, fields=['id'])
+            assert len(page) <= 3
+            seen.extend(favorite['id'] for favorite in page)
+            if cursor is None:
+                break
+        
+        assert seen == [f['id'] for f in store.list()]
+        assert len(set(seen)) == 7
+    
+    def test_page_projection(self, tmp_path):
+        """Test fields limits the returned columns and rejects unknown ones."""
+        store = FavoritesStore(tmp_path / 'favorites.db')
+        store.save(make_favorite('a', '2025-01-01T10:00:00', layer_count=2))
+        
+        page, cursor = store.page(10, fields=['id', 'layer_count'])
+        assert page == [{'id': 'a', 'layer_count': 2}]
+        assert cursor is None
+        
+        with pytest.raises(ValueError):
+            store.page(10, fields=['state'])
+        with pytest.raises(ValueError):
+            decode_cursor('not-a-cursor')
+    
+    def test_count_tracks_inserts_updates_and_deletes(self, tmp_path):
+        """Test the maintained count ignores re-saves and follows deletes."""
+        store = FavoritesStore(tmp_path / 'favorites.db')
+        store.save(make_favorite('a', '2025-01-01T10:00:00'))
+        store.save(make_favorite('a', '2025-01-01T10:00:00', layer_count=3))
+        store.save(make_favorite('b', '2025-01-02T10:00:00'))
+        assert store.count() == 2
+        
+        store.delete('a')
+        assert store.count() == 1
+        assert FavoritesStore(tmp_path / 'favorites.db').count() == 1
+    
+    def test_get_states(self, tmp_path):
+        """Test bulk state loading for all or selected favorites."""
+        store = FavoritesStore(tmp_path / 'favorites.db')
+        store.save(make_favorite('a', '2025-01-01T10:00:00'))
+        store.save(make_favorite('b', '2025-01-02T10:00:00'))
+        
+        states = store.get_states()
+        assert set(states) == {'a', 'b'}
+        assert states['a']['state']['backgroundColor'] == 'black'
+        
+        assert set(store.get_states(['b', 'missing'])) == {'b'}
+    
+    def test_thumbnails_stored_once_by_content_hash(self, tmp_path):
+        """Test thumbnails are decoded to files, shared by hash and removed with their last favorite."""
+        store = FavoritesStore(tmp_path / 'favorites.db')
+        store.save(make_favorite('a', '2025-01-01T10:00:00', thumbnail='same'))
+        store.save(make_favorite('b', '2025-01-02T10:00:00', thumbnail='same'))
+        
+        filename = thumbnail_name('same')
+        assert os.listdir(store.thumbnail_dir) == [filename]
+        assert store.thumbnail_path(filename).read_bytes() == b'same'
+        
+        store.delete('a')
+        assert store.thumbnail_path(filename) is not None
+        store.delete('b')
+        assert store.thumbnail_path(filename) is None
+    
+    def test_delete_waits_for_save_sharing_thumbnail(self, tmp_path):
+        """Test deleting the last favorite using a thumbnail keeps it for a save that is reusing it."""
+        store = FavoritesStore(tmp_path / 'favorites.db')
+        store.save(make_favorite('a', '2025-01-01T10:00:00', thumbnail='same'))
+        
+        store_thumbnail = store.store_thumbnail
+        deleters = []
+        
+        def store_then_delete(image_bytes, extension='png'):
+            # The file already exists, so this save only references it; delete 'a' meanwhile
+            filename = store_thumbnail(image_bytes, extension)
+            deleter = threading.Thread(target=store.delete, args=('a',))
+            deleter.start()
+            deleter.join(0.1)
+            assert deleter.is_alive()
+            deleters.append(deleter)
+            return filename
+        
+        store.store_thumbnail = store_then_delete
+        store.save(make_favorite('b', '2025-01-02T10:00:00', thumbnail='same'))
+        deleters[0].join()
+        
+        assert store.get('a') is None
+        assert store.get('b')['thumbnail_file'] == thumbnail_name('same')
+        assert store.thumbnail_path(thumbnail_name('same')).read_bytes() == b'same'
+    
+    def test_thumbnail_path_rejects_other_names(self, tmp_path):
+        """Test only content-hash file names resolve to thumbnail paths."""
+        store = FavoritesStore(tmp_path / 'favorites.db')
+        assert store.thumbnail_path('../favorites.db') is None
+        assert store.thumbnail_path('favorites.db') is None
+    
+    def test_invalid_thumbnail_data_is_dropped(self, tmp_path):
+        """Test a favorite with an undecodable thumbnail saves without one."""
+        store = FavoritesStore(tmp_path / 'favorites.db')
+        favorite = make_favorite('a', '2025-01-01T10:00:00')
+        favorite['thumbnail'] = 'not a data url'
+        store.save(favorite)
+        assert store.get('a')['thumbnail_file'] is None
+    
+    def test_uses_wal_mode(self, tmp_path):
+        """Test the database is opened in WAL journal mode."""
+        FavoritesStore(tmp_path / 'favorites.db')
+        conn = sqlite3.connect(str(tmp_path / 'favorites.db'))
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        conn.close()
+    
+    def test_concurrent_saves_from_threads(self, tmp_path):
+        """Test saves from many threads are all persisted."""
+        store = FavoritesStore(tmp_path / 'favorites.db')
+        
+        def save_batch(thread_index):
+            for i in range(10):
+                store.save(make_favorite(f't{thread_index}-{i}', f'2025-01-01T10:{thread_index:02d}:{i:02d}'))
+        
+        threads = [threading.Thread(target=save_batch, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert store.count() == 80
+
+
+class TestLegacyMigration:
+    """Tests for the one-time favorites.json import."""
+    
+    def test_migrates_legacy_json_once(self, tmp_path):
+        """Test favorites.json is imported and renamed to a backup."""
+        legacy = tmp_path / 'favorites.json'
+        legacy.write_text(json.dumps({
+            'a': make_favorite('a', '2025-01-01T10:00:00', layer_count=2),
+            'b': make_favorite('b', '2025-01-02T10:00:00')
+        }))
+        
+        store = FavoritesStore(tmp_path / 'favorites.db', legacy)
+        assert store.count() == 2
+        assert store.list()[1]['layer_count'] == 2
+        assert not legacy.exists()
+        assert (tmp_path / 'favorites.json.migrated').exists()
+        
+        # Reopening does not duplicate or fail
+        assert FavoritesStore(tmp_path / 'favorites.db', legacy).count() == 2
+    
+    def test_invalid_legacy_json_is_left_alone(self, tmp_path):
+        """Test a corrupt favorites.json does not break the store."""
+        legacy = tmp_path / 'favorites.json'
+        legacy.write_text('not json')
+        
+        store = FavoritesStore(tmp_path / 'favorites.db', legacy)
+        assert store.count() == 0
+        assert legacy.exists()
+    
+    def test_moves_inline_thumbnails_out_of_rows(self, tmp_path):
+        """Test databases with base64 thumbnails in the rows are upgraded to blob files."""
+        conn = sqlite3.connect(str(tmp_path / 'favorites.db'))
+        conn.execute('CREATE TABLE favorites (id TEXT PRIMARY KEY, created_at TEXT NOT NULL, '
+                     'layer_count INTEGER NOT NULL DEFAULT 0, state TEXT NOT NULL, thumbnail TEXT)')
+        conn.execute('INSERT INTO favorites VALUES (?, ?, ?, ?, ?)',
+                     ('a', '2025-01-01T10:00:00', 0, '{}', thumbnail_data_url('inline')))
+        conn.commit()
+        conn.close()
+        
+        store = FavoritesStore(tmp_path / 'favorites.db')
+        assert store.get('a')['thumbnail_file'] == thumbnail_name('inline')
+        assert store.thumbnail_path(thumbnail_name('inline')).read_bytes() == b'inline'
+    
+    def test_shared_store_per_database_path(self, tmp_path):
+        """Test get_favorites_store returns one store per database file."""
+        first = get_favorites_store(str(tmp_path / 'favorites.db'))
+        assert get_favorites_store(str(tmp_path / 'favorites.db')) is first
+        assert get_favorites_store(str(tmp_path / 'other.db')) is not first
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,81 @@
+"""
+Tests for the FrameTelemetry store behind /api/telemetry.
+"""
+
+import pytest
+import time
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.frame_telemetry import FrameTelemetry, FRAME_TIME_BUCKETS_MS, DECODE_TIME_BUCKETS_MS
+
+
+def make_report(frame_counts, fps=30, max_layers=4, quality='high'):
+    """A report with the given frame-time counts (padded with zeros)."""
+    counts = frame_counts + [0] * (len(FRAME_TIME_BUCKETS_MS) + 1 - len(frame_counts))
+    sum_ms = sum(count * bound for count, bound in zip(counts, FRAME_TIME_BUCKETS_MS + (1000,)))
+    return {
+        'duration_ms': 60000,
+        'frames': {'counts': counts, 'sum_ms': sum_ms},
+        'decode': {'counts': [1] + [0] * len(DECODE_TIME_BUCKETS_MS), 'sum_ms': 3},
+        'long_tasks': {'count': 2, 'total_ms': 150, 'max_ms': 100},
+        'layers': {'max': 4, 'sum': 300, 'samples': 100},
+        'config': {'fps': fps, 'max_layers': max_layers, 'quality': quality}
+    }
+
+
+class TestFrameTelemetry:
+    """Tests for recording, validating and summarizing reports."""
+    
+    def test_summary_merges_reports(self):
+        """Test histograms are added up and percentiles and slow frames derived from them."""
+        telemetry = FrameTelemetry()
+        telemetry.record('kiosk', make_report([90, 5, 0, 0, 0, 5]))
+        telemetry.record('kiosk', make_report([100]))
+        
+        summary = telemetry.summary('kiosk')
+        assert summary['reports'] == 2
+        assert summary['frames']['count'] == 200
+        assert summary['frames']['p50_ms'] == 17
+        assert summary['frames']['p99_ms'] == 67
+        assert summary['frames']['slow'] == 5
+        assert summary['decode']['count'] == 2
+        assert summary['long_tasks'] == {'count': 4, 'total_ms': 300, 'max_ms': 100}
+        assert summary['layers'] == {'avg': 3.0, 'max': 4}
+    
+    def test_summary_is_split_by_settings(self):
+        """Test reports taken under different animation settings are summarized separately."""
+        telemetry = FrameTelemetry()
+        telemetry.record('kiosk', make_report([0, 0, 0, 0, 0, 0, 100], max_layers=8))
+        telemetry.record('kiosk', make_report([100], max_layers=4))
+        
+        by_layers = {group['config']['max_layers']: group for group in telemetry.summary('kiosk')['by_config']}
+        assert by_layers[8]['frames']['p50_ms'] == 100
+        assert by_layers[4]['frames']['p50_ms'] == 17
+    
+    def test_window_and_unknown_displays(self):
+        """Test since excludes older reports and unknown displays have no summary."""
+        telemetry = FrameTelemetry()
+        telemetry.record('kiosk', make_report([10]))
+        
+        assert telemetry.summary('kiosk', since=time.time() + 1)['reports'] == 0
+        assert telemetry.summary('other') is None
+        assert telemetry.displays() == ['kiosk']
+    
+    def test_invalid_reports_are_rejected(self):
+        """Test malformed histograms raise ValueError and are not stored."""
+        telemetry = FrameTelemetry()
+        with pytest.raises(ValueError):
+            telemetry.record('kiosk', {'frames': {'counts': [1, 2]}})
+        with pytest.raises(ValueError):
+            telemetry.record('kiosk', {**make_report([1]), 'long_tasks': {'count': -1}})
+        assert len(telemetry) == 0
+    
+    def test_reports_per_display_are_bounded(self):
+        """Test only the newest max_reports reports are kept."""
+        telemetry = FrameTelemetry(max_reports=3)
+        for _ in range(5):
+            telemetry.record('kiosk', make_report([1]))
+        assert telemetry.summary('kiosk')['reports'] == 3
@@ -0,0 +1,78 @@
+"""
+Tests for the launcher's server selection and device calibration.
+"""
+
+import pytest
+import os
+import json
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import launcher
+from config import config
+
+
+class TestServerSelection:
+    """Tests for choosing and configuring the production server."""
+    
+    def test_server_mode_per_environment(self):
+        """Test production and Raspberry Pi use the production server and development keeps Werkzeug."""
+        assert config['development'].SERVER_MODE == 'development'
+        assert config['production'].SERVER_MODE == 'production'
+        assert config['raspberry_pi'].SERVER_MODE == 'production'
+    
+    def test_server_options_from_config(self):
+        """Test thread and connection limits come from the flask.server section."""
+        options = launcher.get_server_options({'SERVER_THREADS': 8, 'SERVER_CONNECTION_LIMIT': 50})
+        
+        assert options['threads'] == 8
+        assert options['connection_limit'] == 50
+        assert options['channel_timeout'] == 120
+    
+    def test_falls_back_without_waitress(self, app):
+        """Test the development server is used when waitress is unavailable."""
+        app.config['SERVER_MODE'] = 'production'
+        with patch.dict(os.environ), \
+                patch('launcher.get_resource_path', return_value=os.getcwd()), \
+                patch('launcher.os.chdir'), \
+                patch('app.create_app', return_value=app), \
+                patch.object(launcher, 'serve_production', side_effect=ImportError), \
+                patch.object(app, 'run') as run:
+            launcher.run_flask_server()
+        
+        run.assert_called_once()
+
+
+class TestDeviceCalibration:
+    """Tests for the first-boot calibration run by the launcher."""
+    
+    def write_config(self, directory, auto_profile):
+        config_data = {
+            'performance': {'auto_profile': True},
+            'environments': {'raspberry_pi': {'performance': {'auto_profile': auto_profile}}}
+        }
+        (directory / 'config.json').write_text(json.dumps(config_data))
+    
+    def test_auto_profile_read_from_config(self, tmp_path):
+        """Test the environment's auto_profile setting overrides the base one."""
+        self.write_config(tmp_path, False)
+        assert launcher.auto_profile_enabled(str(tmp_path), 'raspberry_pi') is False
+        assert launcher.auto_profile_enabled(str(tmp_path), 'production') is True
+        assert launcher.auto_profile_enabled(str(tmp_path / 'missing'), 'raspberry_pi') is False
+    
+    @pytest.mark.parametrize('auto_profile', [True, False])
+    def test_calibrates_only_with_auto_profile(self, app, tmp_path, auto_profile):
+        """Test the Raspberry Pi benchmark is skipped when auto_profile is off."""
+        self.write_config(tmp_path, auto_profile)
+        with patch.dict(os.environ), \
+                patch('launcher.get_resource_path', return_value=str(tmp_path)), \
+                patch('launcher.os.chdir'), \
+                patch('launcher.is_raspberry_pi', return_value=True), \
+                patch('app.create_app', return_value=app), \
+                patch.object(launcher, 'calibrate_device') as calibrate_device, \
+                patch.object(app, 'run'):
+            launcher.run_flask_server()
+        
+        assert calibrate_device.called is auto_profile
@@ -0,0 +1,78 @@
+"""
+Tests for the LogWriter behind /api/debug-log.
+"""
+
+import pytest
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.log_writer import LogWriter
+
+
+class TestLogWriter:
+    """Tests for background writes, rotation and clearing."""
+    
+    def test_lines_are_written_in_order(self, tmp_path):
+        """Test queued lines reach the file in order once flushed."""
+        path = tmp_path / 'debug.log'
+        writer = LogWriter(str(path))
+        
+        assert writer.write([f'line {index}' for index in range(100)]) == 100
+        writer.flush()
+        
+        assert path.read_text().splitlines() == [f'line {index}' for index in range(100)]
+        assert writer.written_count == 100
+    
+    def test_rotation_bounds_disk_use(self, tmp_path):
+        """Test the log rotates by size and keeps only backup_count old files."""
+        path = tmp_path / 'debug.log'
+        writer = LogWriter(str(path), max_bytes=100, backup_count=2)
+        
+        for index in range(20):
+            writer.write(['x' * 40 + str(index)])
+            writer.flush()
+        
+        assert sorted(os.listdir(tmp_path)) == ['debug.log', 'debug.log.1', 'debug.log.2']
+        assert all(os.path.getsize(tmp_path / name) < 150 for name in os.listdir(tmp_path))
+        # The newest lines are kept
+        assert (tmp_path / 'debug.log').read_text().splitlines()[-1].endswith('19')
+    
+    def test_clear_removes_earlier_lines(self, tmp_path):
+        """Test clear empties the log and its backups after lines queued before it."""
+        path = tmp_path / 'debug.log'
+        writer = LogWriter(str(path), max_bytes=50, backup_count=1)
+        writer.write(['x' * 60, 'before'])
+        writer.clear()
+        writer.write(['after'])
+        writer.flush()
+        
+        assert path.read_text() == 'after\n'
+        assert not (tmp_path / 'debug.log.1').exists()
+    
+    def test_full_queue_drops_lines(self, tmp_path):
+        """Test lines beyond the queue limit are counted as dropped instead of blocking."""
+        writer = LogWriter(str(tmp_path / 'debug.log'), max_queue=5)
+        accepted = writer.write(['line'] * 1000)
+        writer.flush()
+        
+        assert accepted + writer.dropped_count == 1000
+        assert writer.written_count == accepted
+    
+    def test_unencodable_lines_do_not_stop_the_writer(self, tmp_path):
+        """Test a lone surrogate is escaped and later lines are still written."""
+        path = tmp_path / 'debug.log'
+        writer = LogWriter(str(path))
+        writer.write(['bad \ud800', 'after'])
+        
+        assert writer.flush(timeout=5)
+        assert path.read_text().splitlines() == ['bad \\ud800', 'after']
+    
+    def test_flush_gives_up(self, tmp_path):
+        """Test flush returns False instead of blocking once its timeout passes."""
+        writer = LogWriter(str(tmp_path / 'debug.log'))
+        with writer._queue.mutex:
+            writer._queue.unfinished_tasks += 1  # an item the writer never finishes
+        
+        assert writer.flush(timeout=0.2) is False
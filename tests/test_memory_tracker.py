@@ -0,0 +1,49 @@
+"""
+Tests for the MemoryTracker behind /api/debug/memory.
+"""
+
+import pytest
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.memory_tracker import MemoryTracker, process_memory, gc_stats
+
+
+class TestMemoryTracker:
+    """Tests for tracemalloc snapshots and process memory reporting."""
+    
+    def test_snapshot_diff_shows_growth(self):
+        """Test allocations made between snapshots appear as positive changes at their source line."""
+        tracker = MemoryTracker()
+        tracker.start()
+        try:
+            retained = [bytearray(1024) for _ in range(2000)]
+            report = tracker.snapshot(limit=10)
+        finally:
+            tracker.stop()
+        
+        growth = [entry for entry in report['changes'] if 'test_memory_tracker.py' in entry['location'][0]]
+        assert growth
+        assert growth[0]['size_diff_bytes'] >= 2000 * 1024
+        assert report['tracing'] is True
+        assert len(retained) == 2000
+    
+    def test_snapshot_requires_tracing(self):
+        """Test snapshots are refused while tracing is off."""
+        tracker = MemoryTracker()
+        assert tracker.status() == {'tracing': False}
+        with pytest.raises(RuntimeError):
+            tracker.snapshot()
+    
+    def test_process_and_gc_stats(self):
+        """Test RSS and garbage collector counts are reported."""
+        memory = process_memory()
+        if sys.platform.startswith('linux'):
+            assert memory['rss_bytes'] > 0
+        assert memory['peak_rss_bytes'] > 0
+        
+        stats = gc_stats()
+        assert len(stats['counts']) == 3
+        assert stats['tracked_objects'] > 0
@@ -0,0 +1,56 @@
+"""
+Tests for the Metrics registry behind /api/metrics.
+"""
+
+import pytest
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import Metrics
+
+
+class TestMetrics:
+    """Tests for recording values and the Prometheus text output."""
+    
+    def test_counters_and_gauges(self):
+        """Test counters add up per label set and gauges render their latest value."""
+        metrics = Metrics()
+        metrics.describe('requests_total', 'counter', 'Requests.')
+        metrics.describe('in_flight', 'gauge', 'In flight.')
+        metrics.inc('requests_total', {'route': '/a'})
+        metrics.inc('requests_total', {'route': '/a'})
+        metrics.inc('requests_total', {'route': '/b'})
+        metrics.set('in_flight', 3)
+        
+        output = metrics.render()
+        assert '# TYPE requests_total counter' in output
+        assert 'requests_total{route="/a"} 2' in output
+        assert 'requests_total{route="/b"} 1' in output
+        assert 'in_flight 3' in output
+        assert metrics.value('requests_total', {'route': '/a'}) == 2
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test each observation counts in every bucket at or above it."""
+        metrics = Metrics()
+        metrics.describe('latency_seconds', 'histogram', 'Latency.', buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            metrics.observe('latency_seconds', value)
+        
+        output = metrics.render()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in output
+        assert 'latency_seconds_bucket{le="1.0"} 2' in output
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in output
+        assert 'latency_seconds_sum 5.55' in output
+        assert 'latency_seconds_count 3' in output
+    
+    def test_collectors_and_label_escaping(self):
+        """Test collector values are read at render time and label values are escaped."""
+        metrics = Metrics()
+        metrics.describe('writes_total', 'counter', 'Writes.')
+        writes = {'count': 1}
+        metrics.add_collector(lambda: [('writes_total', {'path': 'a"b'}, writes['count'])])
+        
+        writes['count'] = 4
+        assert 'writes_total{path="a\\"b"} 4' in metrics.render()
@@ -0,0 +1,37 @@
+"""
+Tests for the server-side port of PatternManager.js's pattern generation.
+"""
+
+import pytest
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pattern_sequence import generate_sequence, hash_code, PATTERN_LENGTH
+
+
+class TestPatternSequence:
+    """Tests that sequences match what the displays generate for the same seed."""
+    
+    def test_matches_javascript_sequences(self):
+        """Test sequences against ones generated by PatternManager.js in a browser engine."""
+        image_ids = [f'img{i}' for i in range(37)]
+        sequence = generate_sequence('lq2x9k3abcd', image_ids)
+        assert len(sequence) == PATTERN_LENGTH
+        assert sequence[:10] == ['img7', 'img29', 'img24', 'img10', 'img31',
+                                 'img31', 'img11', 'img33', 'img13', 'img7']
+        
+        assert generate_sequence('abc', ['c', 'a', 'b'])[:5] == ['b', 'c', 'a', 'b', 'a']
+    
+    def test_non_ascii_seeds_and_ids(self):
+        """Test hashing and sorting use UTF-16 code units like JavaScript strings."""
+        image_ids = ['Zeta', 'alpha', 'ébène', '\U0001F600x', '日本', ' sp']
+        assert generate_sequence('seed-\U0001F600-é', image_ids)[:5] == ['Zeta', 'alpha', ' sp', 'alpha', 'Zeta']
+        # Wraps to 32 bits as JavaScript's bitwise operators do
+        assert hash_code('x' * 500) == 1519117824
+        assert hash_code('\U0001F600é') == 54960102
+    
+    def test_empty_catalog(self):
+        """Test there is no sequence without images."""
+        assert generate_sequence('seed', []) == []
@@ -0,0 +1,61 @@
+"""
+Tests for the on-demand Profiler behind /api/debug/profile.
+"""
+
+import pytest
+import threading
+import time
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.profiler import Profiler
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestProfiler:
+    """Tests for stack sampling and per-request cProfile capture."""
+    
+    def test_samples_other_threads(self):
+        """Test a busy thread shows up in the collapsed stacks under its name."""
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,), name='busy-worker')
+        worker.start()
+        try:
+            result = Profiler(interval=0.002).capture(0.1)
+        finally:
+            stop.set()
+            worker.join()
+        
+        busy_lines = [line for line in result['collapsed'].splitlines() if line.startswith('busy-worker;')]
+        assert busy_lines
+        assert 'busy_loop (test_profiler.py:' in busy_lines[0]
+        assert int(busy_lines[0].rsplit(' ', 1)[1]) > 0
+        assert result['samples'] > 0
+    
+    def test_requests_profiled_during_capture(self):
+        """Test a request started during a capture is included in the pstats report, and one capture runs at a time."""
+        profiler = Profiler(interval=0.002)
+        assert profiler.start_request() is None
+        
+        def request():
+            time.sleep(0.02)
+            profile = profiler.start_request()
+            with pytest.raises(RuntimeError):
+                profiler.capture(0.01)
+            sorted(range(10000), key=lambda value: -value)
+            profiler.finish_request(profile)
+        
+        thread = threading.Thread(target=request)
+        thread.start()
+        result = profiler.capture(0.2)
+        thread.join()
+        
+        assert result['requests_profiled'] == 1
+        assert 'function calls' in result['pstats']
+        assert '<lambda>' in result['pstats']
@@ -5,7 +5,9 @@ These tests work with the actual API without complex mocking.
 
 import pytest
 import json
+import time
 import tempfile
+import threading
 import os
 from pathlib import Path
 
@@ -81,6 +83,42 @@ class TestRemoteSettingsAPI:
         
         print("[SUCCESS] Settings API: GET structure, POST updates, sequential changes tested")
     
+    def test_settings_conditional_get(self, client, isolated_cwd):
+        """Test unchanged settings revalidate with 304 and a change produces a new ETag."""
+        response = client.get('/api/settings')
+        etag = response.headers['ETag']
+        
+        cached = client.get('/api/settings', headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        
+        client.post('/api/settings', data=json.dumps({'speed': 5}), content_type='application/json')
+        changed = client.get('/api/settings', headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+        assert changed.get_json()['speed'] == 5
+    
+    def test_rapid_updates_are_coalesced(self, app, client, isolated_cwd):
+        """Test a slider drag becomes one merged settings version and one event."""
+        # A long window keeps the burst inside it however slowly the requests run; it is flushed below
+        coalescer = app.extensions['settings_coalescer']
+        coalescer.window = 60
+        client.post('/api/settings', data=json.dumps({'speed': 1}), content_type='application/json')
+        cursor = client.get('/api/commands/wait').get_json()['cursor']
+        version = client.get('/api/settings').headers['ETag']
+        
+        for brightness in range(100, 120):
+            response = client.post('/api/settings', data=json.dumps({'gallery': {'brightness': brightness}}),
+                                   content_type='application/json')
+            # Pending changes are already reflected in the response
+            assert response.get_json()['settings']['gallery']['brightness'] == brightness
+        assert client.get('/api/settings').headers['ETag'] == version
+        
+        coalescer.flush()
+        data = client.get(f'/api/commands/wait?cursor={cursor}&timeout=2').get_json()
+        assert len(data['events']) == 1
+        assert data['events'][0]['data']['settings']['gallery']['brightness'] == 119
+        assert client.get('/api/settings').get_json()['gallery']['brightness'] == 119
+    
     def test_settings_api_error_handling(self, client):
         """Test settings API error handling for invalid requests."""
         # Test 1: Invalid JSON
@@ -104,10 +142,357 @@ class TestRemoteSettingsAPI:
         print("[SUCCESS] Settings API error handling: Invalid JSON and empty data tested")
 
 
+class TestEventStream:
+    """Tests for the /api/events Server-Sent Events stream."""
+    
+    def read_events(self, response, count):
+        """Read count SSE messages (skipping the retry preamble) from a streaming response."""
+        messages = []
+        for chunk in response.response:
+            text = chunk.decode() if isinstance(chunk, bytes) else chunk
+            if text.startswith('event:') or text.startswith('id:'):
+                messages.append(text)
+            if len(messages) == count:
+                break
+        response.close()
+        return messages
+    
+    def parse(self, message):
+        fields = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+        return fields['event'], json.loads(fields['data'])
+    
+    def test_remote_actions_publish_events(self, client, isolated_cwd):
+        """Test remote actions are pushed as typed events to subscribers."""
+        response = client.get('/api/events?since=0', buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        
+        client.post('/api/settings', data=json.dumps({'speed': 3}),
+                    content_type='application/json', headers={'X-Client-Id': 'display-1'})
+        client.post('/api/save-current-favorite')
+        client.post('/api/play-pause')
+        client.post('/api/images/refresh', data=json.dumps({'uploaded_image_ids': ['abc']}),
+                    content_type='application/json')
+        
+        events = [self.parse(message) for message in self.read_events(response, 4)]
+        assert [event_type for event_type, _ in events] == ['settings', 'save-favorite', 'play-pause', 'refresh-images']
+        assert events[0][1]['settings']['speed'] == 3
+        assert events[0][1]['source'] == 'display-1'
+        assert events[3][1]['uploaded_image_ids'] == ['abc']
+    
+    def test_reconnect_replays_missed_events(self, app, client, isolated_cwd):
+        """Test Last-Event-ID resumes after the last event the client saw."""
+        bus = app.extensions['event_bus']
+        seen = bus.publish('new-pattern')
+        bus.publish('play-pause')
+        
+        response = client.get('/api/events', headers={'Last-Event-ID': str(seen['id'])}, buffered=False)
+        event_type, _ = self.parse(self.read_events(response, 1)[0])
+        assert event_type == 'play-pause'
+    
+    def test_stale_event_id_triggers_resync(self, client, isolated_cwd):
+        """Test an ID from a previous server run asks the client to resync."""
+        response = client.get('/api/events', headers={'Last-Event-ID': '500'}, buffered=False)
+        event_type, _ = self.parse(self.read_events(response, 1)[0])
+        assert event_type == 'resync'
+    
+    def test_invalid_event_id(self, client):
+        """Test a non-numeric event ID is rejected."""
+        assert client.get('/api/events?since=abc').status_code == 400
+
+
+class TestCommandsWait:
+    """Tests for the /api/commands/wait long-poll endpoint."""
+    
+    def test_returns_all_pending_events(self, client, isolated_cwd):
+        """Test every event after the cursor comes back in one response."""
+        cursor = client.get('/api/commands/wait').get_json()['cursor']
+        
+        client.post('/api/settings', data=json.dumps({'speed': 2}), content_type='application/json')
+        client.post('/api/play-pause')
+        client.post('/api/new-pattern')
+        
+        data = client.get(f'/api/commands/wait?cursor={cursor}').get_json()
+        assert [event['type'] for event in data['events']] == ['settings', 'play-pause', 'new-pattern']
+        assert data['events'][0]['data']['settings']['speed'] == 2
+        assert data['cursor'] == data['events'][-1]['id']
+        assert data['resync'] is False
+    
+    def test_waits_until_an_event_arrives(self, app, client):
+        """Test a held request returns as soon as an event is published."""
+        bus = app.extensions['event_bus']
+        cursor = bus.last_id
+        threading.Timer(0.1, bus.publish, args=('save-favorite',)).start()
+        
+        started = time.time()
+        data = client.get(f'/api/commands/wait?cursor={cursor}&timeout=5').get_json()
+        assert time.time() - started < 5
+        assert [event['type'] for event in data['events']] == ['save-favorite']
+    
+    def test_timeout_returns_empty(self, client):
+        """Test an idle wait returns no events and keeps the cursor."""
+        cursor = client.get('/api/commands/wait').get_json()['cursor']
+        data = client.get(f'/api/commands/wait?cursor={cursor}&timeout=0.05').get_json()
+        assert data == {'events': [], 'cursor': cursor, 'resync': False}
+    
+    def test_stale_cursor_and_invalid_parameters(self, client):
+        """Test a cursor from a previous server run asks for a resync and bad input is rejected."""
+        assert client.get('/api/commands/wait?cursor=500').get_json()['resync'] is True
+        assert client.get('/api/commands/wait?cursor=abc').status_code == 400
+        assert client.get('/api/commands/wait?cursor=0&timeout=soon').status_code == 400
+
+
+class TestCommandQueue:
+    """Tests for the sequenced command log shared by all displays."""
+    
+    def commands(self, client, display_id):
+        return client.get(f'/api/commands?display_id={display_id}').get_json()['commands']
+    
+    def test_each_display_gets_every_command(self, client, isolated_cwd):
+        """Test quick presses are all kept and each display acknowledges independently."""
+        self.commands(client, 'tv')
+        self.commands(client, 'projector')
+        
+        client.post('/api/play-pause')
+        client.post('/api/play-pause')
+        client.post('/api/images/refresh', data=json.dumps({'uploaded_image_ids': ['abc']}),
+                    content_type='application/json')
+        
+        tv_commands = self.commands(client, 'tv')
+        assert [c['type'] for c in tv_commands] == ['play-pause', 'play-pause', 'refresh-images']
+        
+        response = client.post('/api/commands/ack', data=json.dumps({'display_id': 'tv', 'seq': tv_commands[1]['seq']}),
+                               content_type='application/json')
+        assert response.get_json()['cursor'] == tv_commands[1]['seq']
+        assert [c['type'] for c in self.commands(client, 'tv')] == ['refresh-images']
+        assert len(self.commands(client, 'projector')) == 3
+    
+    def test_commands_are_pushed_with_sequence_numbers(self, client, isolated_cwd):
+        """Test events for commands carry the command's sequence number."""
+        cursor = client.get('/api/commands/wait').get_json()['cursor']
+        self.commands(client, 'tv')
+        client.post('/api/save-current-favorite')
+        
+        event = client.get(f'/api/commands/wait?cursor={cursor}').get_json()['events'][0]
+        assert event['data']['seq'] == self.commands(client, 'tv')[0]['seq']
+    
+    def test_legacy_check_endpoints(self, client, isolated_cwd):
+        """Test the check-* endpoints still hand each request out once."""
+        client.post('/api/play-pause')
+        assert client.get('/api/check-play-pause').get_json()['has_request'] is True
+        assert client.get('/api/check-play-pause').get_json()['has_request'] is False
+        
+        for image_id in ['a', 'b']:
+            client.post('/api/images/refresh', data=json.dumps({'uploaded_image_ids': [image_id]}),
+                        content_type='application/json')
+        assert client.get('/api/check-refresh-images').get_json()['uploaded_image_ids'] == ['a', 'b']
+        client.delete('/api/refresh-images-status')
+        assert client.get('/api/check-refresh-images').get_json()['has_request'] is False
+    
+    def test_invalid_requests(self, client):
+        """Test missing display IDs and malformed acks are rejected."""
+        assert client.get('/api/commands').status_code == 400
+        response = client.post('/api/commands/ack', data=json.dumps({'display_id': 'tv', 'seq': 'x'}),
+                               content_type='application/json')
+        assert response.status_code == 400
+
+
+class TestDisplays:
+    """Tests for the display registry and targeted commands."""
+    
+    def register(self, client, display_id, **extra):
+        return client.post('/api/displays', data=json.dumps({'display_id': display_id, **extra}),
+                           content_type='application/json')
+    
+    def test_register_and_report_state(self, client):
+        """Test displays register, report state and are listed."""
+        assert self.register(client, 'tv', name='TV', kiosk=True).status_code == 200
+        response = client.post('/api/displays/tv/state', data=json.dumps({'seed': 'abc', 'layers': 3, 'fps': 30}),
+                               content_type='application/json')
+        assert response.status_code == 200
+        
+        displays = client.get('/api/displays').get_json()['displays']
+        assert [d['id'] for d in displays] == ['tv']
+        assert displays[0]['state'] == {'seed': 'abc', 'layers': 3, 'fps': 30}
+        assert client.get('/api/displays/tv').get_json()['name'] == 'TV'
+        assert client.get('/api/displays/missing').status_code == 404
+        assert self.register(client, '').status_code == 400
+    
+    def test_targeted_commands_reach_one_display(self, client, isolated_cwd):
+        """Test a command with display_id is only queued and streamed for that display."""
+        self.register(client, 'tv')
+        self.register(client, 'projector')
+        cursor = client.get('/api/commands/wait').get_json()['cursor']
+        
+        client.post('/api/play-pause', data=json.dumps({'display_id': 'projector'}), content_type='application/json')
+        client.post('/api/new-pattern')
+        
+        def commands(display_id):
+            data = client.get(f'/api/commands?display_id={display_id}').get_json()
+            return [c['type'] for c in data['commands']]
+        
+        assert commands('tv') == ['new-pattern']
+        assert commands('projector') == ['play-pause', 'new-pattern']
+        
+        events = client.get(f'/api/commands/wait?cursor={cursor}&display_id=tv').get_json()['events']
+        assert [event['type'] for event in events] == ['new-pattern']
+    
+    def test_unknown_target_rejected(self, client, isolated_cwd):
+        """Test commands for an unregistered display are refused."""
+        response = client.post('/api/play-pause?display_id=nowhere')
+        assert response.status_code == 404
+        assert 'Display not found' in response.get_json()['error']
+    
+    def test_frame_telemetry(self, client):
+        """Test telemetry reports are summarized per display and malformed ones rejected."""
+        report = {
+            'duration_ms': 60000,
+            'frames': {'counts': [50, 0, 0, 0, 0, 0, 0, 0, 0, 1], 'sum_ms': 1500},
+            'config': {'fps': 30, 'max_layers': 4, 'quality': 'high'}
+        }
+        assert client.post('/api/displays/tv/telemetry', json=report).status_code == 200
+        assert client.post('/api/displays/tv/telemetry', json={'frames': {'counts': [1]}}).status_code == 400
+        
+        summary = client.get('/api/displays/tv/telemetry?minutes=5').get_json()
+        assert summary['frames']['count'] == 51
+        assert summary['frames']['slow'] == 1
+        assert summary['by_config'][0]['config'] == {'fps': 30, 'max_layers': 4, 'quality': 'high'}
+        assert [d['display_id'] for d in client.get('/api/telemetry').get_json()['displays']] == ['tv']
+        assert client.get('/api/displays/projector/telemetry').status_code == 404
+
+
+class TestRemoteSessions:
+    """Tests for remote session IDs, heartbeats and active-remote notifications."""
+    
+    def test_session_lifecycle(self, client):
+        """Test sessions are issued, kept alive by 204 heartbeats and counted until ended."""
+        response = client.post('/api/remote/sessions')
+        assert response.status_code == 201
+        session_id = response.get_json()['session_id']
+        
+        heartbeat = client.post(f'/api/remote/sessions/{session_id}/heartbeat')
+        assert heartbeat.status_code == 204
+        assert heartbeat.data == b''
+        assert client.get('/api/remote-status').get_json()['active_remotes'] == 1
+        
+        assert client.delete(f'/api/remote/sessions/{session_id}').status_code == 204
+        assert client.get('/api/remote-status').get_json()['active_remotes'] == 0
+        assert client.post(f'/api/remote/sessions/{session_id}/heartbeat').status_code == 404
+    
+    def test_count_changes_are_published(self, client):
+        """Test displays get a remotes event when the number of active remotes changes."""
+        cursor = client.get('/api/commands/wait').get_json()['cursor']
+        session_id = client.post('/api/remote/sessions').get_json()['session_id']
+        client.post(f'/api/remote/sessions/{session_id}/heartbeat')
+        client.delete(f'/api/remote/sessions/{session_id}')
+        
+        events = client.get(f'/api/commands/wait?cursor={cursor}').get_json()['events']
+        assert [(e['type'], e['data']['active_remotes']) for e in events] == [('remotes', 1), ('remotes', 0)]
+    
+    def test_legacy_settings_heartbeat(self, client, isolated_cwd):
+        """Test remotes that send ?heartbeat= with settings polls still count as active."""
+        client.get(f'/api/settings?heartbeat={int(time.time() * 1000)}')
+        assert client.get('/api/remote-status').get_json()['active_remotes'] == 1
+
+
+class TestControlChannel:
+    """Tests for the WebSocket control channel used by the remote."""
+    
+    @pytest.fixture
+    def server(self, app, isolated_cwd):
+        """Serve the app on a real socket so WebSocket clients can connect."""
+        pytest.importorskip('flask_sock')
+        import threading
+        from werkzeug.serving import make_server
+        
+        # Requests arrive for 127.0.0.1 rather than the test SERVER_NAME
+        app.config['SERVER_NAME'] = None
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f'ws://127.0.0.1:{server.server_port}/api/control'
+        server.shutdown()
+    
+    def connect(self, url, client_id):
+        import simple_websocket
+        ws = simple_websocket.Client.connect(f'{url}?client_id={client_id}')
+        hello = json.loads(ws.receive(timeout=5))
+        assert hello['type'] == 'state'
+        assert hello['client_id'] == client_id
+        return ws, hello
+    
+    def test_batched_settings_are_acknowledged(self, server):
+        """Test a settings delta is applied and acked with the resulting settings."""
+        ws, hello = self.connect(server, 'phone-1')
+        assert hello['settings']['speed'] == 1
+        
+        ws.send(json.dumps({'type': 'settings', 'seq': 1, 'changes': {'speed': 4, 'gallery': {'brightness': 90}}}))
+        ack = json.loads(ws.receive(timeout=5))
+        assert ack == {'type': 'ack', 'seq': 1, 'ok': True, 'settings': ack['settings']}
+        assert ack['settings']['speed'] == 4
+        assert ack['settings']['gallery']['brightness'] == 90
+        ws.close()
+    
+    def test_commands_and_errors(self, server):
+        """Test commands in one frame are acked in order, with errors reported per message."""
+        ws, _ = self.connect(server, 'phone-2')
+        ws.send(json.dumps([
+            {'type': 'command', 'seq': 1, 'command': 'play-pause'},
+            {'type': 'command', 'seq': 2, 'command': 'load-favorite', 'favorite_id': 'missing'},
+            {'type': 'bogus', 'seq': 3}
+        ]))
+        acks = [json.loads(ws.receive(timeout=5)) for _ in range(3)]
+        assert [(ack['seq'], ack['ok']) for ack in acks] == [(1, True), (2, False), (3, False)]
+        assert acks[1]['error'] == 'Favorite not found'
+        ws.close()
+    
+    def test_state_pushed_to_other_remotes(self, server):
+        """Test a change from one remote is pushed to another, but not echoed back."""
+        sender, _ = self.connect(server, 'phone-a')
+        watcher, _ = self.connect(server, 'phone-b')
+        
+        sender.send(json.dumps({'type': 'settings', 'seq': 1, 'changes': {'volume': 10}}))
+        assert json.loads(sender.receive(timeout=5))['type'] == 'ack'
+        
+        pushed = json.loads(watcher.receive(timeout=5))
+        assert pushed['type'] == 'state'
+        assert pushed['settings']['volume'] == 10
+        assert sender.receive(timeout=0.3) is None
+        sender.close()
+        watcher.close()
+    
+    def test_dropped_socket_keeps_remote_session(self, app, server):
+        """Test a remote's REST session stays active when its control socket drops."""
+        remote_sessions = app.extensions['remote_sessions']
+        session_id = remote_sessions.create()
+        
+        ws, _ = self.connect(server, session_id)
+        ws.close()
+        time.sleep(0.3)
+        
+        assert session_id in remote_sessions.active()
+        assert remote_sessions.touch(session_id)
+    
+    def test_servers_without_websockets(self, client, isolated_cwd):
+        """Test a server that can't hand over its socket (like waitress) refuses cleanly and the remote doesn't try."""
+        pytest.importorskip('flask_sock')
+        # The test client's environ has no werkzeug.socket, as under waitress
+        response = client.get('/api/control', headers={'Connection': 'Upgrade', 'Upgrade': 'websocket'})
+        assert response.status_code == 426
+        assert 'window.CONTROL_WEBSOCKET = false;' in client.get('/remote').data.decode()
+    
+    def test_remote_page_enables_websocket(self, server):
+        """Test the remote page served by a WebSocket-capable server tells the remote to connect."""
+        import urllib.request
+        page_url = server.replace('ws://', 'http://').replace('/api/control', '/remote')
+        with urllib.request.urlopen(page_url) as response:
+            assert 'window.CONTROL_WEBSOCKET = true;' in response.read().decode()
+
+
 class TestRemoteControlAPI:
     """Comprehensive tests for remote control functionality and endpoints."""
     
-    def test_remote_control_endpoints_comprehensive(self, client):
+    def test_remote_control_endpoints_comprehensive(self, client, isolated_cwd):
         """Test remote control endpoints: routes, patterns, favorites, and request queues."""
         # Test 1: Remote route accessibility
         response = client.get('/remote')
@@ -132,22 +517,12 @@ class TestRemoteControlAPI:
             assert data['success'] == True
         
         # Test 3: Favorite load with nonexistent ID
-        # Create empty favorites.json file to ensure we get "Favorite not found" instead of "No favorites found"
-        import os
-        with open('favorites.json', 'w') as f:
-            json.dump({}, f)
-        
-        try:
-            response = client.post('/api/favorites/test-id/load')
-            assert response.status_code == 404
+        response = client.post('/api/favorites/test-id/load')
+        assert response.status_code == 404
         
-            data = json.loads(response.data)
-            assert 'error' in data
-            assert 'Favorite not found' in data['error']
-        finally:
-            # Clean up test file
-            if os.path.exists('favorites.json'):
-                os.remove('favorites.json')
+        data = json.loads(response.data)
+        assert 'error' in data
+        assert 'Favorite not found' in data['error']
         
         # Test 4: Request queue endpoints
         # Save favorite request polling
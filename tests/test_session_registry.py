@@ -0,0 +1,53 @@
+"""
+Tests for the SessionRegistry that tracks active remote controls.
+"""
+
+import pytest
+import time
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.session_registry import SessionRegistry
+
+
+class TestSessionRegistry:
+    """Tests for session heartbeats, expiry and change notifications."""
+    
+    def test_sessions_and_heartbeats(self):
+        """Test issued sessions stay active on heartbeat and unknown ones are not created implicitly."""
+        registry = SessionRegistry()
+        session_id = registry.create()
+        
+        assert registry.touch(session_id) is True
+        assert registry.touch('unknown') is False
+        assert list(registry.active()) == [session_id]
+        
+        assert registry.remove(session_id) is True
+        assert registry.count() == 0
+    
+    def test_expiry_keeps_refreshed_sessions(self):
+        """Test only sessions without recent heartbeats expire."""
+        registry = SessionRegistry(ttl=0.15)
+        stale = registry.create()
+        fresh = registry.create()
+        time.sleep(0.1)
+        registry.touch(fresh)
+        time.sleep(0.08)
+        
+        assert list(registry.active()) == [fresh]
+        assert registry.touch(stale) is False
+    
+    def test_change_notifications(self):
+        """Test on_change reports the active count on joins, leaves and timed-out sessions."""
+        counts = []
+        registry = SessionRegistry(ttl=0.1, on_change=counts.append)
+        first = registry.create()
+        registry.create()
+        registry.touch(first)  # No change in count
+        registry.remove(first)
+        
+        # The remaining session expires without any further calls
+        time.sleep(0.3)
+        assert counts == [1, 2, 1, 0]
@@ -0,0 +1,58 @@
+"""
+Tests for the SettingsCoalescer that merges bursts of settings updates.
+"""
+
+import pytest
+import time
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.settings_coalescer import SettingsCoalescer
+
+
+def recording_apply(applied):
+    def apply(changes, source):
+        applied.append((changes, source))
+        return changes
+    return apply
+
+
+class TestSettingsCoalescer:
+    """Tests for immediate, merged and flushed updates."""
+    
+    def test_first_update_applied_immediately(self):
+        """Test an update after a quiet period is applied without waiting."""
+        applied = []
+        coalescer = SettingsCoalescer(recording_apply(applied), window=0.2)
+        
+        assert coalescer.submit({'speed': 3}, 'remote-a') == ({'speed': 3}, True)
+        assert applied == [({'speed': 3}, 'remote-a')]
+    
+    def test_burst_becomes_one_change(self):
+        """Test updates within the window are merged (gallery key by key) and applied once it ends."""
+        applied = []
+        coalescer = SettingsCoalescer(recording_apply(applied), window=0.1)
+        coalescer.submit({'speed': 1}, 'remote-a')
+        for value in range(10):
+            assert coalescer.submit({'gallery': {'brightness': 100 + value}}, 'remote-a') == (None, False)
+        coalescer.submit({'gallery': {'contrast': 90}, 'speed': 4}, 'remote-a')
+        assert coalescer.pending() == {'speed': 4, 'gallery': {'brightness': 109, 'contrast': 90}}
+        
+        time.sleep(0.25)
+        assert applied[1:] == [({'speed': 4, 'gallery': {'brightness': 109, 'contrast': 90}}, 'remote-a')]
+        assert coalescer.pending() == {}
+        assert (coalescer.applied_count, coalescer.merged_count) == (2, 11)
+    
+    def test_mixed_sources_and_flush(self):
+        """Test a change merged from several senders has no source, and flush applies it early."""
+        applied = []
+        coalescer = SettingsCoalescer(recording_apply(applied), window=10)
+        coalescer.submit({'speed': 1}, 'remote-a')
+        coalescer.submit({'speed': 2}, 'remote-a')
+        coalescer.submit({'volume': 20}, 'remote-b')
+        
+        assert coalescer.flush() == {'speed': 2, 'volume': 20}
+        assert applied[-1] == ({'speed': 2, 'volume': 20}, None)
+        assert coalescer.flush() is None
@@ -0,0 +1,117 @@
+"""
+Tests for the in-memory SettingsStore behind /api/settings.
+"""
+
+import pytest
+import json
+import threading
+import time
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.settings_store import SettingsStore
+
+DEFAULTS = {'speed': 1, 'volume': 50, 'gallery': {'brightness': 100, 'contrast': 100}}
+
+
+class TestSettingsStore:
+    """Tests for versioning, merging and debounced persistence."""
+    
+    def test_first_run_writes_defaults(self, tmp_path):
+        """Test a missing file is created from the defaults."""
+        path = tmp_path / 'settings.json'
+        store = SettingsStore(str(path), DEFAULTS)
+        
+        assert json.loads(path.read_text()) == DEFAULTS
+        assert store.snapshot() == (DEFAULTS, 1)
+    
+    def test_existing_file_merged_over_defaults(self, tmp_path):
+        """Test saved values win and missing keys come from the defaults."""
+        path = tmp_path / 'settings.json'
+        path.write_text(json.dumps({'speed': 4, 'gallery': {'brightness': 120}}))
+        settings, _ = SettingsStore(str(path), DEFAULTS).snapshot()
+        
+        assert settings['speed'] == 4
+        assert settings['volume'] == 50
+        assert settings['gallery'] == {'brightness': 120, 'contrast': 100}
+    
+    def test_update_bumps_version_and_merges_gallery(self, tmp_path):
+        """Test updates are versioned and gallery values merge key by key."""
+        store = SettingsStore(str(tmp_path / 'settings.json'), DEFAULTS, save_delay=60)
+        settings, version = store.update({'gallery': {'contrast': 90}, 'speed': 3})
+        
+        assert version == 2
+        assert settings['gallery'] == {'brightness': 100, 'contrast': 90}
+        assert settings['speed'] == 3
+        
+        # Snapshots are copies
+        snapshot, _ = store.snapshot()
+        snapshot['gallery']['contrast'] = 0
+        assert store.snapshot()[0]['gallery']['contrast'] == 90
+    
+    def test_writes_are_debounced(self, tmp_path):
+        """Test a burst of updates produces a single atomic write."""
+        path = tmp_path / 'settings.json'
+        store = SettingsStore(str(path), DEFAULTS, save_delay=0.1)
+        initial_writes = store.write_count
+        
+        for speed in range(2, 7):
+            store.update({'speed': speed})
+        assert json.loads(path.read_text())['speed'] == 1
+        
+        time.sleep(0.3)
+        assert json.loads(path.read_text())['speed'] == 6
+        assert store.write_count == initial_writes + 1
+        assert [p.name for p in tmp_path.iterdir()] == ['settings.json']
+    
+    def test_concurrent_updates_are_not_lost(self, tmp_path):
+        """Test parallel read-modify-write updates all land and versions stay ordered."""
+        store = SettingsStore(str(tmp_path / 'settings.json'), DEFAULTS, save_delay=60)
+        versions = []
+        
+        def worker(index):
+            for step in range(50):
+                store.update({f'key{index}': step}, on_change=lambda settings, version: versions.append(version))
+        
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        settings, version = store.snapshot()
+        assert version == 201
+        assert versions == sorted(versions)
+        assert all(settings[f'key{i}'] == 49 for i in range(4))
+        
+        assert store.flush()
+        assert json.loads((tmp_path / 'settings.json').read_text())['key3'] == 49
+    
+    def test_reads_do_not_wait_for_writes(self, tmp_path, monkeypatch):
+        """Test snapshots and updates go ahead during a slow fsync, and a change made meanwhile is saved next."""
+        path = tmp_path / 'settings.json'
+        store = SettingsStore(str(path), DEFAULTS, save_delay=60)
+        store.update({'speed': 2})
+        
+        in_fsync, release = threading.Event(), threading.Event()
+        real_fsync = os.fsync
+        
+        def slow_fsync(fd):
+            in_fsync.set()
+            release.wait(5)
+            real_fsync(fd)
+        monkeypatch.setattr('utils.settings_store.os.fsync', slow_fsync)
+        
+        writer = threading.Thread(target=store.flush)
+        writer.start()
+        assert in_fsync.wait(5)
+        assert store.snapshot()[0]['speed'] == 2
+        store.update({'speed': 3})
+        release.set()
+        writer.join()
+        
+        assert json.loads(path.read_text())['speed'] == 2
+        assert store.flush()
+        assert json.loads(path.read_text())['speed'] == 3
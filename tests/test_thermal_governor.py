@@ -0,0 +1,69 @@
+"""
+Tests for the ThermalGovernor that steps display quality down as the CPU heats up.
+"""
+
+import pytest
+import os
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.thermal_governor import ThermalGovernor, read_cpu_temperature
+
+
+LEVELS = [
+    {'above_c': 70, 'max_layers': 3, 'fps': 20},
+    {'above_c': 80, 'max_layers': 1, 'fps': 10}
+]
+
+
+class TestThermalGovernor:
+    """Tests for levels, hysteresis and change reporting."""
+    
+    def test_levels_follow_thresholds(self):
+        """Test the level rises with the temperature and jumps straight to the highest crossed."""
+        governor = ThermalGovernor(LEVELS, hysteresis=5)
+        assert governor.update(60) is False
+        assert governor.limits() is None
+        
+        assert governor.update(72) is True
+        assert governor.limits() == {'max_layers': 3, 'fps': 20}
+        assert governor.update(85) is True
+        assert governor.level == 2
+        
+        fresh = ThermalGovernor(LEVELS)
+        fresh.update(81)
+        assert fresh.level == 2
+    
+    def test_hysteresis_prevents_flapping(self):
+        """Test a level is only left once the temperature is hysteresis below its threshold."""
+        governor = ThermalGovernor(LEVELS, hysteresis=5)
+        governor.update(71)
+        for temperature in (69, 70.5, 66, 67):
+            governor.update(temperature)
+        assert governor.level == 1
+        
+        governor.update(64)
+        assert governor.level == 0
+        assert governor.state()['changes'] == 2
+    
+    def test_changes_are_reported_and_recorded(self):
+        """Test on_change receives the new state and the history keeps each transition."""
+        states = []
+        governor = ThermalGovernor(LEVELS, on_change=states.append)
+        governor.update(82)
+        governor.update(50)
+        
+        assert [state['level'] for state in states] == [2, 0]
+        assert [(change['from'], change['to']) for change in governor.history()] == [(0, 2), (2, 0)]
+        assert governor.state()['throttled_seconds'] >= 0
+    
+    def test_sample_reads_the_sensor(self, tmp_path):
+        """Test sample() applies sensor readings and ignores a missing sensor."""
+        sensor = tmp_path / 'temp'
+        sensor.write_text('75500\n')
+        governor = ThermalGovernor(LEVELS, read_temperature=lambda: read_cpu_temperature(str(sensor)))
+        
+        assert governor.sample() == 75.5
+        assert governor.level == 1
+        assert read_cpu_temperature(str(tmp_path / 'missing')) is None
@@ -0,0 +1,108 @@
+import time
+import threading
+from collections import deque
+
+
+class CommandLog:
+    """
+    Bounded, sequence-numbered log of display commands with per-consumer cursors.
+    
+    Each consumer (a display) reads the commands after its cursor and
+    acknowledges the last one it processed; unacknowledged commands are
+    returned again on the next read, so nothing is lost if a display fails
+    mid-way, and acknowledged ones never come back. Consumers start at the
+    current end of the log, so a newly opened display does not replay old
+    commands. Consumers that stop reading are forgotten after consumer_ttl
+    seconds.
+    """
+    
+    def __init__(self, capacity=256, consumer_ttl=600):
+        self._condition = threading.Condition()
+        self._entries = deque(maxlen=capacity)
+        self._last_seq = 0
+        self._consumers = {}  # {consumer_id: {'cursor': seq, 'last_seen': time, 'expires': bool}}
+        self.consumer_ttl = consumer_ttl
+    
+    @property
+    def last_seq(self):
+        with self._condition:
+            return self._last_seq
+    
+    def __len__(self):
+        """Number of commands kept in the log."""
+        with self._condition:
+            return len(self._entries)
+    
+    def append(self, command_type, data=None, target=None):
+        """
+        Record a command and wake waiting consumers. target limits the
+        command to one consumer; None sends it to all. Returns the entry.
+        """
+        with self._condition:
+            self._last_seq += 1
+            entry = {
+                'seq': self._last_seq,
+                'type': command_type,
+                'data': data if data is not None else {},
+                'target': target,
+                'timestamp': time.time()
+            }
+            self._entries.append(entry)
+            self._condition.notify_all()
+        return entry
+    
+    def register(self, consumer_id, expires=True):
+        """Start a consumer at the current end of the log (no-op if it exists). Returns its cursor."""
+        with self._condition:
+            return self._consumer(consumer_id, expires)['cursor']
+    
+    def _consumer(self, consumer_id, expires=True):
+        now = time.time()
+        consumer = self._consumers.get(consumer_id)
+        if consumer is None:
+            consumer = {'cursor': self._last_seq, 'last_seen': now, 'expires': expires}
+            self._consumers[consumer_id] = consumer
+            # Registration is rare, so prune idle consumers here
+            cutoff = now - self.consumer_ttl
+            for key in [k for k, v in self._consumers.items() if v['expires'] and v['last_seen'] < cutoff]:
+                del self._consumers[key]
+        consumer['last_seen'] = now
+        return consumer
+    
+    def _pending(self, consumer_id, consumer, command_type=None):
+        cursor = consumer['cursor']
+        oldest_seq = self._entries[0]['seq'] if self._entries else self._last_seq + 1
+        missed = max(0, oldest_seq - cursor - 1)
+        commands = [entry for entry in self._entries
+                    if entry['seq'] > cursor
+                    and entry['target'] in (None, consumer_id)
+                    and (command_type is None or entry['type'] == command_type)]
+        return commands, missed
+    
+    def read(self, consumer_id, command_type=None):
+        """
+        Return (commands, missed) for commands after the consumer's cursor,
+        optionally only those of one type. missed counts commands that
+        dropped out of the log before the consumer read them.
+        """
+        with self._condition:
+            return self._pending(consumer_id, self._consumer(consumer_id), command_type)
+    
+    def wait(self, consumer_id, timeout=None):
+        """Block until the consumer has pending commands or timeout elapses. Returns (commands, missed)."""
+        with self._condition:
+            consumer = self._consumer(consumer_id)
+            self._condition.wait_for(lambda: self._pending(consumer_id, consumer)[0], timeout=timeout)
+            return self._pending(consumer_id, consumer)
+    
+    def ack(self, consumer_id, seq):
+        """Mark commands up to seq as processed. Cursors never move backwards. Returns the cursor."""
+        with self._condition:
+            consumer = self._consumer(consumer_id)
+            consumer['cursor'] = max(consumer['cursor'], min(int(seq), self._last_seq))
+            return consumer['cursor']
+    
+    def consumers(self):
+        """Snapshot of {consumer_id: cursor} for active consumers."""
+        with self._condition:
+            return {consumer_id: consumer['cursor'] for consumer_id, consumer in self._consumers.items()}
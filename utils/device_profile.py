@@ -0,0 +1,181 @@
+import io
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+from pathlib import Path
+
+# Cached result of the first-boot benchmark
+PROFILE_FILE = 'device_profile.json'
+
+
+def profile_directory():
+    """
+    Directory the profile is cached in: next to the executable in a PyInstaller
+    build (whose bundle directory, the launcher's working directory, is
+    deleted on exit), otherwise next to config.json.
+    """
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(os.path.abspath(sys.executable))
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+PROFILE_PATH = os.path.join(profile_directory(), PROFILE_FILE)
+
+# Bump to re-run the benchmark everywhere when the measurement or tiers change
+PROFILE_VERSION = 1
+
+# Synthetic image used when the image directory is empty
+SYNTHETIC_SIZE = (1920, 1080)
+
+# (highest decode + resize milliseconds per megapixel, tier name, settings), fastest first.
+# Settings use config.json's section layout and are merged over the environment's values.
+PROFILE_TIERS = (
+    (20, 'high', {
+        'application': {'animation_fps': 30, 'preload_buffer_size': 5, 'max_concurrent_images': 10},
+        'layer_management': {'max_concurrent_layers': 5},
+        'performance': {'animation_quality': 'high'}
+    }),
+    (60, 'medium', {
+        'application': {'animation_fps': 30, 'preload_buffer_size': 4, 'max_concurrent_images': 8},
+        'layer_management': {'max_concurrent_layers': 4},
+        'performance': {'animation_quality': 'high'}
+    }),
+    (150, 'low', {
+        'application': {'animation_fps': 24, 'preload_buffer_size': 3, 'max_concurrent_images': 6},
+        'layer_management': {'max_concurrent_layers': 3},
+        'performance': {'animation_quality': 'medium'}
+    }),
+    (None, 'minimal', {
+        'application': {'animation_fps': 20, 'preload_buffer_size': 2, 'max_concurrent_images': 4},
+        'layer_management': {'max_concurrent_layers': 2},
+        'performance': {'animation_quality': 'low'}
+    })
+)
+
+# Devices with less memory than this are never put above the 'low' tier
+LOW_MEMORY_BYTES = 1536 * 1024 * 1024
+
+
+def device_fingerprint():
+    """Hardware and library details that invalidate a cached profile when they change."""
+    from PIL import __version__ as pillow_version
+    model = None
+    try:
+        with open('/proc/device-tree/model', 'r') as f:
+            model = f.read().strip('\x00\n ')
+    except OSError:
+        pass
+    return {
+        'model': model,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'memory_bytes': total_memory(),
+        'pillow': pillow_version
+    }
+
+
+def total_memory():
+    """Physical memory in bytes, or None where unavailable."""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def benchmark_images(image_dir, max_images=3, repeats=3):
+    """
+    Median PNG decode and display-resize time per megapixel over up to
+    max_images images from image_dir (a synthetic image if there are none).
+    Files are read into memory first so only CPU work is timed.
+    """
+    from PIL import Image
+    
+    sources = []
+    if image_dir and os.path.isdir(image_dir):
+        for path in sorted(Path(image_dir).glob('*.png'))[:max_images]:
+            sources.append(path.read_bytes())
+    if not sources:
+        buffer = io.BytesIO()
+        Image.effect_noise(SYNTHETIC_SIZE, 64).convert('RGBA').save(buffer, 'PNG')
+        sources.append(buffer.getvalue())
+    
+    decode_times = []
+    resize_times = []
+    for data in sources:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            image = Image.open(io.BytesIO(data))
+            image.load()
+            decoded = time.perf_counter()
+            megapixels = image.width * image.height / 1_000_000
+            
+            # The browser shows layers at roughly half their source size
+            image.convert('RGBA').resize((max(1, image.width // 2), max(1, image.height // 2)),
+                                         Image.Resampling.LANCZOS)
+            resized = time.perf_counter()
+            decode_times.append((decoded - started) * 1000 / megapixels)
+            resize_times.append((resized - decoded) * 1000 / megapixels)
+    
+    return {
+        'decode_ms_per_megapixel': round(statistics.median(decode_times), 2),
+        'resize_ms_per_megapixel': round(statistics.median(resize_times), 2),
+        'images': len(sources)
+    }
+
+
+def choose_tier(benchmark, memory_bytes=None):
+    """(tier name, settings) for benchmark results."""
+    score = benchmark['decode_ms_per_megapixel'] + benchmark['resize_ms_per_megapixel']
+    tiers = list(PROFILE_TIERS)
+    if memory_bytes is not None and memory_bytes < LOW_MEMORY_BYTES:
+        tiers = tiers[2:]
+    for limit, name, settings in tiers:
+        if limit is None or score <= limit:
+            return name, settings
+
+
+def load_profile(path=None):
+    """The cached profile (at PROFILE_PATH by default) if it exists and was measured on this device, else None."""
+    path = path or PROFILE_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(profile, dict) or profile.get('version') != PROFILE_VERSION:
+        return None
+    if profile.get('fingerprint') != device_fingerprint():
+        return None
+    return profile
+
+
+def calibrate(image_dir, path=None, force=False):
+    """Return the cached profile, benchmarking the device and caching the result first if needed."""
+    path = path or PROFILE_PATH
+    profile = None if force else load_profile(path)
+    if profile is not None:
+        return profile
+    
+    print("Calibrating: benchmarking image decode and resize speed...")
+    fingerprint = device_fingerprint()
+    benchmark = benchmark_images(image_dir)
+    tier, settings = choose_tier(benchmark, fingerprint['memory_bytes'])
+    profile = {
+        'version': PROFILE_VERSION,
+        'created_at': time.time(),
+        'fingerprint': fingerprint,
+        'benchmark': benchmark,
+        'tier': tier,
+        'settings': settings
+    }
+    
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(temp_path, path)
+    print(f"Calibration complete: '{tier}' profile "
+          f"({benchmark['decode_ms_per_megapixel']}ms decode, {benchmark['resize_ms_per_megapixel']}ms resize per megapixel)")
+    return profile
@@ -0,0 +1,86 @@
+import time
+import threading
+
+# Display state fields reported by kiosks (anything else in a report is ignored)
+STATE_FIELDS = ('seed', 'layers', 'fps', 'isPlaying', 'width', 'height')
+
+
+class DisplayRegistry:
+    """
+    Displays (main and kiosk browsers) connected to this server.
+    
+    Each display registers under a stable ID and reports its state (pattern
+    seed, active layers, measured FPS) periodically; the report doubles as a
+    heartbeat. Displays that have not reported for ttl seconds are listed as
+    offline and forgotten after forget_after seconds.
+    """
+    
+    def __init__(self, ttl=60, forget_after=3600):
+        self._lock = threading.Lock()
+        self._displays = {}
+        self.ttl = ttl
+        self.forget_after = forget_after
+    
+    def register(self, display_id, name=None, kiosk=False):
+        """Add a display (or refresh an existing one). Returns its record."""
+        now = time.time()
+        with self._lock:
+            display = self._displays.get(display_id)
+            if display is None:
+                display = {'id': display_id, 'registered_at': now, 'last_seen': now, 'state': {}}
+                self._displays[display_id] = display
+                self._prune(now)
+            display['name'] = name or display.get('name') or display_id
+            display['kiosk'] = bool(kiosk)
+            display['last_seen'] = now
+            return self._public(display, now)
+    
+    def update_state(self, display_id, state):
+        """Merge a state report from a display, registering it if needed. Returns its record."""
+        now = time.time()
+        with self._lock:
+            display = self._displays.get(display_id)
+            if display is None:
+                display = {'id': display_id, 'name': display_id, 'kiosk': False,
+                           'registered_at': now, 'last_seen': now, 'state': {}}
+                self._displays[display_id] = display
+                self._prune(now)
+            display['state'].update({k: state[k] for k in STATE_FIELDS if k in state})
+            display['state_updated_at'] = now
+            display['last_seen'] = now
+            return self._public(display, now)
+    
+    def get(self, display_id):
+        """Record for one display, or None."""
+        with self._lock:
+            display = self._displays.get(display_id)
+            return self._public(display, time.time()) if display else None
+    
+    def list(self, include_offline=False):
+        """Records for online displays (or all known ones), oldest registration first."""
+        now = time.time()
+        with self._lock:
+            displays = [self._public(d, now) for d in self._displays.values()]
+        if not include_offline:
+            displays = [d for d in displays if d['online']]
+        return sorted(displays, key=lambda d: d['registered_at'])
+    
+    def remove(self, display_id):
+        """Forget a display. Returns True if it was registered."""
+        with self._lock:
+            return self._displays.pop(display_id, None) is not None
+    
+    def __len__(self):
+        """Number of known displays, online or not."""
+        with self._lock:
+            return len(self._displays)
+    
+    def _prune(self, now):
+        cutoff = now - self.forget_after
+        for key in [k for k, d in self._displays.items() if d['last_seen'] < cutoff]:
+            del self._displays[key]
+    
+    def _public(self, display, now):
+        record = {**display, 'state': dict(display['state'])}
+        record['online'] = now - display['last_seen'] <= self.ttl
+        return record
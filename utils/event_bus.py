@@ -0,0 +1,71 @@
+import json
+import time
+import threading
+from collections import deque
+
+
+class EventBus:
+    """
+    Thread-safe publish/subscribe channel for typed display events.
+    
+    Every event gets an increasing integer ID and is kept in a bounded history,
+    so a subscriber that reconnects with the last ID it saw receives whatever it
+    missed. Subscribers block on a condition variable instead of polling.
+    """
+    
+    def __init__(self, history_size=256):
+        self._condition = threading.Condition()
+        self._history = deque(maxlen=history_size)
+        self._last_id = 0
+    
+    @property
+    def last_id(self):
+        with self._condition:
+            return self._last_id
+    
+    def __len__(self):
+        """Number of events kept in the history."""
+        with self._condition:
+            return len(self._history)
+    
+    def publish(self, event_type, data=None):
+        """Record an event and wake all waiting subscribers. Returns the event."""
+        with self._condition:
+            self._last_id += 1
+            event = {
+                'id': self._last_id,
+                'type': event_type,
+                'data': data if data is not None else {},
+                'timestamp': time.time()
+            }
+            self._history.append(event)
+            self._condition.notify_all()
+        return event
+    
+    def events_since(self, last_id):
+        """
+        Return (events, complete) for events newer than last_id. complete is
+        False when older events have already dropped out of the history, or
+        when last_id comes from a previous server run.
+        """
+        with self._condition:
+            return self._events_since(last_id)
+    
+    def _events_since(self, last_id):
+        events = [event for event in self._history if event['id'] > last_id]
+        oldest_id = self._history[0]['id'] if self._history else self._last_id + 1
+        complete = oldest_id - 1 <= last_id <= self._last_id
+        return events, complete
+    
+    def wait_for_events(self, last_id, timeout=None):
+        """Block until there are events newer than last_id or timeout elapses. Returns (events, complete)."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._last_id > last_id, timeout=timeout)
+            return self._events_since(last_id)
+
+
+def format_sse(event):
+    """Serialize an event as a Server-Sent Events message (events without an ID leave the client's last ID alone)."""
+    payload = json.dumps({**event['data'], 'timestamp': event['timestamp']})
+    id_line = f"id: {event['id']}\n" if event['id'] is not None else ''
+    return f"{id_line}event: {event['type']}\ndata: {payload}\n\n"
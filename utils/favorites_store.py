@@ -0,0 +1,331 @@
+import os
+import re
+import json
+import base64
+import binascii
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+THUMBNAIL_EXTENSIONS = {'image/png': 'png', 'image/jpeg': 'jpg', 'image/webp': 'webp', 'image/gif': 'gif'}
+THUMBNAIL_FILE_PATTERN = re.compile(r'^[0-9a-f]{64}\.(png|jpg|webp|gif)$')
+
+# Listing projections: public field name -> column
+LIST_FIELDS = {
+    'id': 'id',
+    'created_at': 'created_at',
+    'layer_count': 'layer_count',
+    'thumbnail': 'thumbnail_file'
+}
+
+
+def encode_cursor(created_at, favorite_id):
+    """Opaque pagination cursor for the position after (created_at, id)."""
+    raw = json.dumps([created_at, favorite_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into (created_at, id). Raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, favorite_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    if not isinstance(created_at, str) or not isinstance(favorite_id, str):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return created_at, favorite_id
+
+
+class FavoritesStore:
+    """
+    Transactional favorites storage backed by SQLite in WAL mode.
+    
+    Each favorite is one row indexed by ID and created_at, so reads and writes
+    only touch the affected row instead of rewriting a whole JSON file. Any
+    legacy favorites.json next to the database is imported once on open.
+    
+    Thumbnails are kept out of the rows as binary files named by the SHA-256
+    of their content, so identical thumbnails are stored once and can be
+    served with long-lived HTTP caching. Saves and deletes hold a store-level
+    lock while they touch those files, so a delete can't remove a file that a
+    concurrent save found already written and is about to reference.
+    """
+    
+    def __init__(self, db_path, legacy_json_path=None, thumbnail_dir=None):
+        self.db_path = Path(db_path)
+        self.legacy_json_path = Path(legacy_json_path) if legacy_json_path else None
+        self.thumbnail_dir = Path(thumbnail_dir) if thumbnail_dir else self.db_path.parent / 'favorite_thumbnails'
+        self._local = threading.local()
+        self._thumbnail_lock = threading.Lock()
+        self._init_schema()
+        self._migrate_inline_thumbnails()
+        self._migrate_legacy_json()
+    
+    def _connect(self):
+        """Get this thread's connection (sqlite3 connections are not shared across threads)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+    
+    def _init_schema(self):
+        conn = self._connect()
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS favorites (
+                    id TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    layer_count INTEGER NOT NULL DEFAULT 0,
+                    state TEXT NOT NULL,
+                    thumbnail_file TEXT
+                )
+            ''')
+            # Keyset pagination walks (created_at, id) newest first straight off this index
+            conn.execute('DROP INDEX IF EXISTS idx_favorites_created_at')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_favorites_created_at_id ON favorites (created_at DESC, id DESC)')
+            
+            # Databases created before thumbnails moved out of line lack thumbnail_file
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(favorites)')}
+            if 'thumbnail_file' not in columns:
+                conn.execute('ALTER TABLE favorites ADD COLUMN thumbnail_file TEXT')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_favorites_thumbnail_file ON favorites (thumbnail_file)')
+            
+            # Row count kept up to date by triggers, so totals never scan the table
+            conn.execute('CREATE TABLE IF NOT EXISTS favorites_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            conn.execute("INSERT OR IGNORE INTO favorites_stats (name, value) SELECT 'count', COUNT(*) FROM favorites")
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS favorites_count_insert AFTER INSERT ON favorites
+                BEGIN UPDATE favorites_stats SET value = value + 1 WHERE name = 'count'; END
+            ''')
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS favorites_count_delete AFTER DELETE ON favorites
+                BEGIN UPDATE favorites_stats SET value = value - 1 WHERE name = 'count'; END
+            ''')
+    
+    def _migrate_inline_thumbnails(self):
+        """Move base64 thumbnails stored in the legacy thumbnail column out to blob files."""
+        conn = self._connect()
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(favorites)')}
+        if 'thumbnail' not in columns:
+            return
+        
+        rows = conn.execute('SELECT id, thumbnail FROM favorites WHERE thumbnail IS NOT NULL').fetchall()
+        with conn:
+            for row in rows:
+                conn.execute(
+                    'UPDATE favorites SET thumbnail_file = ?, thumbnail = NULL WHERE id = ?',
+                    (self.store_thumbnail_data_url(row['thumbnail']), row['id'])
+                )
+    
+    def _migrate_legacy_json(self):
+        """Import favorites.json into the database, then keep it as a .migrated backup."""
+        if not self.legacy_json_path or not self.legacy_json_path.exists():
+            return
+        
+        try:
+            with open(self.legacy_json_path, 'r') as f:
+                favorites = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Could not migrate legacy favorites from {self.legacy_json_path}: {e}")
+            return
+        
+        conn = self._connect()
+        with conn:
+            for favorite_id, favorite_data in favorites.items():
+                conn.execute(
+                    'INSERT OR IGNORE INTO favorites (id, created_at, layer_count, state, thumbnail_file) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    self._to_row({**favorite_data, 'id': favorite_id})
+                )
+        
+        backup_path = self.legacy_json_path.with_name(self.legacy_json_path.name + '.migrated')
+        os.replace(self.legacy_json_path, backup_path)
+        print(f"Migrated {len(favorites)} favorites from {self.legacy_json_path} to {self.db_path}")
+    
+    def _to_row(self, favorite_data):
+        state = favorite_data.get('state', {})
+        thumbnail_file = favorite_data.get('thumbnail_file')
+        if not thumbnail_file and favorite_data.get('thumbnail'):
+            thumbnail_file = self.store_thumbnail_data_url(favorite_data['thumbnail'])
+        return (
+            favorite_data['id'],
+            favorite_data.get('created_at') or '',
+            len(state.get('layers', [])),
+            json.dumps(state),
+            thumbnail_file
+        )
+    
+    def _from_row(self, row):
+        return {
+            'id': row['id'],
+            'created_at': row['created_at'],
+            'state': json.loads(row['state']),
+            'thumbnail_file': row['thumbnail_file']
+        }
+    
+    def store_thumbnail(self, image_bytes, extension='png'):
+        """Write thumbnail bytes once under their content hash. Returns the file name."""
+        filename = f'{hashlib.sha256(image_bytes).hexdigest()}.{extension}'
+        path = self.thumbnail_dir / filename
+        if not path.exists():
+            self.thumbnail_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f'{filename}.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(temp_path, 'wb') as f:
+                f.write(image_bytes)
+            os.replace(temp_path, path)
+        return filename
+    
+    def store_thumbnail_data_url(self, data_url):
+        """Decode a base64 data URL thumbnail and store it. Returns the file name or None."""
+        try:
+            header, encoded = data_url.split(',', 1)
+            mime_type = header[len('data:'):].split(';')[0]
+            if not header.startswith('data:') or mime_type not in THUMBNAIL_EXTENSIONS:
+                return None
+            return self.store_thumbnail(base64.b64decode(encoded), THUMBNAIL_EXTENSIONS[mime_type])
+        except (ValueError, binascii.Error, AttributeError) as e:
+            print(f"Warning: Could not decode thumbnail data: {e}")
+            return None
+    
+    def thumbnail_path(self, filename):
+        """Path of a stored thumbnail, or None if the name is invalid or missing."""
+        if not THUMBNAIL_FILE_PATTERN.match(filename or ''):
+            return None
+        path = self.thumbnail_dir / filename
+        return path if path.exists() else None
+    
+    def save(self, favorite_data, thumbnail_bytes=None, thumbnail_extension='png'):
+        """
+        Insert or replace a favorite (dict with id, created_at, state and either
+        a stored thumbnail_file or a base64 thumbnail data URL). thumbnail_bytes,
+        if given, is stored and used as the thumbnail instead.
+        """
+        conn = self._connect()
+        with self._thumbnail_lock:
+            if thumbnail_bytes is not None:
+                thumbnail_file = self.store_thumbnail(thumbnail_bytes, thumbnail_extension)
+                favorite_data = {**favorite_data, 'thumbnail_file': thumbnail_file}
+            with conn:
+                # Upsert rather than REPLACE so the count triggers only see real inserts
+                conn.execute(
+                    'INSERT INTO favorites (id, created_at, layer_count, state, thumbnail_file) '
+                    'VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT (id) DO UPDATE SET created_at = excluded.created_at, '
+                    'layer_count = excluded.layer_count, state = excluded.state, '
+                    'thumbnail_file = excluded.thumbnail_file',
+                    self._to_row(favorite_data)
+                )
+    
+    def get(self, favorite_id):
+        """Return the full favorite dict, or None if it does not exist."""
+        row = self._connect().execute(
+            'SELECT id, created_at, state, thumbnail_file FROM favorites WHERE id = ?', (favorite_id,)
+        ).fetchone()
+        return self._from_row(row) if row else None
+    
+    def get_states(self, favorite_ids=None):
+        """Return {id: favorite} for all or the given favorites."""
+        conn = self._connect()
+        if favorite_ids is None:
+            rows = conn.execute(
+                'SELECT id, created_at, state, thumbnail_file FROM favorites ORDER BY created_at DESC'
+            ).fetchall()
+        else:
+            rows = []
+            for favorite_id in favorite_ids:
+                row = conn.execute(
+                    'SELECT id, created_at, state, thumbnail_file FROM favorites WHERE id = ?', (favorite_id,)
+                ).fetchone()
+                if row:
+                    rows.append(row)
+        return {row['id']: self._from_row(row) for row in rows}
+    
+    def delete(self, favorite_id):
+        """Delete a favorite and its thumbnail if no other favorite shares it. Returns True if it existed."""
+        conn = self._connect()
+        with self._thumbnail_lock:
+            with conn:
+                row = conn.execute('SELECT thumbnail_file FROM favorites WHERE id = ?', (favorite_id,)).fetchone()
+                if row is None:
+                    return False
+                conn.execute('DELETE FROM favorites WHERE id = ?', (favorite_id,))
+                thumbnail_file = row['thumbnail_file']
+                still_used = thumbnail_file and conn.execute(
+                    'SELECT 1 FROM favorites WHERE thumbnail_file = ? LIMIT 1', (thumbnail_file,)
+                ).fetchone()
+            
+            if thumbnail_file and not still_used:
+                try:
+                    (self.thumbnail_dir / thumbnail_file).unlink()
+                except OSError:
+                    pass
+        return True
+    
+    def list(self):
+        """List favorite metadata and thumbnail file names, newest first."""
+        rows = self._connect().execute(
+            'SELECT id, created_at, layer_count, thumbnail_file FROM favorites ORDER BY created_at DESC, id DESC'
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def page(self, limit, cursor=None, fields=None):
+        """
+        Return (favorites, next_cursor) for one page of the listing, newest first.
+        
+        Pages are fetched by seeking the (created_at, id) index past the cursor,
+        so every page costs the same however deep it is. A limit of None returns
+        everything after the cursor. fields selects a subset of LIST_FIELDS; the
+        thumbnail field comes back as thumbnail_file.
+        """
+        fields = fields or list(LIST_FIELDS)
+        unknown = [field for field in fields if field not in LIST_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        
+        # Sort keys are always read so the next cursor can be built
+        columns = list(dict.fromkeys([LIST_FIELDS[field] for field in fields] + ['created_at', 'id']))
+        query = f"SELECT {', '.join(columns)} FROM favorites"
+        params = []
+        if cursor:
+            query += ' WHERE (created_at, id) < (?, ?)'
+            params.extend(decode_cursor(cursor))
+        query += ' ORDER BY created_at DESC, id DESC'
+        if limit is not None:
+            # One extra row tells us whether another page follows
+            query += ' LIMIT ?'
+            params.append(limit + 1)
+        
+        rows = self._connect().execute(query, params).fetchall()
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+        
+        selected = [LIST_FIELDS[field] for field in fields]
+        return [{column: row[column] for column in selected} for row in rows], next_cursor
+    
+    def count(self):
+        """Number of favorites, read from the trigger-maintained counter."""
+        return self._connect().execute("SELECT value FROM favorites_stats WHERE name = 'count'").fetchone()[0]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_favorites_store(db_path='favorites.db', legacy_json_path='favorites.json'):
+    """Return the shared store for db_path, creating (and migrating) it on first use."""
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            legacy = os.path.join(os.path.dirname(key), legacy_json_path) if legacy_json_path else None
+            store = FavoritesStore(key, legacy)
+            _stores[key] = store
+        return store
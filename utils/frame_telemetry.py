@@ -0,0 +1,209 @@
+import time
+import threading
+from collections import deque
+
+# Histogram bucket upper bounds in milliseconds; AnimationEngine.js uses the same
+# bounds, and every histogram has one more count for values above the last bound
+FRAME_TIME_BUCKETS_MS = (17, 20, 25, 34, 50, 67, 100, 250, 500)
+DECODE_TIME_BUCKETS_MS = (5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Frames longer than this are counted as slow (three missed refreshes at 60Hz)
+SLOW_FRAME_MS = 50
+
+# Animation settings a report was taken under; summaries are split by them
+CONFIG_FIELDS = ('fps', 'max_layers', 'quality')
+
+
+class FrameTelemetry:
+    """
+    Frame-timing reports from displays, kept per display for summaries.
+    
+    Each display sends one report a minute: histograms of frame times and
+    image decode times, long-task totals, layer counts and the animation
+    settings in force. Up to max_reports reports are kept per display (a day
+    at one a minute), and displays that stop reporting are dropped after
+    forget_after seconds. summary() merges the reports in a time window,
+    separately for each combination of settings, so frame-time distributions
+    before and after a tuning change can be compared.
+    """
+    
+    def __init__(self, max_reports=1440, forget_after=86400):
+        self.max_reports = max_reports
+        self.forget_after = forget_after
+        self._lock = threading.Lock()
+        self._reports = {}  # {display_id: deque of reports, oldest first}
+    
+    def record(self, display_id, report):
+        """Validate and store one report. Raises ValueError if it is malformed."""
+        entry = {
+            'received_at': time.time(),
+            'duration_ms': _number(report.get('duration_ms', 0), 'duration_ms'),
+            'frames': _histogram(report.get('frames'), FRAME_TIME_BUCKETS_MS, 'frames'),
+            'decode': _histogram(report.get('decode', {}), DECODE_TIME_BUCKETS_MS, 'decode'),
+            'long_tasks': _long_tasks(report.get('long_tasks', {})),
+            'layers': _layers(report.get('layers', {})),
+            'config': _config(report.get('config', {}))
+        }
+        with self._lock:
+            reports = self._reports.get(display_id)
+            if reports is None:
+                reports = self._reports[display_id] = deque(maxlen=self.max_reports)
+                self._prune(entry['received_at'])
+            reports.append(entry)
+        return entry
+    
+    def displays(self):
+        """IDs of displays with stored reports."""
+        with self._lock:
+            return sorted(self._reports)
+    
+    def summary(self, display_id, since=None):
+        """
+        Merged reports for a display received after since (a time.time()
+        value, default all), overall and per settings combination. Returns
+        None if the display has not reported.
+        """
+        with self._lock:
+            reports = self._reports.get(display_id)
+            if reports is None:
+                return None
+            reports = [r for r in reports if since is None or r['received_at'] >= since]
+        
+        by_config = {}
+        for report in reports:
+            key = tuple(report['config'].get(field) for field in CONFIG_FIELDS)
+            by_config.setdefault(key, []).append(report)
+        
+        return {
+            'display_id': display_id,
+            **_merge(reports),
+            'by_config': [{'config': dict(zip(CONFIG_FIELDS, key)), **_merge(group)}
+                          for key, group in by_config.items()]
+        }
+    
+    def remove(self, display_id):
+        """Forget a display's reports. Returns True if it had any."""
+        with self._lock:
+            return self._reports.pop(display_id, None) is not None
+    
+    def __len__(self):
+        """Number of stored reports across all displays."""
+        with self._lock:
+            return sum(len(reports) for reports in self._reports.values())
+    
+    def _prune(self, now):
+        cutoff = now - self.forget_after
+        for key in [k for k, reports in self._reports.items() if reports and reports[-1]['received_at'] < cutoff]:
+            del self._reports[key]
+
+
+def _number(value, name):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f'{name} must be a non-negative number')
+    return value
+
+
+def _histogram(data, bounds, name):
+    if not isinstance(data, dict):
+        raise ValueError(f'{name} must be an object with counts and sum_ms')
+    counts = data.get('counts', [0] * (len(bounds) + 1))
+    if not isinstance(counts, list) or len(counts) != len(bounds) + 1:
+        raise ValueError(f'{name}.counts must have {len(bounds) + 1} entries')
+    return {
+        'counts': [int(_number(count, f'{name}.counts')) for count in counts],
+        'sum_ms': _number(data.get('sum_ms', 0), f'{name}.sum_ms')
+    }
+
+
+def _long_tasks(data):
+    if not isinstance(data, dict):
+        raise ValueError('long_tasks must be an object')
+    return {
+        'count': int(_number(data.get('count', 0), 'long_tasks.count')),
+        'total_ms': _number(data.get('total_ms', 0), 'long_tasks.total_ms'),
+        'max_ms': _number(data.get('max_ms', 0), 'long_tasks.max_ms')
+    }
+
+
+def _layers(data):
+    if not isinstance(data, dict):
+        raise ValueError('layers must be an object')
+    return {
+        'max': int(_number(data.get('max', 0), 'layers.max')),
+        'sum': _number(data.get('sum', 0), 'layers.sum'),
+        'samples': int(_number(data.get('samples', 0), 'layers.samples'))
+    }
+
+
+def _config(data):
+    if not isinstance(data, dict):
+        raise ValueError('config must be an object')
+    return {field: data[field] for field in CONFIG_FIELDS
+            if isinstance(data.get(field), (str, int, float)) and not isinstance(data.get(field), bool)}
+
+
+def _merge(reports):
+    """Combined histograms, percentiles and totals of reports."""
+    frames = [0] * (len(FRAME_TIME_BUCKETS_MS) + 1)
+    decode = [0] * (len(DECODE_TIME_BUCKETS_MS) + 1)
+    frame_ms = decode_ms = 0
+    long_tasks = {'count': 0, 'total_ms': 0, 'max_ms': 0}
+    layer_sum = layer_samples = layer_max = 0
+    duration_ms = 0
+    for report in reports:
+        frames = [a + b for a, b in zip(frames, report['frames']['counts'])]
+        decode = [a + b for a, b in zip(decode, report['decode']['counts'])]
+        frame_ms += report['frames']['sum_ms']
+        decode_ms += report['decode']['sum_ms']
+        long_tasks['count'] += report['long_tasks']['count']
+        long_tasks['total_ms'] += report['long_tasks']['total_ms']
+        long_tasks['max_ms'] = max(long_tasks['max_ms'], report['long_tasks']['max_ms'])
+        layer_sum += report['layers']['sum']
+        layer_samples += report['layers']['samples']
+        layer_max = max(layer_max, report['layers']['max'])
+        duration_ms += report['duration_ms']
+    
+    frame_count = sum(frames)
+    slow_frames = sum(count for bound, count in zip(FRAME_TIME_BUCKETS_MS + (None,), frames)
+                      if bound is None or bound > SLOW_FRAME_MS)
+    return {
+        'reports': len(reports),
+        'duration_ms': duration_ms,
+        'frames': {
+            **_summarize(frames, frame_ms, FRAME_TIME_BUCKETS_MS),
+            'fps': round(frame_count * 1000 / frame_ms, 1) if frame_ms else None,
+            'slow': slow_frames,
+            'slow_ratio': round(slow_frames / frame_count, 4) if frame_count else None
+        },
+        'decode': _summarize(decode, decode_ms, DECODE_TIME_BUCKETS_MS),
+        'long_tasks': long_tasks,
+        'layers': {
+            'avg': round(layer_sum / layer_samples, 2) if layer_samples else None,
+            'max': layer_max
+        }
+    }
+
+
+def _summarize(counts, sum_ms, bounds):
+    total = sum(counts)
+    return {
+        'count': total,
+        'mean_ms': round(sum_ms / total, 2) if total else None,
+        'p50_ms': _percentile(counts, bounds, 0.5),
+        'p95_ms': _percentile(counts, bounds, 0.95),
+        'p99_ms': _percentile(counts, bounds, 0.99),
+        'histogram': {'bounds_ms': list(bounds), 'counts': counts}
+    }
+
+
+def _percentile(counts, bounds, quantile):
+    """Upper bound of the bucket holding the quantile (the last bound if it is in the overflow bucket)."""
+    total = sum(counts)
+    if not total:
+        return None
+    seen = 0
+    for bound, count in zip(bounds, counts):
+        seen += count
+        if seen >= quantile * total:
+            return bound
+    return bounds[-1]
@@ -0,0 +1,154 @@
+import os
+import time
+import queue
+import atexit
+import threading
+
+# Queue item that truncates the log instead of writing to it
+_CLEAR = object()
+
+
+class LogWriter:
+    """
+    Append-only text log written by a background thread, with size-based rotation.
+    
+    write() only queues lines, so request handlers never wait on the disk.
+    The writer thread keeps the file open, writes whatever has queued up in
+    one go, and rotates the file to path.1 ... path.<backup_count> when it
+    grows past max_bytes, so the log can never fill the disk. When the queue
+    is full (the disk cannot keep up), new lines are dropped and counted.
+    """
+    
+    def __init__(self, path, max_bytes=1024 * 1024, backup_count=3, max_queue=10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.dropped_count = 0
+        self.written_count = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+    
+    def write(self, lines):
+        """Queue lines (without trailing newlines) for writing. Returns how many were accepted."""
+        accepted = 0
+        for line in lines:
+            try:
+                self._queue.put_nowait(line)
+                accepted += 1
+            except queue.Full:
+                self.dropped_count += 1
+        return accepted
+    
+    def clear(self):
+        """Empty the log and remove rotated files, after anything already queued."""
+        self._queue.put(_CLEAR)
+    
+    def flush(self, timeout=None):
+        """
+        Block until everything queued so far has been written, giving up after
+        timeout seconds or if the writer thread has stopped. Returns True if
+        everything was written.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                if not self._thread.is_alive():
+                    return False
+                wait = 0.1 if deadline is None else min(0.1, deadline - time.monotonic())
+                if wait <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(wait)
+        return True
+    
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            # Take everything else that is waiting so a burst costs one write
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._process(items)
+            except Exception as e:
+                # Lose this batch rather than the thread, or every later line would be lost too
+                print(f"Warning: Could not write {self.path}: {e}")
+                self._close()
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+    
+    def _process(self, items):
+        lines = []
+        for item in items:
+            if item is _CLEAR:
+                self._write(lines)
+                lines = []
+                self._clear_files()
+            else:
+                lines.append(item)
+        self._write(lines)
+    
+    def _write(self, lines):
+        if not lines:
+            return
+        if self._file is None:
+            # Lone surrogates are valid in JSON strings but not in UTF-8
+            self._file = open(self.path, 'a', encoding='utf-8', errors='backslashreplace')
+        self._file.write(''.join(f'{line}\n' for line in lines))
+        self._file.flush()
+        self.written_count += len(lines)
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+    
+    def _rotate(self):
+        self._close()
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f'{self.path}.{index}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.path}.{index + 1}')
+        os.replace(self.path, f'{self.path}.1')
+    
+    def _clear_files(self):
+        self._close()
+        open(self.path, 'w').close()
+        for index in range(1, self.backup_count + 1):
+            backup = f'{self.path}.{index}'
+            if os.path.exists(backup):
+                os.remove(backup)
+    
+    def _close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_log_writer(path='debug.log', max_bytes=1024 * 1024, backup_count=3):
+    """Return the shared writer for path, starting it on first use."""
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = LogWriter(key, max_bytes, backup_count)
+            _writers[key] = writer
+        return writer
+
+
+@atexit.register
+def _flush_all():
+    """Write queued lines before the interpreter exits (without holding up shutdown for long)."""
+    for writer in list(_writers.values()):
+        writer.flush(timeout=5)
@@ -0,0 +1,140 @@
+import gc
+import sys
+import threading
+import tracemalloc
+
+
+class MemoryTracker:
+    """
+    tracemalloc control for a long-running server.
+    
+    Tracing is off until start() because it slows every allocation. Each
+    snapshot() reports the top allocation sites and the biggest changes since
+    the previous snapshot, then becomes the baseline for the next one, so
+    taking snapshots hours apart shows what keeps growing.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._previous = None
+    
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+    
+    def start(self, frames=1):
+        """Start tracing (frames of traceback per allocation) and take the baseline snapshot."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self._previous = self._take_snapshot()
+    
+    def stop(self):
+        """Stop tracing and free its memory."""
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+    
+    def status(self):
+        """Whether tracing is on, and the memory traced so far."""
+        if not tracemalloc.is_tracing():
+            return {'tracing': False}
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'tracing': True,
+            'frames': tracemalloc.get_traceback_limit(),
+            'traced_bytes': current,
+            'peak_traced_bytes': peak,
+            'overhead_bytes': tracemalloc.get_tracemalloc_memory()
+        }
+    
+    def snapshot(self, limit=20, group_by='lineno'):
+        """
+        Top allocation sites now and the largest changes since the previous
+        snapshot. group_by is 'lineno', 'filename' or 'traceback'. Raises
+        RuntimeError if tracing has not been started.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError('tracemalloc is not running')
+            snapshot = self._take_snapshot()
+            previous, self._previous = self._previous, snapshot
+        
+        changes = snapshot.compare_to(previous, group_by) if previous else []
+        return {
+            **self.status(),
+            'top': [_format_stat(stat) for stat in snapshot.statistics(group_by)[:limit]],
+            'changes': [_format_stat(stat) for stat in changes[:limit]]
+        }
+    
+    def _take_snapshot(self):
+        # Leave out allocations made by tracemalloc and the import system
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>')
+        ))
+
+
+def _format_stat(stat):
+    entry = {
+        'location': [f'{frame.filename}:{frame.lineno}' for frame in stat.traceback],
+        'size_bytes': stat.size,
+        'count': stat.count
+    }
+    if isinstance(stat, tracemalloc.StatisticDiff):
+        entry['size_diff_bytes'] = stat.size_diff
+        entry['count_diff'] = stat.count_diff
+    return entry
+
+
+def process_memory():
+    """Current and peak resident set size in bytes (None where unavailable)."""
+    if sys.platform.startswith('linux'):
+        try:
+            values = {}
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith(('VmRSS:', 'VmHWM:')):
+                        name, amount = line.split(':', 1)
+                        values[name] = int(amount.split()[0]) * 1024
+            return {'rss_bytes': values.get('VmRSS'), 'peak_rss_bytes': values.get('VmHWM')}
+        except (OSError, ValueError):
+            pass
+    elif sys.platform == 'win32':
+        try:
+            import ctypes
+            from ctypes import wintypes
+            
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+            
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return {'rss_bytes': counters.WorkingSetSize, 'peak_rss_bytes': counters.PeakWorkingSetSize}
+        except (OSError, AttributeError):
+            pass
+    
+    try:
+        import resource
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {'rss_bytes': None, 'peak_rss_bytes': peak if sys.platform == 'darwin' else peak * 1024}
+    except ImportError:
+        return {'rss_bytes': None, 'peak_rss_bytes': None}
+
+
+def gc_stats():
+    """Garbage collector counters per generation and the number of tracked objects."""
+    return {
+        'counts': list(gc.get_count()),
+        'thresholds': list(gc.get_threshold()),
+        'generations': gc.get_stats(),
+        'tracked_objects': len(gc.get_objects())
+    }
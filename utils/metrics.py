@@ -0,0 +1,134 @@
+import math
+import threading
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Default histogram buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Histogram buckets for response sizes, in bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Metrics:
+    """
+    In-process counters, gauges and histograms rendered in the Prometheus text format.
+    
+    Recording a value is a dict update under a lock, cheap enough to do on
+    every request. Values that already exist elsewhere (settings writes,
+    active remotes) are not copied on every change; collectors registered with
+    add_collector read them when the metrics are rendered.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._descriptions = {}  # {name: (type, help, buckets)}
+        self._values = {}  # {name: {labels: value}}, histogram values are [bucket counts..., sum, count]
+        self._collectors = []
+    
+    def describe(self, name, metric_type, help_text, buckets=LATENCY_BUCKETS):
+        """Declare a metric ('counter', 'gauge' or 'histogram') before recording it."""
+        with self._lock:
+            self._descriptions[name] = (metric_type, help_text, tuple(buckets))
+            self._values.setdefault(name, {})
+    
+    def inc(self, name, labels=None, amount=1):
+        """Add to a counter (or gauge)."""
+        key = _label_key(labels)
+        with self._lock:
+            values = self._values[name]
+            values[key] = values.get(key, 0) + amount
+    
+    def set(self, name, value, labels=None):
+        """Set a gauge."""
+        with self._lock:
+            self._values[name][_label_key(labels)] = value
+    
+    def observe(self, name, value, labels=None):
+        """Record one histogram observation."""
+        key = _label_key(labels)
+        with self._lock:
+            buckets = self._descriptions[name][2]
+            values = self._values[name]
+            histogram = values.get(key)
+            if histogram is None:
+                histogram = values[key] = [0] * (len(buckets) + 2)
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+    
+    def add_collector(self, collector):
+        """
+        Register collector() -> [(name, labels, value), ...], called on every
+        render for described gauges or counters whose values live elsewhere.
+        """
+        self._collectors.append(collector)
+    
+    def __len__(self):
+        """Number of recorded series (label combinations) across all metrics."""
+        with self._lock:
+            return sum(len(samples) for samples in self._values.values())
+    
+    def value(self, name, labels=None):
+        """Current value of a counter or gauge (histograms: the observation count), or 0."""
+        with self._lock:
+            value = self._values.get(name, {}).get(_label_key(labels), 0)
+        return value[-1] if isinstance(value, list) else value
+    
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        collected = []
+        for collector in list(self._collectors):
+            try:
+                collected.extend(collector())
+            except Exception as e:
+                print(f"Warning: Metrics collector failed: {e}")
+        
+        with self._lock:
+            values = {name: {key: list(value) if isinstance(value, list) else value
+                             for key, value in samples.items()}
+                      for name, samples in self._values.items()}
+            descriptions = dict(self._descriptions)
+        for name, labels, value in collected:
+            values.setdefault(name, {})[_label_key(labels)] = value
+        
+        lines = []
+        for name in sorted(values):
+            metric_type, help_text, buckets = descriptions.get(name, ('gauge', '', ()))
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for key, value in sorted(values[name].items()):
+                if metric_type == 'histogram':
+                    for bound, count in zip(buckets, value):
+                        lines.append(f'{name}_bucket{_format_labels(key + (("le", _format_value(bound)),))} {count}')
+                    lines.append(f'{name}_bucket{_format_labels(key + (("le", "+Inf"),))} {value[-1]}')
+                    lines.append(f'{name}_sum{_format_labels(key)} {_format_value(value[-2])}')
+                    lines.append(f'{name}_count{_format_labels(key)} {value[-1]}')
+                else:
+                    lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _format_labels(key):
+    if not key:
+        return ''
+    pairs = []
+    for name, value in key:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(int(value)) if isinstance(value, bool) else str(value)
@@ -0,0 +1,66 @@
+# Images in a generated pattern (PatternManager.generateDeterministicSequence uses 100 too)
+PATTERN_LENGTH = 100
+
+# How strongly images used less than average are favoured when picking the next one
+USAGE_BIAS = 0.5
+
+
+def hash_code(text):
+    """PatternManager.createSeededRandom's string hash: 32-bit arithmetic over UTF-16 code units."""
+    units = text.encode('utf-16-le')
+    value = 0
+    for index in range(0, len(units), 2):
+        value = _int32(_int32(value << 5) - value + int.from_bytes(units[index:index + 2], 'little'))
+    return abs(value)
+
+
+def seeded_random(seed):
+    """The displays' seeded random number generator: a function returning floats in [0, 1)."""
+    state = hash_code(seed)
+    
+    def next_random():
+        nonlocal state
+        state = (state * 1664525 + 1013904223) % 4294967296
+        return state / 4294967296
+    return next_random
+
+
+def generate_sequence(seed, image_ids, length=PATTERN_LENGTH):
+    """
+    The image sequence a display shows for seed, picked from image_ids with
+    the same weighted draw as PatternManager.js, so the server knows which
+    images a display will load first. Images used less than average so far
+    are favoured, which spreads the sequence across the catalog.
+    """
+    # JavaScript sorts strings by UTF-16 code units
+    image_ids = sorted(image_ids, key=lambda image_id: image_id.encode('utf-16-be'))
+    if not image_ids:
+        return []
+    
+    random = seeded_random(seed)
+    usage = {image_id: 0 for image_id in image_ids}
+    sequence = []
+    for _ in range(length):
+        average = sum(usage.values()) / len(image_ids)
+        weights = [1.0 + max(0, average - usage[image_id]) * USAGE_BIAS for image_id in image_ids]
+        
+        # Added one by one as JavaScript does (sum() rounds differently on newer Pythons)
+        total_weight = 0
+        for weight in weights:
+            total_weight += weight
+        remaining = random() * total_weight
+        selected = image_ids[-1]
+        for image_id, weight in zip(image_ids, weights):
+            remaining -= weight
+            if remaining <= 0:
+                selected = image_id
+                break
+        sequence.append(selected)
+        usage[selected] += 1
+    return sequence
+
+
+def _int32(value):
+    """value wrapped to a signed 32-bit integer, like JavaScript's bitwise operators."""
+    value &= 0xFFFFFFFF
+    return value - 0x100000000 if value >= 0x80000000 else value
@@ -0,0 +1,116 @@
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+
+
+class Profiler:
+    """
+    On-demand CPU profiler for a running server.
+    
+    capture(seconds) samples the stacks of every thread at a fixed interval
+    from the calling thread, which costs nothing outside a capture and works
+    on threads that were already running. Requests that start during the
+    capture are also run under cProfile, one at a time, and their results are
+    merged into a single pstats report. Only one capture runs at a time.
+    """
+    
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._capturing = False
+        self._profiling_request = False
+        self._request_profiles = []
+    
+    @property
+    def capturing(self):
+        return self._capturing
+    
+    def capture(self, seconds, sort='cumulative', limit=40):
+        """
+        Profile for seconds. Returns {'samples', 'collapsed', 'pstats',
+        'requests_profiled'}; raises RuntimeError if a capture is already running.
+        """
+        with self._lock:
+            if self._capturing:
+                raise RuntimeError('A profile is already being captured')
+            self._capturing = True
+            self._request_profiles = []
+        try:
+            stacks = self._sample(seconds)
+        finally:
+            with self._lock:
+                self._capturing = False
+                profiles, self._request_profiles = self._request_profiles, []
+        
+        return {
+            'samples': sum(stacks.values()),
+            'collapsed': format_collapsed(stacks),
+            'pstats': format_pstats(profiles, sort, limit),
+            'requests_profiled': len(profiles)
+        }
+    
+    def _sample(self, seconds):
+        """Count collapsed stacks of all other threads every interval until seconds pass."""
+        stacks = Counter()
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own_ident:
+                    stacks[collapse_frame(frame, names.get(ident, str(ident)))] += 1
+            time.sleep(self.interval)
+        return stacks
+    
+    def start_request(self):
+        """Start cProfile for the current request if a capture is running. Returns the profile or None."""
+        with self._lock:
+            # cProfile hooks are per-interpreter on newer Pythons, so profile one request at a time
+            if not self._capturing or self._profiling_request:
+                return None
+            self._profiling_request = True
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+    
+    def finish_request(self, profile):
+        """Stop a request profile started by start_request and add it to the running capture."""
+        profile.disable()
+        with self._lock:
+            self._profiling_request = False
+            if self._capturing:
+                self._request_profiles.append(profile)
+
+
+def collapse_frame(frame, thread_name):
+    """'thread;outer (file:line);...;inner (file:line)' for a frame and its callers."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    names.append(thread_name)
+    return ';'.join(name.replace(';', ':') for name in reversed(names))
+
+
+def format_collapsed(stacks):
+    """Collapsed stack lines ('stack count'), the input format of flamegraph.pl and speedscope."""
+    return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+
+
+def format_pstats(profiles, sort='cumulative', limit=40):
+    """Merged pstats report of cProfile profiles ('' if there are none)."""
+    profiles = [profile for profile in profiles if profile.getstats()]
+    if not profiles:
+        return ''
+    output = io.StringIO()
+    stats = pstats.Stats(profiles[0], stream=output)
+    for profile in profiles[1:]:
+        stats.add(profile)
+    stats.sort_stats(sort).print_stats(limit)
+    return output.getvalue()
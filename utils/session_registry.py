@@ -0,0 +1,98 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+
+
+class SessionRegistry:
+    """
+    Active remote-control sessions with heartbeat expiry.
+    
+    Sessions are kept in an OrderedDict ordered by expiry time: every session
+    has the same ttl, so a heartbeat just moves its session to the end, and
+    expiring stale sessions only looks at the front. A timer wakes up at the
+    next expiry while sessions exist, so on_change(active_count) is called
+    promptly when a remote goes silent, without a background thread when idle.
+    on_change runs under the registry lock so counts are reported in order.
+    """
+    
+    def __init__(self, ttl=35, on_change=None):
+        self.ttl = ttl
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._expiry = OrderedDict()  # {session_id: expires_at}, soonest first
+        self._last_seen = {}  # {session_id: time}
+        self._timer = None
+    
+    def create(self):
+        """Issue a new session ID and mark it active."""
+        session_id = uuid.uuid4().hex
+        self.touch(session_id, create=True)
+        return session_id
+    
+    def touch(self, session_id, create=False):
+        """Record a heartbeat. Unknown (or expired) sessions are only added if create is set. Returns True if active."""
+        now = time.time()
+        with self._lock:
+            changed = self._expire(now)
+            active = session_id in self._expiry or create
+            if active:
+                changed = changed or session_id not in self._expiry
+                self._expiry[session_id] = now + self.ttl
+                self._expiry.move_to_end(session_id)
+                self._last_seen[session_id] = now
+                self._schedule_sweep(now)
+            if changed:
+                self._notify()
+        return active
+    
+    def remove(self, session_id):
+        """End a session. Returns True if it was active."""
+        with self._lock:
+            removed = self._expiry.pop(session_id, None) is not None
+            self._last_seen.pop(session_id, None)
+            if self._expire(time.time()) or removed:
+                self._notify()
+        return removed
+    
+    def active(self):
+        """{session_id: last heartbeat time} for active sessions."""
+        with self._lock:
+            if self._expire(time.time()):
+                self._notify()
+            return {session_id: self._last_seen[session_id] for session_id in self._expiry}
+    
+    def count(self):
+        return len(self.active())
+    
+    def _expire(self, now):
+        """Drop sessions whose expiry has passed. Returns True if any were dropped."""
+        expired = False
+        while self._expiry:
+            session_id, expires_at = next(iter(self._expiry.items()))
+            if expires_at > now:
+                break
+            del self._expiry[session_id]
+            self._last_seen.pop(session_id, None)
+            expired = True
+        return expired
+    
+    def _schedule_sweep(self, now):
+        if self._timer is not None or not self._expiry:
+            return
+        delay = max(next(iter(self._expiry.values())) - now, 0) + 0.01
+        self._timer = threading.Timer(delay, self._sweep)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _sweep(self):
+        now = time.time()
+        with self._lock:
+            self._timer = None
+            if self._expire(now):
+                self._notify()
+            self._schedule_sweep(now)
+    
+    def _notify(self):
+        if self.on_change:
+            self.on_change(len(self._expiry))
@@ -0,0 +1,87 @@
+import time
+import atexit
+import weakref
+import threading
+
+from utils.settings_store import merge_settings
+
+
+class SettingsCoalescer:
+    """
+    Merges bursts of partial settings updates into one change per window.
+    
+    An update arriving after a quiet period is applied at once. Updates that
+    follow within window seconds are merged into a pending delta that is
+    applied when the window ends, so dragging a slider produces at most one
+    settings version (one broadcast, one re-render on each display) per
+    window however fast the remote sends. apply(changes, source) commits a
+    delta and returns the resulting settings.
+    """
+    
+    def __init__(self, apply, window=0.2):
+        self.apply = apply
+        self.window = window
+        self.applied_count = 0
+        self.merged_count = 0
+        self._lock = threading.Lock()
+        self._pending = None
+        self._sources = set()
+        self._last_applied = 0
+        self._timer = None
+        _coalescers.add(self)
+    
+    def submit(self, changes, source=None):
+        """
+        Apply an update now, or merge it into the pending delta if one was
+        applied within the window. Returns (settings, applied); settings is
+        None while the update is pending.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._pending is None and now - self._last_applied >= self.window:
+                self._last_applied = now
+                self.applied_count += 1
+                return self.apply(changes, source), True
+            
+            self._pending = merge_settings(self._pending or {}, changes)
+            self._sources.add(source)
+            self.merged_count += 1
+            if self._timer is None:
+                delay = max(self._last_applied + self.window - now, 0)
+                self._timer = threading.Timer(delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return None, False
+    
+    def pending(self):
+        """Copy of the changes waiting for the window to end (empty if none)."""
+        with self._lock:
+            return merge_settings({}, self._pending or {})
+    
+    def flush(self):
+        """Apply the pending delta now. Returns the settings, or None if nothing was pending."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending is None:
+                return None
+            
+            changes, sources = self._pending, self._sources
+            self._pending, self._sources = None, set()
+            self._last_applied = time.monotonic()
+            self.applied_count += 1
+            # A merged change from several senders is news to all of them
+            source = next(iter(sources)) if len(sources) == 1 else None
+            return self.apply(changes, source)
+
+
+# Live coalescers, flushed at exit; weak so a discarded app is not kept alive by its coalescer
+_coalescers = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    """Apply pending changes before the interpreter exits."""
+    for coalescer in list(_coalescers):
+        coalescer.flush()
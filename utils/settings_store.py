@@ -0,0 +1,159 @@
+import os
+import copy
+import json
+import uuid
+import atexit
+import tempfile
+import threading
+
+
+def merge_settings(settings, changes):
+    """Return settings with a partial update applied (gallery values are merged key by key)."""
+    changes = copy.deepcopy(changes)
+    if isinstance(changes.get('gallery'), dict) and isinstance(settings.get('gallery'), dict):
+        changes['gallery'] = {**settings['gallery'], **changes['gallery']}
+    return {**settings, **changes}
+
+
+class SettingsStore:
+    """
+    In-memory display settings with a version counter and debounced persistence.
+    
+    Reads never touch the disk. Updates are applied under a lock and bump the
+    version; the file is rewritten at most once per save_delay seconds, via a
+    temporary file renamed over the original so readers never see a partial
+    write.
+    """
+    
+    def __init__(self, path, defaults=None, save_delay=0.5):
+        self.path = path
+        self.defaults = copy.deepcopy(defaults or {})
+        self.save_delay = save_delay
+        self.write_count = 0
+        # Distinguishes ETags from different server runs, whose versions restart at 1
+        self.instance_id = uuid.uuid4().hex[:8]
+        self._lock = threading.RLock()
+        # Serializes writes, so an older snapshot never lands after a newer one
+        self._write_lock = threading.Lock()
+        self._save_timer = None
+        self._dirty = False
+        self._version = 1
+        self._settings = self._load()
+        if self._dirty:
+            self.flush()
+    
+    def _load(self):
+        """Settings from disk merged over the defaults (creates the file on first run)."""
+        settings = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    settings = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"Warning: Could not load existing settings: {e}")
+        else:
+            self._dirty = True
+        
+        merged = {**copy.deepcopy(self.defaults), **settings}
+        if isinstance(self.defaults.get('gallery'), dict):
+            merged['gallery'] = {**self.defaults['gallery'], **settings.get('gallery', {})}
+        return merged
+    
+    @property
+    def version(self):
+        with self._lock:
+            return self._version
+    
+    def etag(self, version):
+        """Entity tag for a settings version."""
+        return f'{self.instance_id}-{version}'
+    
+    def snapshot(self):
+        """Return (settings, version); the settings are a copy the caller may modify."""
+        with self._lock:
+            return copy.deepcopy(self._settings), self._version
+    
+    def update(self, changes, on_change=None):
+        """
+        Merge a partial update (gallery values are merged key by key) and
+        schedule a save. on_change(settings, version) is called before the lock
+        is released, so listeners see versions in order. Returns (settings, version).
+        """
+        with self._lock:
+            self._settings = merge_settings(self._settings, changes)
+            self._version += 1
+            self._dirty = True
+            self._schedule_save()
+            
+            settings, version = copy.deepcopy(self._settings), self._version
+            if on_change:
+                on_change(copy.deepcopy(settings), version)
+            return settings, version
+    
+    def _schedule_save(self):
+        if self._save_timer is not None:
+            return
+        self._save_timer = threading.Timer(self.save_delay, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+    
+    def flush(self):
+        """
+        Write pending changes now. Returns True if the file is up to date with
+        the settings as they were when the write started.
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return True
+                settings, version = copy.deepcopy(self._settings), self._version
+            
+            # The write and fsync happen outside the lock so reads and updates never wait on the disk
+            directory = os.path.dirname(os.path.abspath(self.path))
+            try:
+                fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.settings-', suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump(settings, f, indent=2)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(temp_path, self.path)
+                except BaseException:
+                    os.unlink(temp_path)
+                    raise
+            except OSError as e:
+                # Keep the changes in memory; the next update retries the write
+                print(f"Warning: Could not save settings: {e}")
+                return False
+            
+            with self._lock:
+                self.write_count += 1
+                # An update made during the write has scheduled its own save
+                if self._version == version:
+                    self._dirty = False
+            return True
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_settings_store(path='settings.json', defaults=None, save_delay=0.5):
+    """Return the shared store for path, loading it on first use."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = SettingsStore(key, defaults, save_delay)
+            _stores[key] = store
+        return store
+
+
+@atexit.register
+def _flush_all():
+    """Write any debounced changes before the interpreter exits."""
+    for store in list(_stores.values()):
+        store.flush()
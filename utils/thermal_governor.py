@@ -0,0 +1,153 @@
+import os
+import time
+import threading
+from collections import deque
+
+# CPU temperature on the Raspberry Pi (and most Linux boards), in millidegrees Celsius
+THERMAL_ZONE_PATH = '/sys/class/thermal/thermal_zone0/temp'
+
+# Used when config.json has no performance.thermal_governor.levels
+DEFAULT_LEVELS = (
+    {'above_c': 70, 'max_layers': 3, 'fps': 20, 'color_filters': True, 'preload_depth': 3},
+    {'above_c': 75, 'max_layers': 2, 'fps': 15, 'color_filters': False, 'preload_depth': 2},
+    {'above_c': 80, 'max_layers': 1, 'fps': 10, 'color_filters': False, 'preload_depth': 1}
+)
+
+
+def read_cpu_temperature(path=THERMAL_ZONE_PATH):
+    """CPU temperature in degrees Celsius, or None if the sensor cannot be read."""
+    try:
+        with open(path, 'r') as f:
+            return int(f.read().strip()) / 1000.0
+    except (OSError, ValueError):
+        return None
+
+
+class ThermalGovernor:
+    """
+    Steps display quality down as the CPU heats up, and back up as it cools.
+    
+    levels are ordered by their above_c threshold; level N (1-based) applies
+    once the temperature reaches levels[N-1]['above_c'], and its limits
+    (max_layers, fps, color_filters, preload_depth) are sent to displays.
+    A level is only left when the temperature drops hysteresis degrees below
+    its threshold, so a reading that hovers around a threshold does not make
+    the displays flip back and forth. on_change(state) is called for every
+    level change, which is also kept in a short history with the time spent
+    throttled, to show how often the governor intervenes.
+    """
+    
+    def __init__(self, levels=DEFAULT_LEVELS, hysteresis=5, read_temperature=read_cpu_temperature,
+                 on_change=None, history_size=100):
+        self.levels = sorted((dict(level) for level in levels), key=lambda level: level['above_c'])
+        self.hysteresis = hysteresis
+        self.read_temperature = read_temperature
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._level = 0
+        self._temperature = None
+        self._sampled_at = None
+        self._level_since = time.time()
+        self._throttled_seconds = 0.0
+        self._change_count = 0
+        self._history = deque(maxlen=history_size)
+        self._thread = None
+    
+    def update(self, temperature):
+        """Apply a temperature reading. Returns True if the level changed."""
+        now = time.time()
+        with self._lock:
+            self._temperature = temperature
+            self._sampled_at = now
+            previous = level = self._level
+            while level < len(self.levels) and temperature >= self.levels[level]['above_c']:
+                level += 1
+            if level == previous:
+                # Only step down once it is clearly cooler than the level's threshold
+                while level > 0 and temperature < self.levels[level - 1]['above_c'] - self.hysteresis:
+                    level -= 1
+            if level == previous:
+                return False
+            
+            if previous > 0:
+                self._throttled_seconds += now - self._level_since
+            self._history.append({'time': now, 'from': previous, 'to': level, 'temperature': temperature})
+            self._change_count += 1
+            self._level = level
+            self._level_since = now
+            state = self._state(now)
+        
+        print(f"Thermal governor: {temperature:.1f}C, level {previous} -> {level}")
+        if self.on_change:
+            self.on_change(state)
+        return True
+    
+    def sample(self):
+        """Read the sensor once and apply the reading. Returns the temperature or None."""
+        temperature = self.read_temperature()
+        if temperature is not None:
+            self.update(temperature)
+        return temperature
+    
+    def start(self, interval=5):
+        """Sample every interval seconds on a daemon thread (only the first call starts it)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, args=(interval,), name='thermal-governor', daemon=True)
+        self._thread.start()
+    
+    def _run(self, interval):
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Warning: Thermal sampling failed: {e}")
+            time.sleep(interval)
+    
+    @property
+    def sampling(self):
+        """Whether the background sampler is running."""
+        return self._thread is not None
+    
+    @property
+    def level(self):
+        with self._lock:
+            return self._level
+    
+    def limits(self):
+        """Limits for the current level, or None when not throttling."""
+        with self._lock:
+            return self._limits()
+    
+    def state(self):
+        """Current level, limits, last reading and intervention totals."""
+        with self._lock:
+            return self._state(time.time())
+    
+    def history(self):
+        """Recent level changes, oldest first."""
+        with self._lock:
+            return list(self._history)
+    
+    def _limits(self):
+        if self._level == 0:
+            return None
+        return {key: value for key, value in self.levels[self._level - 1].items() if key != 'above_c'}
+    
+    def _state(self, now):
+        throttled_seconds = self._throttled_seconds + (now - self._level_since if self._level > 0 else 0)
+        return {
+            'level': self._level,
+            'max_level': len(self.levels),
+            'limits': self._limits(),
+            'temperature': self._temperature,
+            'sampled_at': self._sampled_at,
+            'level_since': self._level_since,
+            'changes': self._change_count,
+            'throttled_seconds': round(throttled_seconds, 1)
+        }
+
+
+def sensor_available(path=THERMAL_ZONE_PATH):
+    """Whether the thermal zone can be read on this machine."""
+    return os.path.exists(path) and read_cpu_temperature(path) is not None
@@ -94,6 +94,7 @@ a = Analysis(
         'utils.image_manager',
         'flask',
         'werkzeug',
+        'waitress',
         'jinja2',
         'PIL',
         'PIL.Image',